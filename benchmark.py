@@ -1,33 +1,127 @@
 # vi:set shiftwidth=4 expandtab:
-# run "ChimeraX --nogui --exit --silent benchmark.py"
+# run "ChimeraX --nogui --exit --silent --script 'benchmark.py [options]'"
 #
 # This file is meant to be run weekly, and compared with
 # previous weeks, so changes in performance can daylighted.
 #
+# All benchmarks use the files in the testdata directory so no network
+# access is needed.  Each benchmark reports its timings, the peak resident
+# memory reached while it ran and the number of Python memory blocks it
+# left allocated.  Results can be written as JSON and compared against an
+# earlier run with benchmark_compare.py.
+#
+# Options:
+#   --json FILE       write results to FILE as JSON
+#   --count N         number of times to run each benchmark (default 5)
+#   --only NAME,...   only run the named benchmarks
+#   --tracemalloc     also measure peak traced Python allocations
+#                     (runs each benchmark one extra time)
+#   --network         also run the original PDB fetch benchmarks
+#   --list            list benchmark names and exit
+#
 import gc
 import os
 import sys
 import socket
-import subprocess
 from chimerax.core.commands import run
 from chimerax.core.logger import PlainTextLog
 from chimerax.core import buildinfo
 
 
-PDB_MMCIF_IDS = ["3fx2", "2hmg", "5xnl"]
-HUGE_MMCIF_ID = "3j3q"
+TESTDATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testdata")
 COUNT = 5
-current_memory_usage = None
-
+SCHEMA_VERSION = 1
+
+# Each benchmark is (name, setup commands, timed commands, cleanup commands).
+# Setup and cleanup commands are run for every repetition but not timed.
+# "{testdata}" and "{tmp}" in commands are replaced with directory paths.
+BENCHMARKS = [
+    ("open pdb", [], ["open {testdata}/3fx2.pdb"], ["close"]),
+    ("open mmcif", [], ["open {testdata}/1gcf.cif"], ["close"]),
+    ("close structure", ["open {testdata}/1gcf.cif"], ["close"], []),
+    ("open map", [], ["open {testdata}/cell15_timeseries.cmap"], ["close"]),
+    (
+        "map contour",
+        ["open {testdata}/1gcf.cif", "molmap #1 2 gridSpacing 0.5"],
+        [
+            "volume #2 level 0.1 calculateSurfaces true",
+            "volume #2 level 0.5 calculateSurfaces true",
+        ],
+        ["close"],
+    ),
+    ("surface", ["open {testdata}/1gcf.cif"], ["surface #1"], ["close"]),
+    ("hbonds", ["open {testdata}/1gcf.cif"], ["hbonds #1 log false"], ["close"]),
+    ("clashes", ["open {testdata}/1gcf.cif"], ["clashes #1 log false"], ["close"]),
+    (
+        "session save",
+        ["open {testdata}/1gcf.cif", "surface #1"],
+        ["save {tmp}/benchmark.cxs"],
+        ["close"],
+    ),
+    (
+        "session restore",
+        [
+            "open {testdata}/1gcf.cif",
+            "surface #1",
+            "save {tmp}/benchmark.cxs",
+            "close",
+        ],
+        ["open {tmp}/benchmark.cxs"],
+        ["close"],
+    ),
+    (
+        "matchmaker",
+        ["open {testdata}/1a0m.pdb", "open {testdata}/1a0m.cif", "turn y 30 models #2"],
+        ["matchmaker #2 to #1"],
+        ["close"],
+    ),
+    (
+        "morph",
+        ["open {testdata}/1a0m.pdb", "open {testdata}/1a0m.cif", "turn y 30 models #2"],
+        ["morph #1,2 frames 50 play false"],
+        ["close"],
+    ),
+    ("dssp", ["open {testdata}/9rsa.cif"], ["dssp #1"], ["close"]),
+    (
+        "atomspec",
+        ["open {testdata}/1gcf.cif"],
+        [
+            "select /A:1-200@CA,CB,CG",
+            "select (protein & ~backbone) | ligand",
+            "select :HIS,TYR,TRP & @@bfactor>20",
+            "select #1/A:10-50 :<5",
+            "select ~select",
+        ],
+        ["close"],
+    ),
+]
 
-def get_memory_use():
-    gc.collect()
-    if sys.platform == "darwin":
-        output = subprocess.check_output(["/usr/bin/vmmap", str(os.getpid())])
-    else:
-        output = subprocess.check_output(["/usr/bin/pmap", str(os.getpid())])
-    usage = output.split()[-1].decode()
-    return usage
+NETWORK_PDB_MMCIF_IDS = ["3fx2", "2hmg", "5xnl"]
+NETWORK_HUGE_MMCIF_ID = "3j3q"
+
+
+def network_benchmarks():
+    benchmarks = []
+    huge = NETWORK_HUGE_MMCIF_ID
+    benchmarks.append(
+        (f"fetch {huge} mmcif", [], [f"open {huge} format mmcif loginfo false"], ["close"])
+    )
+    for pdb_id in NETWORK_PDB_MMCIF_IDS:
+        for format in ("pdb", "mmcif"):
+            benchmarks.append(
+                (
+                    f"fetch {pdb_id} {format}",
+                    [],
+                    [f"open {pdb_id} format {format} loginfo false"],
+                    ["close"],
+                )
+            )
+    huge_open = f"open {huge} format mmcif loginfo false"
+    benchmarks.append(
+        (f"style ball {huge}", [huge_open], ["style ball"], ["close"])
+    )
+    benchmarks.append((f"cartoon {huge}", [huge_open], ["cartoon"], ["close"]))
+    return benchmarks
 
 
 class NoOutputLog(PlainTextLog):
@@ -39,107 +133,226 @@ class NoOutputLog(PlainTextLog):
         pass
 
 
-session = session  # noqa -- shut up flake8
-session.logger.add_log(NoOutputLog())
-
-
-def time_command(command):
-    from time import time
-
-    t0 = time()
+class MemoryMonitor:
+    """Measure resident memory of this process.
+
+    On Linux the peak resident size (VmHWM) can be reset before each
+    benchmark by writing to /proc/self/clear_refs, so the peak is specific
+    to that benchmark.  Elsewhere the process lifetime peak from
+    getrusage() is used and the reported peak only changes when a
+    benchmark exceeds all earlier ones.
+    """
+
+    def __init__(self):
+        self._proc = os.path.exists("/proc/self/status")
+
+    def reset_peak(self):
+        if self._proc:
+            try:
+                with open("/proc/self/clear_refs", "w") as f:
+                    f.write("5")
+            except OSError:
+                pass
+
+    def _proc_status(self, key):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1])  # kilobytes
+        return None
+
+    def current_kb(self):
+        if self._proc:
+            return self._proc_status("VmRSS")
+        return None
+
+    def peak_kb(self):
+        if self._proc:
+            peak = self._proc_status("VmHWM")
+            if peak is not None:
+                return peak
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak //= 1024  # bytes on macOS
+        return peak
+
+
+def substitute(commands, paths):
+    return [cmd.format(**paths) for cmd in commands]
+
+
+def run_commands(session, commands):
+    for cmd in commands:
+        run(session, cmd, log=False)
+
+
+def run_benchmark(session, benchmark, count, memory, paths, trace_malloc=False):
+    from time import perf_counter
+
+    name, setup, timed, cleanup = benchmark
+    setup = substitute(setup, paths)
+    timed = substitute(timed, paths)
+    cleanup = substitute(cleanup, paths)
+    result = {"commands": timed}
+    times = []
+    gc.collect()
+    blocks0 = sys.getallocatedblocks()
+    rss0 = memory.current_kb()
+    memory.reset_peak()
     try:
-        run(session, command)
-    except:
-        return 0
-    t1 = time()
-    return t1 - t0
-
-
-def time_commands(cmds):
-    for cmd, description in cmds:
-        times = []
-        run_command(cmd, times)
-        print_results(description, times)
-        print_increased_memory()
-
-
-def run_command(command, times):
-    t = time_command(command)
-    # session.main_view.check_for_drawing_change()
-    times.append(t)
-
-
-def time_open_close(open_cmd):
-    open_times = []
-    close_times = []
-    for _ in range(COUNT):
-        run_command(open_cmd, open_times)
-        run_command("close", close_times)
-    return open_times, close_times
+        for _ in range(count):
+            run_commands(session, setup)
+            t0 = perf_counter()
+            run_commands(session, timed)
+            times.append(perf_counter() - t0)
+            run_commands(session, cleanup)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        run(session, "close", log=False)
+        return result
+    result["peak_rss_kb"] = memory.peak_kb()
+    gc.collect()
+    rss1 = memory.current_kb()
+    if rss0 is not None and rss1 is not None:
+        result["rss_increase_kb"] = rss1 - rss0
+    result["allocated_blocks_increase"] = sys.getallocatedblocks() - blocks0
+    result.update(time_statistics(times))
+    if trace_malloc:
+        result.update(traced_allocations(session, setup, timed, cleanup))
+    return result
 
 
-def print_results(command, times):
-    from numpy import std
+def traced_allocations(session, setup, timed, cleanup):
+    import tracemalloc
 
-    if len(times) >= 3:
+    run_commands(session, setup)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        snapshot0 = tracemalloc.take_snapshot()
+        run_commands(session, timed)
+        snapshot1 = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    run_commands(session, cleanup)
+    stats = snapshot1.compare_to(snapshot0, "filename")
+    return {
+        "traced_peak_kb": peak // 1024,
+        "traced_allocations": sum(s.count_diff for s in stats if s.count_diff > 0),
+    }
+
+
+def time_statistics(times):
+    from numpy import mean, median, std
+
+    trimmed = sorted(times)
+    if len(trimmed) >= 3:
         # throw out high and low
-        times = sorted(times)[1:-1]
-    mean = sum(times) / len(times)
-    var = std(times)
-    if len(times) == 1:
-        print(f"{round(mean, 4)}: {command}")
-    else:
-        print(f"{round(mean, 4)} \N{Plus-Minus Sign}" f" {round(var,3)}: {command}")
-
-
-def print_delta_memory(tag, first, second):
-    delta = int(second[:-1]) - int(first[:-1])
-    print(f"{tag}: {delta}{first[-1]}")
-
-
-def print_increased_memory():
-    global current_memory_usage
-    if current_memory_usage is None:
-        current_memory_usage = start_usage
-    usage = get_memory_use()
-    print_delta_memory("Increased memory use", current_memory_usage, usage)
-    current_memory_usage = usage
-
-
-print(f"UCSF ChimeraX version: {buildinfo.version}" f" ({buildinfo.date.split()[0]})")
-print(f"Running benchmark on {socket.gethostname()}")
-
-start_usage = get_memory_use()
-print(f"Starting memory use:  {start_usage}")
-usage0 = start_usage
-
-print("Average time: command")
-
-huge_open_cmd = f"open {HUGE_MMCIF_ID} format mmcif loginfo false"
-open_times, close_times = time_open_close(huge_open_cmd)
-print_results(huge_open_cmd, open_times)
-print_results(f"({HUGE_MMCIF_ID} mmcif) close", close_times)
-print_increased_memory()
-
-for pdb_id in PDB_MMCIF_IDS:
-    open_cmd = f"open {pdb_id} format pdb loginfo false"
-    open_times, close_times = time_open_close(open_cmd)
-    print_results(open_cmd, open_times)
-    print_results(f"({pdb_id} pdb) close", close_times)
-    open_cmd = f"open {pdb_id} format mmcif loginfo false"
-    open_times, close_times = time_open_close(open_cmd)
-    print_results(open_cmd, open_times)
-    print_results(f"({pdb_id} mmcif) close", close_times)
-    print_increased_memory()
-
-run(session, huge_open_cmd)
-mol_cmds = [
-    ("style ball", f"style ball ({HUGE_MMCIF_ID})"),
-    ("cartoon", f"cartoon ({HUGE_MMCIF_ID})"),
-]
-time_commands(mol_cmds)
+        trimmed = trimmed[1:-1]
+    return {
+        "times": times,
+        "mean": float(mean(trimmed)),
+        "stdev": float(std(trimmed)),
+        "median": float(median(times)),
+        "min": min(times),
+    }
+
+
+def print_result(name, result):
+    if "error" in result:
+        print(f"{'failed':>22}: {name} ({result['error']})")
+        return
+    mean = round(result["mean"], 4)
+    stdev = round(result["stdev"], 3)
+    peak = result.get("peak_rss_kb")
+    peak = "?" if peak is None else f"{peak // 1024}M"
+    print(f"{mean:>8} \N{Plus-Minus Sign} {stdev:<6} {peak:>6}: {name}")
+
+
+def parse_arguments(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--count", type=int, default=COUNT)
+    parser.add_argument("--only", metavar="NAMES", help="comma-separated benchmark names")
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--network", action="store_true")
+    parser.add_argument("--list", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(session, argv):
+    import json
+    import platform
+    import tempfile
+    import time
+
+    args = parse_arguments(argv)
+    benchmarks = list(BENCHMARKS)
+    if args.network:
+        benchmarks.extend(network_benchmarks())
+    if args.list:
+        for b in benchmarks:
+            print(b[0])
+        return
+    if args.only:
+        names = set(n.strip() for n in args.only.split(","))
+        unknown = names - set(b[0] for b in benchmarks)
+        if unknown:
+            raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        benchmarks = [b for b in benchmarks if b[0] in names]
+
+    session.logger.add_log(NoOutputLog())
+    memory = MemoryMonitor()
+    version = buildinfo.version
+    build_date = buildinfo.date.split()[0]
+    print(f"UCSF ChimeraX version: {version} ({build_date})")
+    print(f"Running benchmark on {socket.gethostname()}")
+    start_rss = memory.current_kb()
+    if start_rss is not None:
+        print(f"Starting memory use:  {start_rss}K")
+    print("    Mean \N{Plus-Minus Sign} stdev  peak RSS: benchmark")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"testdata": TESTDATA, "tmp": tmp}
+        for benchmark in benchmarks:
+            name = benchmark[0]
+            result = run_benchmark(
+                session, benchmark, args.count, memory, paths, args.tracemalloc
+            )
+            results[name] = result
+            print_result(name, result)
+
+    end_rss = memory.current_kb()
+    if end_rss is not None and start_rss is not None:
+        print(f"Ending memory use:    {end_rss}K")
+        print(f"Total memory increase: {end_rss - start_rss}K")
+
+    if args.json:
+        report = {
+            "schema": SCHEMA_VERSION,
+            "chimerax_version": version,
+            "build_date": build_date,
+            "host": socket.gethostname(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "count": args.count,
+            "start_rss_kb": start_rss,
+            "end_rss_kb": end_rss,
+            "benchmarks": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote results to {args.json}")
 
 
-end_usage = get_memory_use()
-print(f"Ending memory use:    {end_usage}")
-print_delta_memory("Total memory increase", start_usage, end_usage)
+session = session  # noqa -- shut up flake8
+main(session, sys.argv[1:])
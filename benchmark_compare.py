@@ -0,0 +1,127 @@
+# vi:set shiftwidth=4 expandtab:
+# Compare two JSON result files written by benchmark.py:
+#
+#   python benchmark_compare.py baseline.json current.json [--threshold 10]
+#
+# A benchmark is flagged as a regression when its time (trimmed mean by
+# default) or its peak resident memory grows by more than the threshold
+# percentage.  Times below --min-time seconds are too noisy to compare and
+# only reported.  Exits with status 1 if any regression is found so it can
+# be used in automated runs.
+#
+import json
+import sys
+
+TIME_METRICS = ("mean", "median", "min")
+
+
+def load_results(path):
+    with open(path) as f:
+        report = json.load(f)
+    if "benchmarks" not in report:
+        raise SystemExit(f"{path} is not a benchmark.py results file")
+    return report
+
+
+def percent_change(old, new):
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return 0.0 if new == 0 else float("inf")
+    return 100.0 * (new - old) / old
+
+
+def compare(baseline, current, threshold=10.0, memory_threshold=None,
+            metric="mean", min_time=0.01):
+    """Return a list of (name, status, time change %, memory change %, note)."""
+    if memory_threshold is None:
+        memory_threshold = threshold
+    rows = []
+    old_results = baseline["benchmarks"]
+    new_results = current["benchmarks"]
+    for name, new in new_results.items():
+        old = old_results.get(name)
+        if "error" in new:
+            rows.append((name, "failed", None, None, new["error"]))
+            continue
+        if old is None:
+            rows.append((name, "new", None, None, ""))
+            continue
+        if "error" in old:
+            rows.append((name, "fixed", None, None, ""))
+            continue
+        dt = percent_change(old.get(metric), new.get(metric))
+        dm = percent_change(old.get("peak_rss_kb"), new.get("peak_rss_kb"))
+        notes = []
+        if dt is not None and dt > threshold:
+            if max(old[metric], new[metric]) < min_time:
+                notes.append("time below noise floor")
+            else:
+                notes.append("slower")
+        if dm is not None and dm > memory_threshold:
+            notes.append("more memory")
+        regressed = [n for n in notes if n != "time below noise floor"]
+        if regressed:
+            status = "REGRESSION"
+        elif dt is not None and dt < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, status, dt, dm, ", ".join(notes)))
+    for name in old_results:
+        if name not in new_results:
+            rows.append((name, "missing", None, None, ""))
+    return rows
+
+
+def format_change(change):
+    if change is None:
+        return "-"
+    return f"{change:+.1f}%"
+
+
+def print_comparison(baseline, current, rows, metric):
+    for label, report in (("baseline", baseline), ("current", current)):
+        print(f"{label:>8}: {report.get('chimerax_version')}"
+              f" ({report.get('build_date')}) on {report.get('host')}")
+    print(f"{'time (' + metric + ')':>12} {'peak RSS':>9}  {'status':<10} benchmark")
+    for name, status, dt, dm, note in rows:
+        line = f"{format_change(dt):>12} {format_change(dm):>9}  {status:<10} {name}"
+        if note:
+            line += f" ({note})"
+        print(line)
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="benchmark_compare.py",
+        description="Compare two benchmark.py JSON result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent time increase counted as a regression")
+    parser.add_argument("--memory-threshold", type=float, default=None,
+                        help="percent peak memory increase counted as a"
+                        " regression (default same as --threshold)")
+    parser.add_argument("--metric", choices=TIME_METRICS, default="mean")
+    parser.add_argument("--min-time", type=float, default=0.01,
+                        help="ignore time changes of benchmarks faster than this"
+                        " many seconds")
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    rows = compare(baseline, current, args.threshold, args.memory_threshold,
+                   args.metric, args.min_time)
+    print_comparison(baseline, current, rows, args.metric)
+    regressions = [r for r in rows if r[1] in ("REGRESSION", "failed")]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1222,8 +1222,29 @@ def read_pae_matrix(path):
 
 # -----------------------------------------------------------------------------
 #
-def read_json_pae_matrix(path):
-    '''Open AlphaFold database distance error PAE JSON file returning a numpy matrix.'''
+def read_json_pae_matrix(path, cache = True):
+    '''
+    Open AlphaFold database distance error PAE JSON file returning a numpy matrix.
+    Matrices from large files are cached in the user cache directory as numpy .npy
+    files that are memory mapped when the same unchanged file is opened again.
+    '''
+    if cache:
+        pae = _read_cached_pae_matrix(path)
+        if pae is not None:
+            return pae
+
+    pae = _fast_read_json_pae_matrix(path)
+    if pae is None:
+        pae = _read_json_pae_matrix_using_json_module(path)
+
+    if cache:
+        _cache_pae_matrix(path, pae)
+
+    return pae
+
+# -----------------------------------------------------------------------------
+#
+def _read_json_pae_matrix_using_json_module(path):
     f = open(path, 'r')
     import json
     j = json.load(f)
@@ -1268,6 +1289,251 @@ def read_json_pae_matrix(path):
     from chimerax.core.errors import UserError
     raise UserError(f'JSON file "{path}" is not AlphaFold predicted aligned error data, expected a dictionary with keys "predicted_aligned_error" or "residue1", "residue2" and "distance", got keys {keys}')
 
+# -----------------------------------------------------------------------------
+# Read the PAE matrix from the known AlphaFold and ColabFold JSON layouts parsing
+# the numbers directly into numpy arrays a block of text at a time without making
+# Python lists, which is much faster and uses much less memory for large files.
+# Returns None if the layout is not recognized.
+#
+def _fast_read_json_pae_matrix(path):
+    import mmap
+    with open(path, 'rb') as f:
+        try:
+            text = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            return None		# Empty file
+    with text:
+        layout = _json_top_level_arrays(text)
+        if layout is None:
+            return None
+        top, spans = layout
+        if top == b'{':
+            # ColabFold and AlphaFold 3 layout, a dictionary with a 2d array.
+            for key in (b'"pae"', b'"predicted_aligned_error"'):
+                if key in spans:
+                    return _parse_json_square_matrix(text, *spans[key])
+        elif top == b'[':
+            # AlphaFold database layouts, a list containing a dictionary.
+            keys = (b'"residue1"', b'"residue2"', b'"distance"')
+            if all(key in spans for key in keys):
+                # AlphaFold Database versions 1 and 2 use this format
+                from numpy import int32, float32, zeros
+                arrays = [_parse_json_numbers(text, *spans[key], dtype)
+                          for key, dtype in zip(keys, (int32, int32, float32))]
+                if None in arrays:
+                    return None
+                (r1,b1), (r2,b2), (ea,b3) = arrays
+                if (b1, b2, b3) != (1, 1, 1):
+                    return None
+                if len(r1) == 0 or len(r2) != len(r1) or len(ea) != len(r1):
+                    return None
+                n = r1.max()
+                pae = zeros((n,n), float32)
+                pae[r1-1,r2-1] = ea
+                return pae
+            key = b'"predicted_aligned_error"'
+            if key in spans:
+                # AlphaFold Database version 3 uses this format.
+                return _parse_json_square_matrix(text, *spans[key])
+    return None
+
+# -----------------------------------------------------------------------------
+# Find the array values of the keys of the top level dictionary, or of the
+# dictionary that is the first element of a top level list, matching what is read
+# using the json module.  Returns the top level bracket b'{' or b'[' and a dictionary
+# mapping quoted key to start and end index of its array value in text, or None if
+# the text is not valid JSON.  Strings and runs of numbers are skipped by the regular
+# expression so Python only loops once per array row or string.
+#
+_json_token = None
+def _json_top_level_arrays(text):
+    global _json_token
+    if _json_token is None:
+        import re
+        _json_token = re.compile(rb'\s*(?:("(?:[^"\\]|\\.)*")|([-+0-9.eE,][-+0-9.eE,\s]*)'
+                                 rb'|([\[\]{}:])|(true|false|null))')
+    top = None
+    stack = []
+    spans = {}
+    elements = 0		# Count of elements of a top level list
+    keys_dict = False		# Whether the innermost open dictionary holds the keys
+    last_string = key = None
+    array_key = array_start = None
+    pos = 0
+    while stack or top is None:
+        m = _json_token.match(text, pos)
+        if m is None:
+            return None
+        pos = m.end()
+        kind = m.lastindex
+        if top == b'[' and len(stack) == 1 and (kind != 2 or m.group(2).strip(b', \t\r\n')):
+            elements += 1
+        if kind == 3:
+            c = m.group(3)
+            if c == b':':
+                if last_string is None or not stack or stack[-1] != b'{':
+                    return None
+                key = last_string if keys_dict else None
+            elif c in (b'{', b'['):
+                if top is None:
+                    top = c
+                if array_key is None and key is not None and c == b'[':
+                    array_key, array_start = key, m.start(3)
+                stack.append(c)
+                keys_dict = (c == b'{' and
+                             ((top == b'{' and len(stack) == 1) or
+                              (top == b'[' and len(stack) == 2 and elements == 1)))
+                key = None
+            else:
+                if not stack or stack.pop() != (b'{' if c == b'}' else b'['):
+                    return None
+                keys_dict = (top == b'{' and len(stack) == 1) or (top == b'[' and len(stack) == 2 and elements == 1)
+                if array_key is not None and (len(stack) == 1 if top == b'{' else len(stack) == 2):
+                    spans[array_key] = (array_start, pos)
+                    array_key = None
+            last_string = None
+        else:
+            if top is None:
+                return None
+            last_string = m.group(1) if kind == 1 else None
+            key = None
+    if text[pos:].strip():
+        return None
+    return top, spans
+
+# -----------------------------------------------------------------------------
+#
+def _parse_json_square_matrix(text, start, end):
+    from numpy import float32
+    parse = _parse_json_numbers(text, start, end, float32)
+    if parse is None:
+        return None
+    values, brackets = parse
+    n = brackets - 1	# Number of rows
+    if n <= 0 or values.size != n*n:
+        return None
+    return values.reshape((n,n))
+
+# -----------------------------------------------------------------------------
+# Parse comma separated numbers in text[start:end] ignoring square brackets,
+# returning a 1-dimensional array and the count of opening brackets, or None
+# if the text contains other characters or numbers cannot be parsed.
+#
+_json_number_characters = b'0123456789+-.eE,[] \t\r\n'
+_brackets_to_spaces = bytes.maketrans(b'[]', b'  ')
+def _parse_json_numbers(text, start, end, dtype, block_size = 2**24):
+    from numpy import fromstring, concatenate, zeros
+    import warnings
+    arrays = []
+    brackets = 0
+    pos = start
+    while pos < end:
+        bend = end if end - pos <= block_size else text.rfind(b',', pos, pos + block_size)
+        if bend <= pos:
+            bend = end
+        block = text[pos:bend]
+        pos = bend + 1	# Skip comma separating blocks
+        if block.translate(None, _json_number_characters):
+            return None
+        brackets += block.count(b'[')
+        block = block.translate(_brackets_to_spaces)
+        if block.isspace():
+            continue
+        with warnings.catch_warnings():
+            # Numpy warns when it cannot parse the whole string.
+            warnings.simplefilter('ignore', DeprecationWarning)
+            try:
+                a = fromstring(block, dtype, sep = ',')
+            except ValueError:
+                return None
+        if len(a) != block.count(b',') + 1:
+            return None
+        arrays.append(a)
+    values = concatenate(arrays) if arrays else zeros((0,), dtype)
+    return values, brackets
+
+# -----------------------------------------------------------------------------
+# PAE matrices read from JSON files at least this size are cached.
+#
+pae_cache_min_file_size = 2**23		# bytes
+pae_cache_max_size = 2**32		# bytes, least recently used files are removed
+
+def _pae_cache_path(path):
+    import os
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_size < pae_cache_min_file_size:
+        return None
+    key = f'{os.path.abspath(path)}\n{st.st_size}\n{st.st_mtime_ns}'
+    from hashlib import sha1
+    filename = 'pae_' + sha1(key.encode('utf-8')).hexdigest() + '.npy'
+    from chimerax import app_dirs
+    return os.path.join(app_dirs.user_cache_dir, 'alphafold_pae', filename)
+
+# -----------------------------------------------------------------------------
+#
+def _read_cached_pae_matrix(path):
+    cache_path = _pae_cache_path(path)
+    if cache_path is None:
+        return None
+    import numpy, os
+    try:
+        # Copy-on-write so changes to the matrix are not saved in the cache.
+        pae = numpy.load(cache_path, mmap_mode = 'c')
+    except (OSError, ValueError):
+        return None
+    try:
+        os.utime(cache_path)	# Record use for removing least recently used.
+    except OSError:
+        pass
+    return pae
+
+# -----------------------------------------------------------------------------
+#
+def _cache_pae_matrix(path, pae):
+    cache_path = _pae_cache_path(path)
+    if cache_path is None:
+        return
+    import numpy, os
+    cache_dir = os.path.dirname(cache_path)
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(cache_dir, exist_ok = True)
+        with open(temp_path, 'wb') as f:
+            numpy.save(f, pae)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return
+    _limit_pae_cache_size(cache_dir, pae_cache_max_size)
+
+# -----------------------------------------------------------------------------
+#
+def _limit_pae_cache_size(cache_dir, max_size):
+    import os
+    files = []
+    for e in os.scandir(cache_dir):
+        if e.name.startswith('pae_') and e.name.endswith('.npy'):
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, e.path))
+    files.sort(reverse = True)	# Most recently used first
+    size = 0
+    for mtime, fsize, fpath in files:
+        size += fsize
+        if size > max_size:
+            try:
+                os.remove(fpath)
+            except OSError:
+                pass
+
 # -----------------------------------------------------------------------------
 #
 def read_numpy_pae_matrix(path):
@@ -0,0 +1,76 @@
+import json
+
+import numpy
+import pytest
+
+n = 20
+_rng = numpy.random.default_rng(0)
+_pae = (_rng.random((n, n)) * 31.75).round(2)
+_i, _j = numpy.meshgrid(numpy.arange(1, n + 1), numpy.arange(1, n + 1), indexing="ij")
+
+layouts = {
+    "colabfold": {"plddt": [90.0] * n, "max_pae": 31.75, "pae": _pae.tolist(), "ptm": 0.5},
+    "alphafold3": {
+        "atom_chain_ids": ["A"] * 3,
+        "contact_probs": [[0.1, 0.2], [0.3, 0.4]],
+        "pae": (_rng.random((n, n)) * 30).tolist(),
+        "token_res_ids": list(range(1, n + 1)),
+    },
+    "afdb_v3": [
+        {"predicted_aligned_error": _pae.astype(int).tolist(), "max_predicted_aligned_error": 31.75}
+    ],
+    "afdb_v1": [
+        {
+            "residue1": _i.ravel().tolist(),
+            "residue2": _j.ravel().tolist(),
+            "distance": _pae.ravel().tolist(),
+            "max_predicted_aligned_error": 31.75,
+        }
+    ],
+}
+
+
+@pytest.mark.parametrize("layout", list(layouts.keys()))
+@pytest.mark.parametrize("indent", [None, 1])
+def test_fast_pae_read_matches_json(tmp_path, layout, indent):
+    from chimerax.alphafold.pae import (
+        _fast_read_json_pae_matrix,
+        _read_json_pae_matrix_using_json_module,
+    )
+
+    path = str(tmp_path / "pae.json")
+    with open(path, "w") as f:
+        json.dump(layouts[layout], f, indent=indent)
+    expected = _read_json_pae_matrix_using_json_module(path)
+    pae = _fast_read_json_pae_matrix(path)
+    assert pae is not None
+    assert pae.dtype == expected.dtype
+    assert numpy.array_equal(pae, expected)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"meta": {"pae": [[1, 2], [3, 4]]}}',
+        '[{"x": 1}, {"predicted_aligned_error": [[1]]}]',
+        '{"pae": [[1, 2.3.4], [3, 4]]}',
+        '{"pae": [[1, NaN], [3, 4]]}',
+        '{"pae": [[1, 2], [3]]}',
+        '{"pae": [[1]]]',
+    ],
+)
+def test_fast_pae_read_unsupported(tmp_path, text):
+    from chimerax.alphafold.pae import _fast_read_json_pae_matrix
+
+    path = tmp_path / "pae.json"
+    path.write_text(text)
+    assert _fast_read_json_pae_matrix(str(path)) is None
+
+
+def test_fast_pae_read_uses_top_level_key(tmp_path):
+    from chimerax.alphafold.pae import _fast_read_json_pae_matrix
+
+    path = tmp_path / "pae.json"
+    path.write_text('{"note": "\\"pae\\": [[9]]", "meta": {"pae": [[9]]}, "pae": [[1, 2], [3, 4]]}')
+    pae = _fast_read_json_pae_matrix(str(path))
+    assert numpy.array_equal(pae, [[1, 2], [3, 4]])
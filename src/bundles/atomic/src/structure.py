@@ -81,6 +81,7 @@ class Structure(Model, StructureData):
         self._chain_trace_pbgroup = None
         self._ribbons_drawing = None
         self._ring_drawing = None
+        self._atomspec_index = None
 
         self._ses_handlers = []
         t = self.session.triggers
@@ -929,14 +930,14 @@ class Structure(Model, StructureData):
     def _atomspec_filter_chain(self, atoms, num_atoms, parts, attrs):
         # print("Structure._atomspec_filter_chain", num_atoms, parts, attrs)
         import numpy
-        chain_ids = atoms.residues.chain_ids
         if not parts:
             selected = numpy.ones(num_atoms, dtype=numpy.bool_)
         else:
+            chain_ids, codes = self._atomspec_names().residue_values(atoms, 'chain_ids')
             selected = numpy.zeros(num_atoms, dtype=numpy.bool_)
             for part in parts:
                 choose = part.string_matcher(self.lower_case_chains)
-                s = numpy.vectorize(choose)(chain_ids)
+                s = _atomspec_name_mask(choose, chain_ids, codes)
                 selected = numpy.logical_or(selected, s)
         if attrs:
             chains = self.chains
@@ -957,11 +958,32 @@ class Structure(Model, StructureData):
 
     def _atomspec_attr_filter(self, objects, selected, attrs):
         import numpy
+        selected = numpy.array(selected, dtype=numpy.bool_)
         for attr in attrs:
-            choose = attr.attr_matcher()
-            selected = [(selected[i] and choose(obj)) for i, obj in enumerate(objects)]
-        return numpy.array(selected)
+            # Only test objects still selected
+            indices = numpy.nonzero(selected)[0]
+            if len(indices) == 0:
+                break
+            subset = objects if len(indices) == len(objects) else objects[indices]
+            values = _atomspec_attr_values(subset, attr.name)
+            if values is None:
+                choose = attr.attr_matcher()
+                s = [choose(obj) for obj in subset]
+            else:
+                s = attr.values_mask(values)
+            selected[indices] = s
+        return selected
 
+    def _atomspec_names(self):
+        # Changes not yet reported by the 'changes' trigger may include renames, so
+        # rebuild the index then.  Triggers are not fired from here since handlers
+        # could change the structure while the atom spec is evaluated.
+        ct = getattr(self.session, 'change_tracker', None)
+        if ct is not None and ct.changed and self._atomspec_index is not None:
+            self._atomspec_index.clear()
+        if self._atomspec_index is None:
+            self._atomspec_index = _AtomspecNameIndex(self)
+        return self._atomspec_index
 
     def _atomspec_filter_residue(self, atoms, num_atoms, parts, attrs):
         # print("Structure._atomspec_filter_residue", num_atoms, parts, attrs)
@@ -970,23 +992,23 @@ class Structure(Model, StructureData):
             # No residue specifier, choose everything
             selected = numpy.ones(num_atoms, dtype=numpy.bool_)
         else:
-            res_names = numpy.array(atoms.residues.names)
-            res_numbers = atoms.residues.numbers
-            res_ics = atoms.residues.insertion_codes
+            residues = atoms.residues
+            res_numbers = residues.numbers
+            res_ics = residues.insertion_codes
+            res_names = None
             selected = numpy.zeros(num_atoms, dtype=numpy.bool_)
             for part in parts:
-                choose_id = part.res_id_matcher()
-                if choose_id:
-                    s = numpy.vectorize(choose_id)(res_numbers, res_ics)
+                s = part.res_id_mask(res_numbers, res_ics)
+                if s is not None:
                     if s.any():
                         selected = numpy.logical_or(selected, s)
-                    else:
-                        choose_id = None
-                        # Try using input as name instead of number
-                if not choose_id:
-                    choose_type = part.string_matcher(False)
-                    s = numpy.vectorize(choose_type)(res_names)
-                    selected = numpy.logical_or(selected, s)
+                        continue
+                    # Try using input as name instead of number
+                if res_names is None:
+                    res_names, codes = self._atomspec_names().residue_values(atoms, 'names')
+                choose_type = part.string_matcher(False)
+                s = _atomspec_name_mask(choose_type, res_names, codes)
+                selected = numpy.logical_or(selected, s)
         if attrs:
             selected = self._atomspec_attr_filter(atoms.residues, selected, attrs)
         # print("AtomicStructure._atomspec_filter_residue", selected)
@@ -999,11 +1021,11 @@ class Structure(Model, StructureData):
             # No name specifier, use everything
             selected = numpy.ones(num_atoms, dtype=numpy.bool_)
         else:
-            names = numpy.array(atoms.names)
+            names, codes = self._atomspec_names().atom_names(atoms)
             selected = numpy.zeros(num_atoms, dtype=numpy.bool_)
             for part in parts:
                 choose = part.string_matcher(False)
-                s = numpy.vectorize(choose)(names)
+                s = _atomspec_name_mask(choose, names, codes)
                 selected = numpy.logical_or(selected, s)
         if attrs:
             selected = self._atomspec_attr_filter(atoms, selected, attrs)
@@ -2482,6 +2504,111 @@ def _selected_bond_cylinders(bonds):
 
 # -----------------------------------------------------------------------------
 #
+class _AtomspecNameIndex:
+    '''
+    Atom names, residue names and chain identifiers of a structure reduced
+    to the distinct values and an integer code per atom or residue, so atom
+    specifiers test each distinct name once instead of once per atom.
+    Cleared when the structure's atoms, residues or names change.
+    '''
+    def __init__(self, structure):
+        self._structure = structure
+        self._atoms = None          # (Atoms, distinct names, codes)
+        self._residues = None       # Residues the residue codes are for
+        self._residue_values = {}   # Residues attribute -> (distinct values, codes)
+        structure.triggers.add_handler('changes', self._structure_changed)
+
+    def clear(self):
+        self._atoms = None
+        self._residues = None
+        self._residue_values.clear()
+
+    def _structure_changed(self, trigger_name, data):
+        s, changes = data
+        if (changes.num_deleted_atoms() > 0 or changes.num_deleted_residues() > 0
+                or len(changes.created_atoms()) > 0 or len(changes.created_residues()) > 0
+                or 'name changed' in changes.atom_reasons()
+                or 'residues changed' in changes.atom_reasons()
+                or 'name changed' in changes.residue_reasons()
+                or 'chain_id changed' in changes.residue_reasons()):
+            self.clear()
+
+    def atom_names(self, atoms):
+        '''Return distinct atom names and index into them for each atom.'''
+        if self._atoms is None:
+            all_atoms = self._structure.atoms
+            self._atoms = (all_atoms,) + _distinct_values(all_atoms.names)
+        all_atoms, names, codes = self._atoms
+        i = _subset_indices(all_atoms, atoms)
+        if i is None:
+            return names, codes
+        if len(i) > 0 and i.min() < 0:
+            # Atoms added since the index was made.
+            self.clear()
+            return self.atom_names(atoms)
+        return names, codes[i]
+
+    def residue_values(self, atoms, attr_name):
+        '''Return distinct residue names or chain ids and index for each atom.'''
+        if self._residues is None:
+            self._residues = self._structure.residues
+        residues = self._residues
+        if attr_name not in self._residue_values:
+            self._residue_values[attr_name] = _distinct_values(getattr(residues, attr_name))
+        values, codes = self._residue_values[attr_name]
+        i = residues.indices(atoms.residues)
+        if len(i) > 0 and i.min() < 0:
+            self.clear()
+            return self.residue_values(atoms, attr_name)
+        return values, codes[i]
+
+def _distinct_values(values):
+    from numpy import unique, asarray
+    distinct, codes = unique(asarray(values, dtype=str), return_inverse=True)
+    return distinct.tolist(), codes.ravel()
+
+def _subset_indices(all_objects, objects):
+    '''Indices of objects in all_objects, or None if they are identical.'''
+    if len(objects) == len(all_objects):
+        from numpy import array_equal
+        if array_equal(objects.pointers, all_objects.pointers):
+            return None
+    return all_objects.indices(objects)
+
+def _atomspec_name_mask(choose, names, codes):
+    '''Apply string matcher to each distinct name, then expand to a mask.'''
+    from numpy import array, bool_
+    name_mask = array([bool(choose(n)) for n in names], dtype=bool_)
+    return name_mask[codes]
+
+# Collection array properties for attributes commonly used in atom specifiers.
+# Attributes not listed are fetched from each object.
+_atomspec_array_attributes = {
+    'Atoms': {
+        'bfactor': 'bfactors', 'occupancy': 'occupancies', 'serial_number': 'serial_numbers',
+        'radius': 'radii', 'idatm_type': 'idatm_types', 'name': 'names',
+        'draw_mode': 'draw_modes', 'display': 'displays', 'hide': 'hides',
+        'selected': 'selected', 'visible': 'visibles', 'coord_index': 'coord_indices',
+    },
+    'Residues': {
+        'number': 'numbers', 'name': 'names', 'insertion_code': 'insertion_codes',
+        'chain_id': 'chain_ids', 'mmcif_chain_id': 'mmcif_chain_ids',
+        'polymer_type': 'polymer_types', 'ss_type': 'ss_types', 'ss_id': 'ss_ids',
+        'is_helix': 'is_helix', 'is_strand': 'is_strand',
+        'ribbon_display': 'ribbon_displays', 'selected': 'selected',
+    },
+    'Chains': {
+        'chain_id': 'chain_ids',
+    },
+}
+
+def _atomspec_attr_values(objects, attr_name):
+    '''Array of attribute values for a collection, or None if not available.'''
+    attrs = _atomspec_array_attributes.get(objects.__class__.__name__)
+    if attrs is None or attr_name not in attrs:
+        return None
+    return getattr(objects, attrs[attr_name])
+
 def _has_structure_descendant(model):
     for c in model.child_models():
         if c.display and (isinstance(c, Structure) or _has_structure_descendant(c)):
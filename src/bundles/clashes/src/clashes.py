@@ -76,7 +76,41 @@ def find_clashes(session, test_atoms,
        Returns a dictionary keyed on atoms, with values that are
        dictionaries keyed on clashing atom with value being the clash value.
     """
+    clashes = {}
+    atoms1, atoms2, values = find_clash_pairs(session, test_atoms,
+        assumed_max_vdw=assumed_max_vdw, attr_name=attr_name, bond_separation=bond_separation,
+        clash_threshold=clash_threshold, distance_only=distance_only,
+        hbond_allowance=hbond_allowance, ignore_hidden_models=ignore_hidden_models,
+        inter_model=inter_model, inter_submodel=inter_submodel, intra_model=intra_model,
+        intra_res=intra_res, intra_mol=intra_mol, res_separation=res_separation,
+        restrict=restrict)
+    for a1, a2, clash in zip(atoms1, atoms2, values.tolist()):
+        clashes.setdefault(a1, {})[a2] = clash
+        clashes.setdefault(a2, {})[a1] = clash
+    return clashes
 
+def find_clash_pairs(session, test_atoms,
+        assumed_max_vdw=2.1,
+        attr_name=defaults["attr_name"],
+        bond_separation=defaults["bond_separation"],
+        clash_threshold=defaults["clash_threshold"],
+        distance_only=None,
+        hbond_allowance=defaults["clash_hbond_allowance"],
+        ignore_hidden_models=False,
+        inter_model=True,
+        inter_submodel=False,
+        intra_model=True,
+        intra_res=False,
+        intra_mol=True,
+        res_separation=None,
+        restrict="any"):
+    """Same as :func:`find_clashes` but returns a compact result better suited to
+       very large structures.
+
+       Returns a 3-tuple of two Atoms collections and a numpy float64 array of
+       clash values.  Each clashing atom pair is reported once, the i-th atom of
+       the first collection clashing with the i-th atom of the second collection.
+    """
     from chimerax.atomic import Structure
     use_scene_coords = inter_model and len(
         [m for m in session.models if isinstance(m, Structure)]) > 1
@@ -120,115 +154,200 @@ def find_clashes(session, test_atoms,
         test_atoms = test_atoms.filter(test_atoms.structures.visibles == True)
         search_atoms = search_atoms.filter(search_atoms.structures.visibles == True)
 
+    return _clash_pairs(test_atoms, search_atoms, use_scene_coords,
+        assumed_max_vdw, bond_separation, clash_threshold, distance_only, hbond_allowance,
+        inter_model, inter_submodel, intra_model, intra_res, intra_mol, res_separation)
+
+def _clash_pairs(test_atoms, search_atoms, use_scene_coords, assumed_max_vdw, bond_separation,
+        clash_threshold, distance_only, hbond_allowance, inter_model, inter_submodel,
+        intra_model, intra_res, intra_mol, res_separation, chunk_size=50000):
+    """Vectorized clash computation.  All candidate pairs are found with a cell-list search
+       and then culled with numpy masks, rather than looping over atoms in Python.
+    """
+    import numpy
+    from chimerax.atomic import Atoms, structure_atoms
+    if not test_atoms or not search_atoms:
+        return Atoms(), Atoms(), numpy.empty((0,), numpy.float64)
+    # all atoms of the structures involved, so that bond paths through atoms not in
+    # test_atoms or search_atoms are still followed
+    graph_atoms = structure_atoms(test_atoms.merge(search_atoms).unique_structures)
+    n = len(graph_atoms)
+    test_indices = graph_atoms.indices(test_atoms)
+    search_indices = graph_atoms.indices(search_atoms)
+    xyz = graph_atoms.scene_coords if use_scene_coords else graph_atoms.coords
+    radii = graph_atoms.radii.astype(numpy.float64)
+
+    bonds = graph_atoms.intra_bonds
+    b1, b2 = [graph_atoms.indices(ba).astype(numpy.int64) for ba in bonds.atoms]
+    neighbor_starts, neighbor_list = _adjacency(n, b1, b2)
+
+    structures = graph_atoms.unique_structures
+    struct_indices = structures.indices(graph_atoms.structures)
+    allowed_structs = _allowed_structure_pairs(structures, inter_model, intra_model, inter_submodel)
+    residue_ptrs = graph_atoms.residues.pointers
+    if not intra_mol:
+        fragments = _fragment_labels(n, b1, b2)
     if res_separation is not None:
-        chain_pos = {}
-        for s in test_atoms.unique_structures:
-            for c in s.chains:
-                for i, r in enumerate(c.residues):
-                    if r:
-                        chain_pos[r] = i
-    from chimerax.atom_search import AtomSearchTree
-    tree = AtomSearchTree(search_atoms, scene_coords=inter_model)
-    clashes = {}
-    from chimerax.geometry import distance
-    intra_mol_map = {}
-    for a in test_atoms:
+        chain_indices, chain_positions = _chain_positions(graph_atoms, test_atoms.unique_structures)
+    if hbond_allowance and not distance_only:
+        donors, acceptors = _donors_acceptors(graph_atoms, b1, b2)
+
+    if distance_only:
+        cutoffs = numpy.full((n,), distance_only, numpy.float64)
+    else:
+        cutoffs = radii + (assumed_max_vdw - clash_threshold)
+
+    pair_keys = []
+    pair_values = []
+    max_cutoff = cutoffs[test_indices].max()
+    from chimerax.geometry import close_point_pair_blocks
+    for i1, i2, d in close_point_pair_blocks(xyz[test_indices], xyz[search_indices], max_cutoff,
+            chunk_size):
+        a1 = test_indices[i1].astype(numpy.int64)
+        a2 = search_indices[i2].astype(numpy.int64)
+        mask = (d <= cutoffs[a1]) & (a1 != a2)
+        mask &= allowed_structs[struct_indices[a1], struct_indices[a2]]
+        if not intra_res:
+            mask &= residue_ptrs[a1] != residue_ptrs[a2]
+        if not intra_mol:
+            mask &= fragments[a1] != fragments[a2]
+        if res_separation is not None:
+            c1, c2 = chain_indices[a1], chain_indices[a2]
+            same_chain = (c1 >= 0) & (c1 == c2)
+            mask &= ~(same_chain & (abs(chain_positions[a1] - chain_positions[a2]) < res_separation))
         if distance_only:
-            cutoff = distance_only
+            clash = distance_only - d
+            mask &= clash >= 0.0
         else:
-            cutoff = a.radius + assumed_max_vdw - clash_threshold
-        crd = a.scene_coord if use_scene_coords else a.coord
-        nearby = tree.search(crd, cutoff)
-        if not nearby:
-            continue
-        need_expansion = [a]
-        exclusions = set(need_expansion)
-        for i in range(bond_separation):
-            next_need = []
-            for expand in need_expansion:
-                for n in expand.neighbors:
-                    if n in exclusions:
-                        continue
-                    exclusions.add(n)
-                    next_need.append(n)
-            need_expansion = next_need
-        if not intra_mol and a not in intra_mol_map:
-            connected = set([a])
-            to_do = list(a.neighbors)
-            while to_do:
-                conn = to_do.pop()
-                connected.add(conn)
-                for nb in conn.neighbors:
-                    if nb not in connected:
-                        to_do.append(nb)
-            for ca in connected:
-                intra_mol_map[ca] = connected
-        for nb in nearby:
-            if nb in exclusions:
-                continue
-            if not intra_res and a.residue == nb.residue:
-                continue
-            if not intra_mol and nb in intra_mol_map[a]:
-                continue
-            if not inter_model and a.structure != nb.structure:
-                continue
-            if not intra_model and a.structure == nb.structure:
-                continue
-            if a in clashes and nb in clashes[a]:
-                continue
-            if res_separation is not None:
-                if a.residue.chain is not None and a.residue.chain == nb.residue.chain:
-                    if abs(chain_pos[a.residue] - chain_pos[nb.residue]) < res_separation:
-                        continue
-            if not inter_submodel \
-            and a.structure.id and nb.structure.id \
-            and a.structure.id[0] == nb.structure.id[0] \
-            and a.structure.id[:-1] == nb.structure.id[:-1] \
-            and a.structure.id[1:] != nb.structure.id[1:]:
-                continue
-            if use_scene_coords:
-                a_crd, nb_crd = a.scene_coord, nb.scene_coord
-            else:
-                a_crd, nb_crd = a.coord, nb.coord
-            if distance_only:
-                clash = distance_only - distance(a_crd, nb_crd)
+            clash = radii[a1] + radii[a2] - d
+            if hbond_allowance:
+                hb = (donors[a1] & acceptors[a2]) | (donors[a2] & acceptors[a1])
+                clash = clash - hbond_allowance * hb
+            mask &= clash >= clash_threshold
+        a1, a2, clash = a1[mask], a2[mask], clash[mask]
+        if bond_separation > 0 and len(a1) > 0:
+            mask = ~_within_bonds(a1, a2, n, bond_separation, neighbor_starts, neighbor_list)
+            a1, a2, clash = a1[mask], a2[mask], clash[mask]
+        pair_keys.append(numpy.minimum(a1, a2) * n + numpy.maximum(a1, a2))
+        pair_values.append(clash)
+    if not pair_keys:
+        return Atoms(), Atoms(), numpy.empty((0,), numpy.float64)
+    keys, first = numpy.unique(numpy.concatenate(pair_keys), return_index=True)
+    values = numpy.concatenate(pair_values)[first]
+    return graph_atoms[keys // n], graph_atoms[keys % n], values
+
+def _adjacency(n, b1, b2):
+    """Compressed sparse row atom adjacency:  neighbors of atom i are
+       neighbor_list[neighbor_starts[i]:neighbor_starts[i+1]]
+    """
+    import numpy
+    src = numpy.concatenate((b1, b2))
+    dst = numpy.concatenate((b2, b1))
+    order = numpy.argsort(src, kind='stable')
+    neighbor_starts = numpy.zeros((n+1,), numpy.int64)
+    numpy.cumsum(numpy.bincount(src, minlength=n), out=neighbor_starts[1:])
+    return neighbor_starts, dst[order]
+
+def _within_bonds(a1, a2, n, bond_separation, neighbor_starts, neighbor_list):
+    """Boolean mask of atom pairs separated by no more than 'bond_separation' bonds"""
+    import numpy
+    sources = numpy.unique(a1)
+    reached = sources * n + sources
+    frontier_src, frontier_atom = sources, sources
+    for i in range(bond_separation):
+        counts = neighbor_starts[frontier_atom+1] - neighbor_starts[frontier_atom]
+        total = counts.sum()
+        if total == 0:
+            break
+        starts = numpy.repeat(neighbor_starts[frontier_atom] - (numpy.cumsum(counts) - counts), counts)
+        next_atom = neighbor_list[numpy.arange(total) + starts]
+        next_src = numpy.repeat(frontier_src, counts)
+        next_keys = numpy.setdiff1d(next_src * n + next_atom, reached)
+        reached = numpy.union1d(reached, next_keys)
+        frontier_src, frontier_atom = next_keys // n, next_keys % n
+    return numpy.isin(a1 * n + a2, reached)
+
+def _fragment_labels(n, b1, b2):
+    """Label each atom with the lowest index of its covalently connected fragment"""
+    import numpy
+    labels = numpy.arange(n)
+    while True:
+        l1, l2 = labels[b1], labels[b2]
+        differ = l1 != l2
+        if not differ.any():
+            return labels
+        l1, l2 = l1[differ], l2[differ]
+        # hook higher root onto lower root, then compress paths
+        numpy.minimum.at(labels, numpy.maximum(l1, l2), numpy.minimum(l1, l2))
+        while True:
+            compressed = labels[labels]
+            if (compressed == labels).all():
+                break
+            labels = compressed
+
+def _allowed_structure_pairs(structures, inter_model, intra_model, inter_submodel):
+    import numpy
+    ns = len(structures)
+    allowed = numpy.empty((ns, ns), bool)
+    for i, s1 in enumerate(structures):
+        for j, s2 in enumerate(structures):
+            if i == j:
+                allowed[i,j] = intra_model
+            elif not inter_model:
+                allowed[i,j] = False
             else:
-                clash = a.radius + nb.radius - distance(a_crd, nb_crd)
-            if hbond_allowance and not distance_only:
-                if (_donor(a) and _acceptor(nb)) or (_donor(nb) and _acceptor(a)):
-                    clash -= hbond_allowance
-            if distance_only:
-                if clash < 0.0:
-                    continue
-            elif clash < clash_threshold:
-                continue
-            clashes.setdefault(a, {})[nb] = clash
-            clashes.setdefault(nb, {})[a] = clash
-    return clashes
+                allowed[i,j] = inter_submodel or not (s1.id and s2.id and s1.id[0] == s2.id[0]
+                    and s1.id[:-1] == s2.id[:-1] and s1.id[1:] != s2.id[1:])
+    return allowed
+
+def _chain_positions(graph_atoms, structures):
+    """Per-atom chain index (-1 if not in a chain) and residue position in chain"""
+    import numpy
+    from chimerax.atomic import Residues
+    chain_residues = []
+    chain_indices = []
+    positions = []
+    chains = [c for s in structures for c in s.chains]
+    for ci, c in enumerate(chains):
+        for i, r in enumerate(c.residues):
+            if r:
+                chain_residues.append(r)
+                chain_indices.append(ci)
+                positions.append(i)
+    residue_indices = Residues(chain_residues).indices(graph_atoms.residues)
+    # atoms not in a chain get index -1, which picks out the trailing sentinel values
+    chain_indices = numpy.array(chain_indices + [-1], numpy.int64)
+    positions = numpy.array(positions + [0], numpy.int64)
+    return chain_indices[residue_indices], positions[residue_indices]
 
-from chimerax.atomic import Element
-hyd = Element.get_element(1)
-negative = set([Element.get_element(sym) for sym in ["N", "O", "S"]])
 from chimerax.atomic.idatm import type_info
-def _donor(a):
-    if a.element == hyd:
-        if a.num_bonds > 0 and a.neighbors[0].element in negative:
-            return True
-    elif a.element in negative:
+def _donors_acceptors(atoms, b1, b2):
+    """Boolean donor and acceptor masks for 'atoms', given bonded atom index arrays"""
+    import numpy
+    elements = atoms.element_numbers
+    hyd = elements == 1
+    negative = numpy.isin(elements, (7, 8, 16))
+    num_bonds = atoms.num_bonds
+    type_names, type_indices = numpy.unique(atoms.idatm_types, return_inverse=True)
+    substituents = numpy.full((len(type_names),), -1, numpy.int64)
+    acceptor_types = numpy.zeros((len(type_names),), bool)
+    for i, type_name in enumerate(type_names):
         try:
-            if a.num_bonds < type_info[a.idatm_type].substituents:
-                # implicit hydrogen
-                return True
+            info = type_info[type_name]
         except KeyError:
-            pass
-        for nb in a.neighbors:
-            if nb.element == hyd:
-                return True
-    return False
-
-def _acceptor(a):
-    try:
-        info = type_info[a.idatm_type]
-    except KeyError:
-        return False
-    return info.substituents < info.geometry
+            continue
+        substituents[i] = info.substituents
+        acceptor_types[i] = info.substituents < info.geometry
+    acceptors = acceptor_types[type_indices]
+    # implicit hydrogens
+    donors = negative & (num_bonds < substituents[type_indices])
+    # explicit hydrogens
+    bonded_hyd = numpy.zeros((len(atoms),), bool)
+    bonded_neg = numpy.zeros((len(atoms),), bool)
+    bonded_hyd[b1[hyd[b2]]] = True
+    bonded_hyd[b2[hyd[b1]]] = True
+    bonded_neg[b1[negative[b2]]] = True
+    bonded_neg[b2[negative[b1]]] = True
+    donors |= negative & bonded_hyd
+    donors |= hyd & bonded_neg
+    return donors, acceptors
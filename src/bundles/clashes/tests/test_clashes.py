@@ -7,3 +7,17 @@ def test_clashes(test_production_session):
     assert (num_selected := len(selected_atoms(session)) == 43), "Finding clashes in  1www selected %d atoms instead of 43!" % num_selected
     run(session, "contacts #1 restrict both make false sel true")
     assert (num_selected := len(selected_atoms(session)) == 2581), "Finding contacts in 1www selected %d atoms instead of 2581!" % num_selected
+
+def test_clash_pairs(test_production_session):
+    from chimerax.core.commands import run
+    from chimerax.clashes.clashes import find_clashes, find_clash_pairs
+
+    session = test_production_session
+    run(session, "open 1www")
+    atoms = session.models[0].atoms
+    clashes = find_clashes(session, atoms, restrict="both")
+    atoms1, atoms2, values = find_clash_pairs(session, atoms, restrict="both")
+    assert len(atoms1) == len(atoms2) == len(values)
+    assert 2 * len(values) == sum([len(v) for v in clashes.values()])
+    for a1, a2, value in zip(atoms1, atoms2, values):
+        assert clashes[a1][a2] == clashes[a2][a1] == value
@@ -123,6 +123,12 @@ class Opts:
         self.toolshed = None
         self.disable_qt = False
         self.color_scheme = None
+        self.batch = None
+        self.batch_list = None
+        self.batch_output = None
+        self.batch_workers = None
+        self.batch_worker = None
+        self.profile_startup = False
 
 
 def _parse_python_args(argv, usage):
@@ -290,6 +296,28 @@ def _parse_chimerax_args(argv, arguments, usage):
                 print(f"{argv[0]}: unknown color scheme", file=sys.stderr)
                 raise SystemExit(os.EX_USAGE)
             opts.color_scheme = optarg
+        elif opt == "--profile-startup":
+            opts.profile_startup = True
+        elif opt == "--batch":
+            opts.batch = optarg
+            opts.gui = False
+            opts.event_loop = False
+            opts.get_available_bundles = False
+        elif opt == "--batchlist":
+            opts.batch_list = optarg
+        elif opt == "--batchoutput":
+            opts.batch_output = optarg
+        elif opt == "--batchworkers":
+            try:
+                opts.batch_workers = int(optarg)
+            except ValueError:
+                print(f"{argv[0]}: --batchworkers must be an integer", file=sys.stderr)
+                raise SystemExit(os.EX_USAGE)
+        elif opt == "--batchworker":
+            opts.batch_worker = optarg
+            opts.gui = False
+            opts.event_loop = False
+            opts.get_available_bundles = False
         else:
             print("Unknown option: ", opt)
             opts.help = True
@@ -324,6 +352,7 @@ def parse_arguments(argv):
         "--lineprofile",
         "--listioformats",
         "--offscreen",
+        "--profile-startup",
         "--silent",
         "--nostatus",
         "--start <tool name>",
@@ -339,6 +368,10 @@ def parse_arguments(argv):
         "--toolshed preview|<url>",
         "--disable-qt",
         "--color-scheme <light|dark>",
+        "--batch <command template>",
+        "--batchlist <file of input paths>",
+        "--batchoutput <directory>",
+        "--batchworkers <count>",
     ]
     if sys.platform.startswith("win"):
         arguments += ["--console", "--noconsole"]
@@ -360,6 +393,7 @@ def parse_arguments(argv):
         "--status",
         "--tools",
         "--nousedefaults",
+        "--batchworker <job file>",
     ]
 
     # This used to simply import pip, but this breaks new versions of setuptools.
@@ -587,6 +621,15 @@ def init(argv, event_loop=True):
         import warnings
 
         warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    if opts.batch is not None:
+        # Batch runs start worker processes and need no session of their own
+        return run_batch_mode(opts, args)
+
+    from chimerax.core import startup_profile
+
+    if opts.profile_startup:
+        startup_profile.start_profiling()
     if not opts.gui and opts.disable_qt:
         # Disable importing Qt in nogui mode to catch imports that
         # would affect that would break ChimeraX pypi library
@@ -646,6 +689,7 @@ def init(argv, event_loop=True):
         opts.load_tools = False
 
     _set_app_dirs(version)
+    startup_profile.mark("environment setup")
 
     from chimerax.core import session
 
@@ -678,6 +722,7 @@ def init(argv, event_loop=True):
     from chimerax.core import attributes
 
     attributes.RegAttrManager(sess)
+    startup_profile.mark("session creation")
 
     if opts.uninstall:
         return uninstall(sess)
@@ -708,6 +753,7 @@ def init(argv, event_loop=True):
     sess.ui.autostart_tools = opts.load_tools
     if not opts.gui:
         sess.ui.initialize_color_output(opts.color)  # Colored text
+    startup_profile.mark("user interface setup")
 
     # Set current working directory to Desktop when launched from icon.
     if (sys.platform.startswith("darwin") and os.getcwd() == "/") or (
@@ -765,6 +811,7 @@ def init(argv, event_loop=True):
         session=sess,
     )
     sess.toolshed = toolshed.get_toolshed()
+    startup_profile.mark("toolshed initialization")
     if opts.module != "pip" and opts.run_path is None:
         # keep bugs in ChimeraX from preventing pip from working
         if not opts.silent:
@@ -777,6 +824,7 @@ def init(argv, event_loop=True):
         from chimerax.core import undo
 
         sess.undo = undo.Undo(sess, first=True)
+        startup_profile.mark("bundle initialization")
 
     if opts.version >= 0:
         sess.silent = False
@@ -823,6 +871,7 @@ def init(argv, event_loop=True):
             if sess.ui.is_gui and opts.debug:
                 print("Starting main interface", flush=True)
         sess.ui.build()
+        startup_profile.mark("build user interface")
 
     if opts.start_tools:
         if not opts.silent:
@@ -838,6 +887,7 @@ def init(argv, event_loop=True):
                 continue
             start_tools.append(tools[0][1])
         sess.tools.start_tools(start_tools)
+        startup_profile.mark("start tools")
 
     if opts.commands:
         if not opts.silent:
@@ -866,6 +916,8 @@ def init(argv, event_loop=True):
                             sess.logger.report_exception, exc_info=sys.exc_info()
                         )
 
+    startup_profile.mark("startup commands")
+
     if opts.scripts:
         if not opts.silent:
             msg = "Running startup scripts"
@@ -894,6 +946,8 @@ def init(argv, event_loop=True):
             except SystemExit as e:
                 return e.code
 
+    startup_profile.mark("startup scripts")
+
     if not opts.silent:
         if sess.ui.is_gui and opts.debug:
             print("Finished initialization", flush=True)
@@ -959,6 +1013,11 @@ def init(argv, event_loop=True):
             #     remove_python_scripts(chimerax.app_bin_dir)
         return exit.code
 
+    if opts.batch_worker:
+        from chimerax.core.batch import batch_worker
+
+        return batch_worker(sess, opts.batch_worker)
+
     from chimerax.core import startup
 
     startup.run_user_startup_scripts(sess)
@@ -1047,6 +1106,10 @@ def init(argv, event_loop=True):
     # Ticket #6187, some logs (in this case urllib3) are blabbermouths
     disable_external_logs(opts.debug)
 
+    if opts.profile_startup:
+        startup_profile.mark("user startup scripts and input files")
+        report_startup_profile(sess)
+
     # Allow the event_loop to be disabled, so we can be embedded in
     # another application
     if event_loop and opts.event_loop:
@@ -1064,6 +1127,45 @@ def init(argv, event_loop=True):
     return os.EX_OK
 
 
+def report_startup_profile(sess):
+    from chimerax.core import startup_profile
+
+    report = startup_profile.startup_profiler().report()
+    startup_profile.stop_profiling()
+    if sess.ui.is_gui:
+        from html import escape
+
+        sess.logger.info("<pre>%s</pre>" % escape(report), is_html=True)
+    else:
+        sess.logger.info(report)
+
+
+def run_batch_mode(opts, args):
+    from chimerax.core.batch import run_batch, read_path_list
+
+    paths = list(args)
+    if opts.batch_list:
+        try:
+            paths.extend(read_path_list(opts.batch_list))
+        except OSError as e:
+            print(f"Unable to read batch file list: {e}", file=sys.stderr)
+            return os.EX_NOINPUT
+    if not paths:
+        print("No input files given for --batch", file=sys.stderr)
+        return os.EX_USAGE
+    output = opts.batch_output
+    if output is None:
+        output = os.path.join(os.getcwd(), "batch_output")
+    try:
+        results = run_batch(opts.batch, paths, output, opts.batch_workers)
+    except OSError as e:
+        print(f"Batch run failed: {e}", file=sys.stderr)
+        return os.EX_IOERR
+    if any(r.get("status") != "ok" for r in results):
+        return os.EX_SOFTWARE
+    return os.EX_OK
+
+
 def rm_rf_path(path, sess):
     # analogous to "rm -rf path"
     import shutil
@@ -32,6 +32,7 @@ from datetime import datetime, timezone, timedelta
 from PIL import Image
 from .session import _UniqueName
 from .state import FinalizedState
+from .session_chunks import ChunkReference, load_chunk_reference
 import tinyarray
 from tinyarray import ndarray_int, ndarray_float, ndarray_complex
 
@@ -258,6 +259,9 @@ cdef object _encode_ext(object obj):
         return ExtType(14, _pack_as_array(obj.__reduce__()[1]))
     if isinstance(obj, range):
         return ExtType(15, _pack_as_array(obj.__reduce__()[1]))
+    if isinstance(obj, ChunkReference):
+        packer = Packer(**_packer_args)
+        return ExtType(16, packer.pack(obj.info))
 
     raise RuntimeError("Can't convert object of type: %s" % type(obj))
 
@@ -319,6 +323,8 @@ cdef object _decode_ext(int n, bytes buf):
         return _decode_tinyarray(_decode_bytes(buf))
     elif n == 15:
         return range(*_decode_bytes_as_tuple(buf))
+    elif n == 16:
+        return load_chunk_reference(_decode_bytes(buf))
     else:
         raise RuntimeError("Unknown extension type: %d" % n)
 
@@ -0,0 +1,351 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+batch: run commands on many input files with worker processes
+=============================================================
+
+The ChimeraX --batch option runs a command template on each of a list of
+input files.  Several worker ChimeraX processes are started, each of
+which keeps its session between files, closing the session after each
+file, so startup time is paid once per worker rather than once per file.
+Workers claim files one at a time so long and short jobs balance across
+processes.
+
+Each file gets a log file and a JSON result file in the output directory,
+written as soon as that file is done, and a summary of all files is
+written to batch_results.json at the end.  Files that already have a
+result are skipped, so an interrupted batch can be restarted with the
+same options.
+
+The following are replaced in the command template:
+
+    {file}    input file path
+    {name}    input file name without the directory
+    {stem}    input file name without the directory and suffixes
+    {output}  output directory
+    {index}   position of the file in the list, starting at 0
+"""
+
+import os
+import sys
+
+from .logger import PlainTextLog
+
+JOB_FILE = "batch_job.json"
+RESULTS_FILE = "batch_results.json"
+
+
+def batch_items(paths):
+    """Return a list of (path, name) with a unique output name for each path."""
+    items = []
+    used = set()
+    for path in paths:
+        stem = _file_stem(path)
+        name = stem
+        n = 2
+        while name in used:
+            name = "%s_%d" % (stem, n)
+            n += 1
+        used.add(name)
+        items.append((os.path.abspath(path), name))
+    return items
+
+
+def _file_stem(path):
+    name = os.path.basename(path)
+    for suffix in (".gz", ".bz2", ".xz"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return os.path.splitext(name)[0]
+
+
+def read_path_list(list_path):
+    """Read input file paths, one per line, ignoring blank lines and # comments."""
+    with open(list_path) as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def read_commands(commands):
+    """A template ending in .cxc is read from that file, one command per line."""
+    if commands.endswith(".cxc") and os.path.isfile(commands):
+        with open(commands) as f:
+            lines = [line.strip() for line in f]
+        return [line for line in lines if line and not line.startswith("#")]
+    return [commands]
+
+
+def substitute(commands, path, name, output_directory, index):
+    values = {
+        "{file}": path,
+        "{name}": os.path.basename(path),
+        "{stem}": name,
+        "{output}": output_directory,
+        "{index}": str(index),
+    }
+    subst = []
+    for cmd in commands:
+        for key, value in values.items():
+            cmd = cmd.replace(key, value)
+        subst.append(cmd)
+    return subst
+
+
+def run_batch(commands, paths, output_directory, nworkers=None, log=print):
+    """
+    Run commands on each input path using nworkers ChimeraX processes.
+    Returns the list of per-file results, also saved in batch_results.json
+    in the output directory.
+    """
+    import json
+
+    os.makedirs(output_directory, exist_ok=True)
+    output_directory = os.path.abspath(output_directory)
+    items = batch_items(paths)
+    commands = read_commands(commands)
+
+    # Remove claims left by an interrupted run for files without results.
+    todo = 0
+    for path, name in items:
+        if not os.path.exists(_item_path(output_directory, name, ".json")):
+            todo += 1
+            claim = _item_path(output_directory, name, ".claim")
+            if os.path.exists(claim):
+                os.remove(claim)
+
+    job = {
+        "commands": commands,
+        "items": items,
+        "output_directory": output_directory,
+    }
+    job_path = os.path.join(output_directory, JOB_FILE)
+    with open(job_path, "w") as f:
+        json.dump(job, f, indent=1)
+
+    if nworkers is None:
+        from multiprocessing import cpu_count
+
+        nworkers = max(1, cpu_count() // 2)
+    nworkers = max(1, min(nworkers, todo))
+
+    if todo > 0:
+        log(
+            "Running %d of %d files with %d worker processes"
+            % (todo, len(items), nworkers)
+        )
+        _run_workers(job_path, nworkers, output_directory, items, log)
+
+    results = collect_results(output_directory, items)
+    with open(os.path.join(output_directory, RESULTS_FILE), "w") as f:
+        json.dump(results, f, indent=1)
+    failed = [r for r in results if r.get("status") != "ok"]
+    log(
+        "%d files succeeded, %d failed, results in %s"
+        % (len(results) - len(failed), len(failed), output_directory)
+    )
+    return results
+
+
+def _run_workers(job_path, nworkers, output_directory, items, log):
+    import subprocess
+    import time
+
+    command = _worker_command(job_path)
+    procs = []
+    for w in range(nworkers):
+        out = open(os.path.join(output_directory, "worker_%d.log" % (w + 1)), "w")
+        p = subprocess.Popen(
+            command, stdin=subprocess.DEVNULL, stdout=out, stderr=subprocess.STDOUT
+        )
+        procs.append((p, out))
+
+    last_done = None
+    try:
+        while any(p.poll() is None for p, out in procs):
+            time.sleep(2)
+            done = _count_results(output_directory, items)
+            if done != last_done:
+                log("%d of %d files done" % (done, len(items)))
+                last_done = done
+    finally:
+        for p, out in procs:
+            if p.poll() is None:
+                p.terminate()
+                p.wait()
+            out.close()
+    for w, (p, out) in enumerate(procs):
+        if p.returncode != 0:
+            log(
+                "Batch worker %d exited with code %d, see worker_%d.log"
+                % (w + 1, p.returncode, w + 1)
+            )
+
+
+def _worker_command(job_path):
+    exe = os.path.realpath(sys.executable)
+    if "chimerax" in os.path.basename(exe).lower():
+        command = [sys.executable]
+    else:
+        # Python executable, e.g. ChimeraX installed from a wheel.
+        command = [sys.executable, "-m", "chimerax.core"]
+    return command + [
+        "--nogui",
+        "--exit",
+        "--silent",
+        "--nostatus",
+        "--batchworker",
+        job_path,
+    ]
+
+
+def _item_path(output_directory, name, suffix):
+    return os.path.join(output_directory, name + suffix)
+
+
+def _count_results(output_directory, items):
+    return sum(
+        os.path.exists(_item_path(output_directory, name, ".json"))
+        for path, name in items
+    )
+
+
+def collect_results(output_directory, items):
+    """Gather the per-file result files in input order."""
+    import json
+
+    results = []
+    for index, (path, name) in enumerate(items):
+        rpath = _item_path(output_directory, name, ".json")
+        try:
+            with open(rpath) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            result = {"file": path, "index": index, "status": "not run"}
+        results.append(result)
+    return results
+
+
+def _claim(output_directory, name):
+    """Atomically claim a file so only one worker processes it."""
+    if os.path.exists(_item_path(output_directory, name, ".json")):
+        return False
+    try:
+        fd = os.open(
+            _item_path(output_directory, name, ".claim"),
+            os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+        )
+    except FileExistsError:
+        return False
+    os.write(fd, str(os.getpid()).encode())
+    os.close(fd)
+    return True
+
+
+def batch_worker(session, job_path):
+    """Process unclaimed files of a batch job in this session.  Returns exit code."""
+    import json
+
+    with open(job_path) as f:
+        job = json.load(f)
+    commands = job["commands"]
+    output_directory = job["output_directory"]
+    for index, (path, name) in enumerate(job["items"]):
+        if not _claim(output_directory, name):
+            continue
+        result = run_item(session, commands, path, name, output_directory, index)
+        rpath = _item_path(output_directory, name, ".json")
+        with open(rpath + ".tmp", "w") as f:
+            json.dump(result, f, indent=1)
+        os.replace(rpath + ".tmp", rpath)
+        os.remove(_item_path(output_directory, name, ".claim"))
+    return os.EX_OK
+
+
+def run_item(session, commands, path, name, output_directory, index):
+    """Run the commands for one file, logging to a per-file log file."""
+    from time import perf_counter
+    from .commands import run
+
+    cmds = substitute(commands, path, name, output_directory, index)
+    result = {
+        "file": path,
+        "index": index,
+        "commands": cmds,
+        "worker": os.getpid(),
+    }
+    log_path = _item_path(output_directory, name, ".log")
+    t0 = perf_counter()
+    with FileLog(session.logger, log_path):
+        try:
+            for cmd in cmds:
+                run(session, cmd)
+        except Exception:
+            import traceback
+
+            result["status"] = "error"
+            result["error"] = traceback.format_exc()
+            session.logger.info(result["error"])
+        else:
+            result["status"] = "ok"
+    result["time"] = perf_counter() - t0
+    try:
+        run(session, "close session", log=False)
+    except Exception:
+        import traceback
+
+        result["close_error"] = traceback.format_exc()
+    return result
+
+
+class FileLog(PlainTextLog):
+    """Write log messages to a file instead of the other logs."""
+
+    excludes_other_logs = True
+
+    def __init__(self, logger, path):
+        super().__init__()
+        self.logger = logger
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.logger.add_log(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.logger.remove_log(self)
+        self._file.close()
+        self._file = None
+
+    def log(self, level, msg):
+        if level > self.LEVEL_INFO:
+            msg = "%s: %s" % (self.LEVEL_DESCRIPTS[level].upper(), msg)
+        self._file.write(msg)
+        self._file.flush()
+        return True
+
+    def status(self, msg, color, secondary):
+        return True
@@ -801,6 +801,58 @@ class _Part:
                             return ic <= end_ic
         return matcher
 
+    def res_id_mask(self, numbers, insertion_codes):
+        # Vectorized res_id_matcher() for arrays of residue numbers and
+        # insertion codes.  Returns None if this part is not a residue id.
+        # Blank insertion codes sort before any non-blank code.
+        try:
+            start_seq, start_ic = self._parse_as_res_id(self.start, True)
+            if self.end is not None:
+                end_seq, end_ic = self._parse_as_res_id(self.end, False)
+        except (ValueError, IndexError):
+            return None
+        import numpy
+        numbers = numpy.asarray(numbers)
+        ics = numpy.asarray(insertion_codes)
+        if self.end is None:
+            mask = (numbers == start_seq)
+            if mask.any():
+                mask[mask] = (ics[mask] == start_ic)
+            return mask
+        if start_seq is None and end_seq is None:
+            # :start-end
+            return numpy.ones(len(numbers), dtype=numpy.bool_)
+        if start_seq is None:
+            # :start-N
+            mask = (numbers < end_seq)
+        elif end_seq is None:
+            # :N-end
+            mask = (numbers > start_seq)
+        else:
+            # :N-M
+            mask = numpy.logical_and(numbers > start_seq, numbers < end_seq)
+        if start_seq is not None:
+            at_start = (numbers == start_seq)
+            if end_seq is not None and start_seq > end_seq:
+                at_start[:] = False
+            if at_start.any():
+                sics = ics[at_start]
+                if not start_ic:
+                    mask[at_start] = True
+                elif end_seq is None:
+                    mask[at_start] = numpy.logical_and(sics != "", sics <= start_ic)
+                else:
+                    mask[at_start] = (sics >= start_ic)
+        if end_seq is not None:
+            # At N-M with N == M the start insertion code test also applies
+            at_end = (numbers == end_seq)
+            if start_seq is not None:
+                if start_seq >= end_seq:
+                    at_end[:] = False
+            if at_end.any():
+                mask[at_end] = (ics[at_end] <= end_ic)
+        return mask
+
     def _parse_as_res_id(self, n, at_start):
         if at_start:
             if n.lower() == "start":
@@ -854,21 +906,27 @@ class _AttrTest:
             return "%s%s%s" % (self.name, op, self.value)
 
     def attr_matcher(self):
-        import operator
         attr_name = self.name
+        # Objects without the attribute only match "^attr"
+        missing = self.no is not None
+        test = self.value_matcher()
+
+        def matcher(obj):
+            try:
+                v = getattr(obj, attr_name)
+            except AttributeError:
+                return missing
+            return test(v)
+        return matcher
+
+    def value_matcher(self):
+        # Matcher for an attribute value rather than an object
+        import operator
         if self.no is not None:
-            def matcher(obj):
-                try:
-                    v = getattr(obj, attr_name)
-                except AttributeError:
-                    return True
+            def matcher(v):
                 return v is None
         elif self.value is None:
-            def matcher(obj):
-                try:
-                    v = getattr(obj, attr_name)
-                except AttributeError:
-                    return False
+            def matcher(v):
                 return bool(v)
         elif (self.op in (operator.eq, operator.ne, "==", "!==") and
                 isinstance(self.value, str)):
@@ -879,12 +937,8 @@ class _AttrTest:
             if _has_wildcard(self.value):
                 from fnmatch import fnmatchcase
 
-                def matcher(obj):
-                    try:
-                        v = getattr(obj, attr_name)
-                        if v is None:
-                            return False
-                    except AttributeError:
+                def matcher(v):
+                    if v is None:
                         return False
                     try:
                         v = str(v)
@@ -897,12 +951,8 @@ class _AttrTest:
                     matches = fnmatchcase(v, attr_value)
                     return not matches if invert else matches
             else:
-                def matcher(obj):
-                    try:
-                        v = getattr(obj, attr_name)
-                        if v is None:
-                            return False
-                    except AttributeError:
+                def matcher(v):
+                    if v is None:
                         return False
                     try:
                         v = str(v)
@@ -918,16 +968,45 @@ class _AttrTest:
             op = self.op
             attr_value = self.value
 
-            def matcher(obj):
-                try:
-                    v = getattr(obj, attr_name)
-                    if v is None:
-                        return False
-                except AttributeError:
+            def matcher(v):
+                if v is None:
                     return False
                 return op(v, attr_value)
         return matcher
 
+    def values_mask(self, values):
+        # Vectorized value_matcher() for an array of attribute values
+        import numpy
+        values = numpy.asarray(values)
+        if values.ndim == 1 and values.dtype.kind in 'biuf':
+            if self.no is not None:
+                return numpy.zeros(len(values), dtype=numpy.bool_)
+            if self.value is None:
+                return values.astype(numpy.bool_)
+            if callable(self.op) and not isinstance(self.value, str):
+                try:
+                    mask = self.op(values, self.value)
+                except TypeError:
+                    mask = None
+                if (isinstance(mask, numpy.ndarray) and mask.dtype == numpy.bool_
+                        and mask.shape == values.shape):
+                    return mask
+        # Test each distinct value once
+        test = self.value_matcher()
+        cache = {}
+        mask = numpy.empty(len(values), dtype=numpy.bool_)
+        # tolist() gives Python values, as accessing a single attribute does
+        for i, v in enumerate(values.tolist()):
+            try:
+                m = cache[v]
+            except KeyError:
+                m = cache[v] = bool(test(v))
+            except TypeError:
+                # unhashable value
+                m = bool(test(v))
+            mask[i] = m
+        return mask
+
 
 class _SelectorName:
     """Stores a single selector name."""
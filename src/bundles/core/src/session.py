@@ -262,6 +262,7 @@ class _SaveManager:
         self._found_objs = []
         self.unique_name = unique_name
         self.unique_name.reset()
+        self.profiler = None
 
     def cleanup(self):
         # remove references
@@ -278,7 +279,7 @@ class _SaveManager:
                 continue
             try:
                 if sm is None:
-                    self.processed[key] = self.process(value, (key,))
+                    self.processed[key] = self._timed_process(key, value, (key,))
                     self.graph[key] = self._found_objs
                 else:
                     if hasattr(sm, "include_state") and not sm.include_state(value):
@@ -294,7 +295,7 @@ class _SaveManager:
             key = self.unique_name.from_obj(self.session, obj)
             if key not in self.processed:
                 try:
-                    self.processed[key] = self.process(obj, parents)
+                    self.processed[key] = self._timed_process(key, obj, parents)
                 except UserError:
                     raise  # For example map size is larger than 4 Gbyte msgpack limit.
                 except Exception as e:
@@ -303,6 +304,16 @@ class _SaveManager:
                     )
                 self.graph[key] = self._found_objs
 
+    def _timed_process(self, key, obj, parents):
+        if self.profiler is None:
+            return self.process(obj, parents)
+        from time import perf_counter
+
+        t0 = perf_counter()
+        data = self.process(obj, parents)
+        self.profiler.add(key, count=1, snapshot=perf_counter() - t0)
+        return data
+
     def _add_obj(self, obj, parents=()):
         uid = self.unique_name.from_obj(self.session, obj)
         self._found_objs.append(uid)
@@ -701,14 +712,32 @@ class Session:
         """
         self._snapshot_methods.update(methods)
 
-    def save(self, stream, version, include_maps=False):
-        """Serialize session to binary stream."""
+    def save(
+        self,
+        stream,
+        version,
+        include_maps=False,
+        compress="lz4",
+        previous_path=None,
+        profiler=None,
+    ):
+        """Serialize session to binary stream.
+
+        Version 4 files store large arrays in separately compressed chunks,
+        using compression compress ('lz4', 'gzip' or 'none').  Chunks that
+        are unchanged from a version 4 file previous_path are copied from it.
+        If profiler (a session_profile.SessionProfiler) is given, per-class
+        snapshot and serialization times and sizes are added to it.
+        """
         from . import serialize
 
         flags = State.SESSION
         if include_maps:
             flags |= State.INCLUDE_MAPS
         mgr = _SaveManager(self, flags)
+        mgr.profiler = profiler
+        chunks = None
+        counter = None
         self.triggers.activate_trigger("begin save session", self)
         try:
             if version == 1:
@@ -719,14 +748,28 @@ class Session:
                 raise UserError(
                     "Version 2 formatted session files are no longer supported"
                 )
+            elif version == 4:
+                from io import BytesIO
+                from .session_chunks import SessionChunkWriter
+
+                header = b"# ChimeraX Session version 4\n"
+                stream.write(header)
+                chunks = SessionChunkWriter(
+                    stream, len(header), compress, previous_path
+                )
+                state = stream = BytesIO()
             else:
                 if version != 3:
                     raise UserError(
-                        "Only version 3 formatted session files are supported"
+                        "Only version 3 and 4 formatted session files are supported"
                     )
                 stream.write(b"# ChimeraX Session version 3\n")
-                stream = serialize.msgpack_serialize_stream(stream)
-                fserialize = serialize.msgpack_serialize
+            if profiler is not None:
+                from .session_profile import ByteCounter
+
+                stream = counter = ByteCounter(stream)
+            stream = serialize.msgpack_serialize_stream(stream)
+            fserialize = serialize.msgpack_serialize
             metadata = standard_metadata(self.metadata)
             # TODO: put thumbnail in metadata
             # stash attribute info into metadata...
@@ -741,11 +784,32 @@ class Session:
             mgr.discovery(self._state_containers)
             fserialize(stream, mgr.bundle_infos())
             # TODO: collect OrderDAGError exceptions from walk and analyze
+            if profiler is not None:
+                from time import perf_counter
             for name, data in mgr.walk():
+                if profiler is not None:
+                    t0 = perf_counter()
+                    nbytes = counter.count
+                    array_bytes = 0 if chunks is None else chunks.array_bytes
+                if chunks is not None:
+                    data = chunks.replace_arrays(data)
                 fserialize(stream, name)
                 fserialize(stream, data)
+                if profiler is not None:
+                    if chunks is not None:
+                        array_bytes = chunks.array_bytes - array_bytes
+                    profiler.add(
+                        name,
+                        serialize=perf_counter() - t0,
+                        bytes=counter.count - nbytes,
+                        array_bytes=array_bytes,
+                    )
             fserialize(stream, None)
+            if chunks is not None:
+                chunks.finish(state.getbuffer())
         finally:
+            if chunks is not None:
+                chunks.close()
             mgr.cleanup()
             self.triggers.activate_trigger("end save session", self)
 
@@ -758,8 +822,13 @@ class Session:
         clear_log=True,
         metadata_only=False,
         combine=False,
+        profiler=None,
     ):
-        """Deserialize session from binary stream."""
+        """Deserialize session from binary stream.
+
+        If profiler (a session_profile.SessionProfiler) is given, per-class
+        read and restore times and sizes are added to it.
+        """
         from . import serialize
 
         if hasattr(stream, "peek"):
@@ -774,6 +843,7 @@ class Session:
         if len(first_byte) == 0:
             raise UserError("Can not open empty session file")
         use_pickle = first_byte[0] != ord(b"#")
+        chunk_reader = None
         if use_pickle:
             try:
                 version = serialize.pickle_deserialize(stream)
@@ -803,9 +873,50 @@ class Session:
                 )
             elif version == 3:
                 stream = serialize.msgpack_deserialize_stream(stream)
+            elif version == 4:
+                from .session_chunks import SessionChunkReader
+
+                try:
+                    chunk_reader = SessionChunkReader(stream)
+                except ValueError as e:
+                    raise UserError(str(e))
+                stream = serialize.msgpack_deserialize_stream(
+                    chunk_reader.state_stream()
+                )
             else:
                 raise UserError("need newer version of ChimeraX to restore session")
             fdeserialize = serialize.msgpack_deserialize
+        args = (
+            stream,
+            fdeserialize,
+            version,
+            path,
+            resize_window,
+            restore_camera,
+            clear_log,
+            metadata_only,
+            combine,
+            profiler,
+        )
+        if chunk_reader is None:
+            return self._restore_state(*args)
+        # Large arrays are read from chunks as the state is deserialized.
+        with chunk_reader.reading():
+            return self._restore_state(*args)
+
+    def _restore_state(
+        self,
+        stream,
+        fdeserialize,
+        version,
+        path,
+        resize_window,
+        restore_camera,
+        clear_log,
+        metadata_only,
+        combine,
+        profiler,
+    ):
         metadata = fdeserialize(stream)
         if metadata is None:
             raise UserError("corrupt session file (missing metadata)")
@@ -838,12 +949,31 @@ class Session:
             self.session_file_path = path
             self.metadata.update(metadata)
             attr_info = self.metadata.pop("attr_info", {})
+            if profiler is not None:
+                from time import perf_counter
+            timing = None
             while True:
+                if profiler is not None:
+                    t0 = perf_counter()
+                    if timing is not None:
+                        # Record previous object now that it is restored.
+                        pname, read_time, nbytes, t1 = timing
+                        profiler.add(
+                            pname,
+                            count=1,
+                            read=read_time,
+                            restore=t0 - t1,
+                            bytes=nbytes,
+                        )
+                    pos = stream.tell()
                 name = fdeserialize(stream)
                 if name is None:
                     break
                 data = fdeserialize(stream)
                 data = mgr.resolve_references(data)
+                if profiler is not None:
+                    t1 = perf_counter()
+                    timing = (name, t1 - t0, stream.tell() - pos, t1)
                 if isinstance(name, str):
                     if attr_info.get(name, False):
                         setattr(self, name, data)
@@ -1001,17 +1131,44 @@ def standard_metadata(previous_metadata={}):
     return metadata
 
 
-def save(session, path, version=3, compress="lz4", include_maps=False):
+def save(
+    session,
+    path,
+    version=3,
+    compress="lz4",
+    include_maps=False,
+    chunked=False,
+    profile=False,
+    profile_file=None,
+):
     """
     Command line version of saving a session.
 
     Option compress can be lz4 (default), gzip, or None.
     Tests saving 3j3z show lz4 is as fast as uncompressed and 4x smaller file size,
     and gzip is 2.5 times slower with 7x smaller file size.
+
+    If chunked is true a version 4 session file is written with large arrays
+    compressed in parallel as separate chunks, and chunks unchanged since the
+    last chunked save to the same file are copied instead of compressed again.
+
+    If profile is true or profile_file is given, the time and size of the
+    state of each class of saved object is reported, see session_profile.
     """
+    previous_path = None
+    profiler = None
+    if profile or profile_file:
+        from .session_profile import SessionProfiler
+
+        profiler = SessionProfiler("save")
+    open_func = None
+    if chunked:
+        version = 4
     if hasattr(path, "write"):
         # called via export, it's really a stream
         output = path
+        if version == 4:
+            raise UserError("Chunked session files can only be saved to a file")
     else:
         from os.path import expanduser
 
@@ -1019,7 +1176,14 @@ def save(session, path, version=3, compress="lz4", include_maps=False):
         if not path.endswith(SESSION_SUFFIX):
             path += SESSION_SUFFIX
 
-        if compress is None or compress == "none":
+        if version == 4:
+            from .safesave import SaveBinaryFile
+            from .session_chunks import is_chunked_session
+
+            open_func = SaveBinaryFile
+            if is_chunked_session(path):
+                previous_path = path
+        elif compress is None or compress == "none":
             from .safesave import SaveBinaryFile
 
             open_func = SaveBinaryFile
@@ -1050,7 +1214,14 @@ def save(session, path, version=3, compress="lz4", include_maps=False):
 
     session.session_file_path = path
     try:
-        session.save(output, version=version, include_maps=include_maps)
+        session.save(
+            output,
+            version=version,
+            include_maps=include_maps,
+            compress=compress,
+            previous_path=previous_path,
+            profiler=profiler,
+        )
     except Exception:
         if open_func is not None:
             output.close("exceptional")
@@ -1060,6 +1231,11 @@ def save(session, path, version=3, compress="lz4", include_maps=False):
         if open_func is not None:
             output.close()
 
+    if profiler is not None:
+        from .session_profile import report_profile
+
+        report_profile(session, profiler, profile_file)
+
     # Associate thumbnail image with session file for display by operating system file browser.
     from . import utils
 
@@ -1108,7 +1284,9 @@ def sdump(session, session_file, output=None):
             from pprint import pprint
         pprint(*args, **kw, width=100)
 
-    with stream:
+    from contextlib import ExitStack
+
+    with stream, ExitStack() as context:
         if hasattr(stream, "peek"):
             use_pickle = stream.peek(1)[0] != ord(b"#")
         else:
@@ -1122,6 +1300,14 @@ def sdump(session, session_file, output=None):
                 raise UserError(
                     "Use UCSF ChimeraX 0.8 for Session file format version 2."
                 )
+            elif version == 4:
+                from .session_chunks import SessionChunkReader
+
+                chunk_reader = SessionChunkReader(stream)
+                context.enter_context(chunk_reader.reading())
+                stream = serialize.msgpack_deserialize_stream(
+                    chunk_reader.state_stream()
+                )
             else:
                 stream = serialize.msgpack_deserialize_stream(stream)
             fdeserialize = serialize.msgpack_deserialize
@@ -1143,7 +1329,9 @@ def sdump(session, session_file, output=None):
             pprint(data, stream=output)
 
 
-def open(session, path, resize_window=None, combine=False):
+def open(
+    session, path, resize_window=None, combine=False, profile=False, profile_file=None
+):
     if hasattr(path, "read"):
         # Given a stream instead of a file name.
         fname = path.name
@@ -1164,10 +1352,25 @@ def open(session, path, resize_window=None, combine=False):
     # TODO: active trigger to allow user to stop overwritting
     # current session
     session.session_file_path = path
+    profiler = None
+    if profile or profile_file:
+        from .session_profile import SessionProfiler
+
+        profiler = SessionProfiler("restore")
     try:
-        session.restore(stream, path=path, resize_window=resize_window, combine=combine)
+        session.restore(
+            stream,
+            path=path,
+            resize_window=resize_window,
+            combine=combine,
+            profiler=profiler,
+        )
     except UserError as ue:
         raise UserError(f"Unable to restore session: {ue}")
+    if profiler is not None:
+        from .session_profile import report_profile
+
+        report_profile(session, profiler, profile_file)
     return [], "opened ChimeraX session"
 
 
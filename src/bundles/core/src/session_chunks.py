@@ -0,0 +1,466 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+session_chunks: chunked session file container
+===============================================
+
+Version 4 session files keep large arrays outside of the msgpack state
+stream.  Each numpy array or bytes object of at least :data:`chunk_min_bytes`
+is replaced in the state by a :class:`ChunkReference` and its data is stored
+in content-hashed chunks that are compressed in parallel.  When a session is
+saved over an earlier version 4 file, chunks whose contents did not change
+are copied from the earlier file without compressing them again.
+
+Uncompressed chunks are aligned in the file so that restoring a session
+can memory-map numpy arrays stored in a single chunk (see
+:data:`map_uncompressed`) instead of reading them.  Bytes objects are read.
+Pages are then only read from disk when the data is used, for instance
+when a map region is first displayed, so models appear sooner and memory
+use does not peak from holding the file data and the restored copies.
+
+File layout::
+
+    # ChimeraX Session version 4\\n
+    chunk data ...           (uncompressed chunks aligned to ALIGNMENT bytes)
+    state stream             (compressed version 3 style msgpack stream)
+    index                    (msgpack dictionary)
+    index offset, "CXSINDEX" (16 byte footer)
+
+The index gives the offset, stored size, compression and uncompressed size
+of the state stream and of every chunk, and for each array the list of
+chunk keys holding its data.
+"""
+
+FOOTER_MAGIC = b"CXSINDEX"
+FORMAT_VERSION = 1
+ALIGNMENT = 4096
+
+chunk_min_bytes = 2**16     # Smaller arrays stay in the state stream
+chunk_block_bytes = 2**24   # Compressed arrays are split into blocks this size
+flush_bytes = 2**28         # Write pending chunks when this much data is waiting
+
+# Restore uncompressed chunks as copy-on-write memory maps of the session file.
+# Not used on Windows where a mapped file cannot be replaced by saving over it.
+import sys
+map_uncompressed = (sys.platform != "win32")
+del sys
+
+
+class ChunkReference:
+    """Stands in for a large array in session state.
+
+    Serialized as a msgpack extension type.  The info dictionary gives the
+    array id used to look up the chunks in the index, and the type, dtype
+    and shape needed to rebuild the array.
+    """
+
+    __slots__ = ("info",)
+
+    def __init__(self, info):
+        self.info = info
+
+
+class SessionChunkWriter:
+    """Write large arrays of a session as separately compressed chunks.
+
+    Parameters
+    ----------
+    stream : writable binary file
+        Output positioned at offset.
+    offset : int
+        Number of bytes already written to stream.
+    compress : 'lz4', 'gzip' or 'none'
+        Compression of chunks and state stream.
+    previous_path : str or None
+        An earlier version 4 session file whose unchanged chunks are copied.
+    """
+
+    def __init__(self, stream, offset, compress="lz4", previous_path=None):
+        if compress is None:
+            compress = "none"
+        if compress not in _compressors:
+            raise ValueError("unknown session chunk compression %r" % compress)
+        self._stream = stream
+        self._offset = offset
+        self.compress = compress
+        self._arrays = []       # array id -> list of chunk keys
+        self._chunks = {}       # key -> [offset, stored size, compression, size]
+        self._pending = []      # (array id, uint8 array or bytes)
+        self._pending_bytes = 0
+        self._previous = None
+        if previous_path is not None:
+            try:
+                f = open(previous_path, "rb")
+            except OSError:
+                pass
+            else:
+                try:
+                    self._previous = SessionChunkReader(f, check_header=True)
+                except ValueError:
+                    f.close()
+        self.array_bytes = 0    # Size of arrays taken out of the state
+        self.reused_bytes = 0
+        self.written_bytes = 0
+
+    def close(self):
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+        self._pending.clear()
+
+    def replace_arrays(self, data):
+        """Return data with large arrays and bytes replaced by ChunkReferences."""
+        import numpy
+        from .state import FinalizedState
+
+        t = type(data)
+        if t is dict:
+            return {k: self.replace_arrays(v) for k, v in data.items()}
+        if t in (list, tuple):
+            return t(self.replace_arrays(v) for v in data)
+        if t is FinalizedState:
+            return FinalizedState(self.replace_arrays(data.data))
+        if t in (bytes, bytearray):
+            if len(data) >= chunk_min_bytes:
+                return self._add_array(bytes(data), {"type": "bytes"})
+            return data
+        if isinstance(data, numpy.ndarray):
+            if (
+                data.nbytes >= chunk_min_bytes
+                and data.dtype.kind != "V"
+                and not data.dtype.hasobject
+            ):
+                info = {
+                    "type": "ndarray",
+                    "dtype": data.dtype.str,
+                    "shape": list(data.shape),
+                }
+                a = numpy.ascontiguousarray(data).reshape(-1).view(numpy.uint8)
+                return self._add_array(a, info)
+            return data
+        # Other container types are rarely large so leave arrays in them inline.
+        return data
+
+    def _add_array(self, data, info):
+        info["id"] = array_id = len(self._arrays)
+        self._arrays.append(None)
+        self._pending.append((array_id, data))
+        self._pending_bytes += len(data)
+        self.array_bytes += len(data)
+        if self._pending_bytes >= flush_bytes:
+            self.flush()
+        return ChunkReference(info)
+
+    def flush(self):
+        """Hash, compress and write pending arrays."""
+        if not self._pending:
+            return
+        compress = self.compress
+        split = chunk_block_bytes if compress != "none" else None
+        blocks = []
+        for array_id, data in self._pending:
+            size = len(data)
+            if split is None or size <= split:
+                blocks.append((array_id, data))
+            else:
+                mv = memoryview(data)
+                for start in range(0, size, split):
+                    blocks.append((array_id, mv[start : start + split]))
+        self._pending = []
+        self._pending_bytes = 0
+
+        previous = self._previous
+        reusable = set()
+        if previous is not None:
+            reusable = set(
+                key
+                for key, entry in previous.chunks.items()
+                if entry[2] == compress
+            )
+        args = [
+            (i, block, compress, reusable) for i, (array_id, block) in enumerate(blocks)
+        ]
+        from .threadq import apply_to_list
+
+        results = apply_to_list(_pack_chunk, args)
+        results.sort(key=lambda r: r[0])
+
+        for (array_id, block), (i, key, packed) in zip(blocks, results):
+            keys = self._arrays[array_id]
+            if keys is None:
+                self._arrays[array_id] = keys = []
+            keys.append(key)
+            if key in self._chunks:
+                continue  # Same data already written in this save
+            if packed is None:
+                packed = previous.stored_chunk(key)
+                self.reused_bytes += len(block)
+            self._chunks[key] = self._write(packed, compress, len(block))
+
+    def _write(self, packed, compression, size):
+        if compression == "none":
+            pad = -self._offset % ALIGNMENT
+            if pad:
+                self._stream.write(b"\0" * pad)
+                self._offset += pad
+        entry = [self._offset, len(packed), compression, size]
+        self._stream.write(packed)
+        self._offset += len(packed)
+        self.written_bytes += len(packed)
+        return entry
+
+    def finish(self, state):
+        """Write remaining chunks, the state stream bytes and the index."""
+        self.flush()
+        compressor = _compressors[self.compress][0]
+        state_entry = self._write(compressor(state), self.compress, len(state))
+        index = {
+            "version": FORMAT_VERSION,
+            "alignment": ALIGNMENT,
+            "state": state_entry,
+            "chunks": self._chunks,
+            "arrays": self._arrays,
+        }
+        import msgpack
+        import struct
+
+        index_offset = self._offset
+        data = msgpack.packb(index, use_bin_type=True)
+        self._stream.write(data)
+        self._stream.write(struct.pack("<Q", index_offset) + FOOTER_MAGIC)
+        self._offset += len(data) + 16
+        self.close()
+
+
+def _pack_chunk(i, block, compress, reusable):
+    from hashlib import blake2b
+
+    key = blake2b(block, digest_size=16).hexdigest()
+    if key in reusable:
+        return i, key, None
+    return i, key, _compressors[compress][0](block)
+
+
+class SessionChunkReader:
+    """Read the index, state stream and arrays of a version 4 session file.
+
+    Parameters
+    ----------
+    stream : seekable binary file
+        The session file.
+    check_header : bool
+        Check that the file starts with the version 4 session header.
+    """
+
+    def __init__(self, stream, check_header=False):
+        import msgpack
+        import struct
+
+        self._stream = stream
+        if check_header:
+            stream.seek(0)
+            if stream.readline(256) != b"# ChimeraX Session version 4\n":
+                raise ValueError("not a chunked ChimeraX session file")
+        stream.seek(0, 2)
+        end = stream.tell()
+        if end < 16:
+            raise ValueError("chunked session file is truncated")
+        stream.seek(end - 16)
+        footer = stream.read(16)
+        if footer[8:] != FOOTER_MAGIC:
+            raise ValueError("chunked session file is truncated")
+        (index_offset,) = struct.unpack("<Q", footer[:8])
+        stream.seek(index_offset)
+        index = msgpack.unpackb(
+            stream.read(end - 16 - index_offset), raw=False, strict_map_key=False
+        )
+        if index.get("version", 0) > FORMAT_VERSION:
+            raise ValueError("need newer version of ChimeraX to read chunked session")
+        self.index = index
+        self.chunks = index["chunks"]
+        self._arrays = index["arrays"]
+        self._mmap = None
+        self._mapped_keys = set()
+
+    def close(self):
+        self._stream.close()
+
+    def _memory_map(self):
+        if self._mmap is None:
+            import mmap
+
+            try:
+                fileno = self._stream.fileno()
+                # Copy-on-write so restored arrays are writable without
+                # changing the file.
+                self._mmap = mmap.mmap(fileno, 0, access=mmap.ACCESS_COPY)
+            except (AttributeError, OSError, ValueError):
+                self._mmap = False
+        return self._mmap
+
+    def stored_chunk(self, key):
+        """Return the stored (possibly compressed) bytes of a chunk."""
+        offset, stored_size = self.chunks[key][:2]
+        return self._read(offset, stored_size)
+
+    def _read(self, offset, size):
+        self._stream.seek(offset)
+        return self._stream.read(size)
+
+    def state_stream(self):
+        """Return a file-like object with the version 3 style state stream."""
+        from io import BytesIO
+
+        offset, stored_size, compression, size = self.index["state"]
+        data = _compressors[compression][1](self._read(offset, stored_size))
+        return BytesIO(data)
+
+    def load(self, info):
+        """Return the array or bytes for a ChunkReference info dictionary.
+
+        Arrays are writable and not shared with other data.  Bytes are
+        returned as bytes objects, only arrays are memory mapped.
+        """
+        import numpy
+
+        keys = self._arrays[info["id"]]
+        entries = [self.chunks[key] for key in keys]
+        if info["type"] == "bytes" and len(keys) == 1 and entries[0][2] == "none":
+            return self._read(entries[0][0], entries[0][3])
+        if (
+            info["type"] != "bytes"
+            and map_uncompressed
+            and len(keys) == 1
+            and entries[0][2] == "none"
+            and keys[0] not in self._mapped_keys
+        ):
+            mm = self._memory_map()
+            if mm:
+                # Identical arrays share a chunk, map it only once so
+                # changes to one array do not appear in another.
+                self._mapped_keys.add(keys[0])
+                offset, size = entries[0][0], entries[0][3]
+                dtype = numpy.dtype(info["dtype"])
+                a = numpy.frombuffer(mm, dtype, size // dtype.itemsize, offset)
+                return a.reshape(info["shape"])
+        size = sum(entry[3] for entry in entries)
+        data = numpy.empty((size,), numpy.uint8)
+        args = []
+        start = 0
+        for entry in entries:
+            offset, stored_size, compression, block_size = entry
+            stored = self._read(offset, stored_size)
+            args.append((stored, compression, data[start : start + block_size]))
+            start += block_size
+        if len(args) == 1:
+            _unpack_chunk(*args[0])
+        else:
+            from .threadq import apply_to_list
+
+            apply_to_list(_unpack_chunk, args)
+        if info["type"] == "bytes":
+            return data.tobytes()
+        return data.view(numpy.dtype(info["dtype"])).reshape(info["shape"])
+
+    def reading(self):
+        """Context manager that resolves ChunkReferences while deserializing."""
+        return _Reading(self)
+
+
+def _unpack_chunk(stored, compression, out):
+    decompress = _compressors[compression][1]
+    import numpy
+
+    out[:] = numpy.frombuffer(decompress(stored), numpy.uint8)
+
+
+class _Reading:
+
+    def __init__(self, reader):
+        self._reader = reader
+
+    def __enter__(self):
+        global _reader
+        self._previous, _reader = _reader, self._reader
+        return self._reader
+
+    def __exit__(self, *exc):
+        global _reader
+        _reader = self._previous
+
+
+_reader = None
+
+
+def load_chunk_reference(info):
+    """Return array for ChunkReference info while reading a session."""
+    if _reader is None:
+        raise RuntimeError("session array chunk found outside of chunked session")
+    return _reader.load(info)
+
+
+def _no_compression(data):
+    return data
+
+
+def _lz4_compress(data):
+    import lz4.frame
+
+    return lz4.frame.compress(data)
+
+
+def _lz4_decompress(data):
+    import lz4.frame
+
+    return lz4.frame.decompress(data)
+
+
+def _gzip_compress(data):
+    import zlib
+
+    return zlib.compress(data, 6)
+
+
+def _gzip_decompress(data):
+    import zlib
+
+    return zlib.decompress(data)
+
+
+# compression name -> (compress, decompress)
+_compressors = {
+    "none": (_no_compression, _no_compression),
+    "lz4": (_lz4_compress, _lz4_decompress),
+    "gzip": (_gzip_compress, _gzip_decompress),
+}
+
+
+def is_chunked_session(path):
+    """Return whether path is a version 4 (chunked) session file."""
+    try:
+        with open(path, "rb") as f:
+            return f.readline(64) == b"# ChimeraX Session version 4\n"
+    except OSError:
+        return False
@@ -0,0 +1,187 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+session_profile: time and size of session state
+===============================================
+
+Saving a session with "profile true" records, for each bundle and class
+of saved object, the time to take its snapshot, the time to serialize it
+and the number of serialized bytes (before file compression).  Opening
+a session with "profile true" records the time to read, decode and
+restore each object.  The report is logged, slowest first, and can be
+written to a file that can be sorted by any column: tab-separated
+values, or JSON if the file name ends in ".json".
+"""
+
+from time import perf_counter
+
+COLUMNS = {
+    "save": ("count", "snapshot", "serialize", "bytes", "array_bytes"),
+    "restore": ("count", "read", "restore", "bytes"),
+}
+
+
+class SessionProfiler:
+    """Accumulate per-class session save or restore times and sizes.
+
+    Parameters
+    ----------
+    operation : 'save' or 'restore'
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.columns = COLUMNS[operation]
+        self.stats = {}  # (bundle, class) -> {column: value}
+        self._start = perf_counter()
+        self.total_time = None
+
+    def add(self, name, **values):
+        """Add values for columns to the totals for the object name.
+
+        The name is a state manager tag or a session unique name.
+        """
+        key = profile_key(name)
+        stats = self.stats.get(key)
+        if stats is None:
+            self.stats[key] = stats = dict.fromkeys(self.columns, 0)
+        for column, value in values.items():
+            stats[column] += value
+
+    def finish(self):
+        self.total_time = perf_counter() - self._start
+
+    def time(self, key):
+        """Total time for a (bundle, class) key."""
+        stats = self.stats[key]
+        return sum(stats[c] for c in self.columns if c not in _not_times)
+
+    def rows(self):
+        """Return list of (bundle, class, stats) slowest first."""
+        keys = sorted(self.stats, key=self.time, reverse=True)
+        return [(b, c, self.stats[(b, c)]) for b, c in keys]
+
+    def report(self, max_rows=30):
+        """Return text report of the slowest classes."""
+        rows = self.rows()
+        total = self.total_time
+        if total is None:
+            total = perf_counter() - self._start
+        lines = [
+            "Session %s time %.3f seconds, %d classes, slowest first:"
+            % (self.operation, total, len(rows)),
+            "  %8s" % "total"
+            + "".join("%12s" % c for c in self.columns)
+            + "  class",
+        ]
+        for bundle, cls, stats in rows[:max_rows]:
+            cols = "".join(
+                ("%12d" % stats[c]) if c in _not_times else ("%12.3f" % stats[c])
+                for c in self.columns
+            )
+            lines.append(
+                "  %8.3f%s  %s" % (self.time((bundle, cls)), cols, _class_label(bundle, cls))
+            )
+        if len(rows) > max_rows:
+            lines.append("  ... %d more classes" % (len(rows) - max_rows))
+        return "\n".join(lines)
+
+    def json_data(self):
+        return {
+            "operation": self.operation,
+            "total": self.total_time,
+            "classes": [
+                dict(bundle=bundle, cls=cls, time=self.time((bundle, cls)), **stats)
+                for bundle, cls, stats in self.rows()
+            ],
+        }
+
+    def write(self, path):
+        """Write all rows as JSON (.json suffix) or tab-separated values."""
+        if path.endswith(".json"):
+            import json
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.json_data(), f, indent=2)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\t".join(("bundle", "class", "time") + self.columns) + "\n")
+            for bundle, cls, stats in self.rows():
+                values = [bundle, cls, "%.6f" % self.time((bundle, cls))]
+                values.extend(str(stats[c]) for c in self.columns)
+                f.write("\t".join(values) + "\n")
+
+
+_not_times = ("count", "bytes", "array_bytes")
+
+
+def profile_key(name):
+    """Return (bundle, class) for a state manager tag or session unique name."""
+    if isinstance(name, str):
+        return ("", name)  # State manager tag
+    class_name = name.uid[0]
+    if isinstance(class_name, str):
+        if class_name.startswith("builtin "):
+            return ("builtin", class_name[8:])
+        from . import BUNDLE_NAME
+
+        return (BUNDLE_NAME, class_name)
+    return tuple(class_name)
+
+
+def _class_label(bundle, cls):
+    if bundle == "":
+        return "state manager %s" % cls
+    return "%s (%s)" % (cls, bundle)
+
+
+class ByteCounter:
+    """Binary output stream wrapper that counts bytes written."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+        return self.stream.write(data)
+
+
+def report_profile(session, profiler, path=None):
+    """Log the profile report and write it to path if given."""
+    profiler.finish()
+    report = profiler.report()
+    if path is not None:
+        from os.path import expanduser
+
+        path = expanduser(path)
+        profiler.write(path)
+        report += "\nWrote full report to %s" % path
+    if session.ui.is_gui:
+        from html import escape
+
+        session.logger.info("<pre>%s</pre>" % escape(report), is_html=True)
+    else:
+        session.logger.info(report)
@@ -0,0 +1,159 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+startup_profile: time ChimeraX startup
+======================================
+
+When ChimeraX is started with the --profile-startup option the time for
+each startup phase and for each bundle's import, command and selector
+registration, manager and custom initialization, and provider
+registration is recorded and reported when startup finishes.
+
+Bundle step times are exclusive: if initializing one bundle imports
+another bundle through the toolshed, the time for that import is counted
+for the imported bundle, not for the one being initialized.  Plain Python
+imports of other packages are counted in the step that caused them.
+"""
+
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+_profiler = None
+
+
+def start_profiling():
+    """Start recording startup times.  Returns the profiler."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+    return _profiler
+
+
+def stop_profiling():
+    global _profiler
+    _profiler = None
+
+
+def startup_profiler():
+    """Return the active profiler or None if startup is not being profiled."""
+    return _profiler
+
+
+def mark(phase_name):
+    """End a startup phase that began at the previous mark, if profiling."""
+    if _profiler is not None:
+        _profiler.mark(phase_name)
+
+
+def bundle_step(bundle_name, step):
+    """Context manager timing a step for a bundle, if profiling."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.bundle_step(bundle_name, step)
+
+
+class StartupProfiler:
+
+    def __init__(self):
+        self.start_time = self._last_mark = perf_counter()
+        self.phases = []  # (name, seconds) in order
+        self.bundle_times = {}  # bundle name -> {step: seconds}
+        self.bundle_counts = {}  # bundle name -> {step: call count}
+        self._stack = []  # [time of nested steps] for active bundle steps
+
+    def mark(self, phase_name):
+        t = perf_counter()
+        self.phases.append((phase_name, t - self._last_mark))
+        self._last_mark = t
+
+    @contextmanager
+    def bundle_step(self, bundle_name, step):
+        self._stack.append(0.0)
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            total = perf_counter() - t0
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total
+            times = self.bundle_times.setdefault(bundle_name, {})
+            times[step] = times.get(step, 0.0) + total - nested
+            counts = self.bundle_counts.setdefault(bundle_name, {})
+            counts[step] = counts.get(step, 0) + 1
+
+    def total_time(self):
+        return perf_counter() - self.start_time
+
+    def bundle_total(self, bundle_name):
+        return sum(self.bundle_times.get(bundle_name, {}).values())
+
+    def steps(self):
+        steps = []
+        for times in self.bundle_times.values():
+            for step in times:
+                if step not in steps:
+                    steps.append(step)
+        return steps
+
+    def report(self, max_bundles=30):
+        """Return text report of phase and per-bundle times."""
+        lines = ["Startup time %.3f seconds" % self.total_time(), "", "Phases:"]
+        for name, t in self.phases:
+            lines.append("  %8.3f  %s" % (t, name))
+        bundles = sorted(self.bundle_times, key=self.bundle_total, reverse=True)
+        steps = self.steps()
+        if bundles:
+            total = sum(self.bundle_total(b) for b in bundles)
+            lines.extend(
+                [
+                    "",
+                    "Bundles (%d, %.3f seconds total), slowest first:"
+                    % (len(bundles), total),
+                    "  %8s  " % "total"
+                    + "".join("%10s" % s[:10] for s in steps)
+                    + "  bundle",
+                ]
+            )
+            for b in bundles[:max_bundles]:
+                times = self.bundle_times[b]
+                cols = "".join(
+                    ("%10.3f" % times[s]) if s in times else "%10s" % "-"
+                    for s in steps
+                )
+                lines.append("  %8.3f  %s  %s" % (self.bundle_total(b), cols, b))
+            if len(bundles) > max_bundles:
+                lines.append("  ... %d more bundles" % (len(bundles) - max_bundles))
+        return "\n".join(lines)
+
+    def json_data(self):
+        return {
+            "total": self.total_time(),
+            "phases": [{"name": n, "time": t} for n, t in self.phases],
+            "bundles": {
+                b: {"times": self.bundle_times[b], "counts": self.bundle_counts[b]}
+                for b in self.bundle_times
+            },
+        }
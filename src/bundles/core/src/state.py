@@ -256,7 +256,11 @@ def dereference_state(data, convert, convert_cls):
             items = [(_copy(k), _copy(v)) for k, v in data.items()]
         elif isinstance(data, numpy.ndarray):
             if data.dtype != object:
-                return data.copy()
+                # Arrays decoded from msgpack are read-only views of the
+                # message buffer.  Writable arrays come from chunked session
+                # storage, are not shared, and may be memory maps that
+                # should not be read in by copying.
+                return data if data.flags.writeable else data.copy()
             a = numpy.array([_copy(o) for o in data.flat], dtype=object)
             a.shape = data.shape
             return a
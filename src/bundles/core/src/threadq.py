@@ -9,6 +9,7 @@
 # or derivations thereof.
 # === UCSF ChimeraX Copyright ===
 
+import sys
 import threading
 class WorkThread(threading.Thread):
     """Run a function in a thread."""
@@ -34,8 +35,29 @@ class WorkThread(threading.Thread):
             self.out_queue.put(r)
             self.in_queue.task_done()
 
+# Start method for worker processes.  Forking a process that runs
+# OpenGL and Qt threads is unsafe so new interpreters are spawned.
+process_start_method = 'spawn'
+
+# NumPy arrays at least this many bytes are passed to and from worker
+# processes through shared memory instead of being pickled.
+shared_array_min_bytes = 2**16
+
 # List of return values does not match args ordering.
-def apply_to_list(func, args, nthread = None):
+def apply_to_list(func, args, nthread = None, nproc = None):
+    """
+    Call func(*a) for each tuple a in args in parallel and return the
+    list of results.  With threads (the default) this only runs faster
+    if func releases the Python global interpreter lock, for instance
+    in C++ code.  If the caller gives nproc greater than 1 a pool of
+    worker processes is used instead, which also speeds up pure Python
+    code.  Then func must be a module level function, arguments and
+    return values must be picklable, and large NumPy arrays are passed
+    through shared memory.  Changes func makes to its arguments are not
+    seen by the caller.  Results from processes are in args order.
+    """
+    if nproc is not None and nproc > 1 and len(args) > 1:
+        return apply_to_list_in_processes(func, args, nproc)
 
     if nthread is None:
         from multiprocessing import cpu_count
@@ -71,3 +93,142 @@ def apply_to_list(func, args, nthread = None):
         results.append(r)
 
     return results
+
+def apply_to_list_in_processes(func, args, nproc):
+    """Call func(*a) for each a in args using nproc worker processes."""
+    pool = process_pool(nproc)
+    segments = []
+    results = []
+    error = None
+    try:
+        jobs = [pool.submit(_process_call, func, _share_arrays(a, segments))
+                for a in args]
+        for job in jobs:
+            try:
+                r = job.result()
+            except Exception as e:
+                r = None
+                if error is None:
+                    error = e
+            results.append(_copy_shared_arrays(r))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    if error is not None:
+        raise error
+    return results
+
+_pool = None
+def process_pool(nproc):
+    """
+    Return a concurrent.futures.ProcessPoolExecutor with nproc workers.
+    The pool is kept for later calls since starting processes is slow.
+    """
+    global _pool
+    if _pool is not None:
+        pool, n, method = _pool
+        if n == nproc and method == process_start_method:
+            return pool
+        pool.shutdown(wait = False)
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    context = multiprocessing.get_context(process_start_method)
+    pool = ProcessPoolExecutor(max_workers = nproc, mp_context = context)
+    _pool = (pool, nproc, process_start_method)
+    return pool
+
+def shutdown_process_pool():
+    """Stop the worker processes used by apply_to_list()."""
+    global _pool
+    if _pool is not None:
+        _pool[0].shutdown()
+        _pool = None
+
+class _SharedArray:
+    """Stand-in for a NumPy array copied to shared memory, sent by pickling."""
+    def __init__(self, array, segments):
+        from multiprocessing.shared_memory import SharedMemory
+        shm = SharedMemory(create = True, size = max(1, array.nbytes))
+        segments.append(shm)
+        self.name = shm.name
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self.view(shm)[...] = array
+
+    def view(self, shm):
+        from numpy import ndarray
+        return ndarray(self.shape, self.dtype, buffer = shm.buf)
+
+    def attach(self, track = True):
+        from multiprocessing.shared_memory import SharedMemory
+        if track:
+            return SharedMemory(name = self.name)
+        if sys.version_info >= (3, 13):
+            return SharedMemory(name = self.name, track = False)
+        # Before Python 3.13 attaching always registers the memory with the
+        # resource tracker, so it is unlinked or reported leaked a second time.
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return SharedMemory(name = self.name)
+        finally:
+            resource_tracker.register = register
+
+def _share_arrays(value, segments):
+    """Replace large NumPy arrays in nested tuples, lists and dicts."""
+    t = type(value)
+    if t in (tuple, list):
+        return t(_share_arrays(v, segments) for v in value)
+    if t is dict:
+        return {k:_share_arrays(v, segments) for k,v in value.items()}
+    from numpy import ndarray
+    if (t is ndarray and value.nbytes >= shared_array_min_bytes
+        and not value.dtype.hasobject):
+        return _SharedArray(value, segments)
+    return value
+
+def _map_shared_arrays(value, array_func):
+    t = type(value)
+    if t in (tuple, list):
+        return t(_map_shared_arrays(v, array_func) for v in value)
+    if t is dict:
+        return {k:_map_shared_arrays(v, array_func) for k,v in value.items()}
+    if t is _SharedArray:
+        return array_func(value)
+    return value
+
+def _copy_shared_arrays(value):
+    """Copy result arrays out of shared memory and free the memory."""
+    def copy(sa):
+        shm = sa.attach()
+        a = sa.view(shm).copy()
+        shm.close()
+        shm.unlink()
+        return a
+    return _map_shared_arrays(value, copy)
+
+def _process_call(func, args):
+    """Run func in a worker process using arrays in shared memory in place."""
+    segments = []
+    def attach(sa):
+        # The calling process created and will unlink argument memory.
+        shm = sa.attach(track = False)
+        segments.append(shm)
+        return sa.view(shm)
+    args = _map_shared_arrays(args, attach)
+    r = func(*args)
+    del args
+    # Result arrays are copied to new shared memory which the calling
+    # process frees after reading.
+    result_segments = []
+    r = _share_arrays(r, result_segments)
+    for shm in result_segments:
+        shm.close()
+    for shm in segments:
+        try:
+            shm.close()
+        except BufferError:
+            pass    # func kept a reference to an argument array
+    return r
@@ -955,11 +955,14 @@ class Toolshed:
         else:
             all_bundles = self._installed_bundle_info
         self._manager_instances[mgr.name] = mgr
+        from ..startup_profile import bundle_step
+
         for pbi in all_bundles:
             for name, kw in pbi.providers.items():
                 p_mgr, pvdr = name.split("/", 1)
                 if p_mgr == mgr.name:
-                    mgr.add_provider(pbi, pvdr, **kw)
+                    with bundle_step(pbi.name, "providers"):
+                        mgr.add_provider(pbi, pvdr, **kw)
         mgr.end_providers()
 
     def import_bundle(self, bundle_name, logger, install="ask", session=None):
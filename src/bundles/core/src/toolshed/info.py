@@ -298,8 +298,10 @@ class BundleInfo:
             Where to log error messages.
         """
         _debug("register bundle", self._name, self._version)
-        self._register_commands(logger)
-        self._register_selectors(logger)
+        from ..startup_profile import bundle_step
+        with bundle_step(self._name, "register"):
+            self._register_commands(logger)
+            self._register_selectors(logger)
 
     def deregister(self, logger):
         """Supported API. Deregister bundle commands, tools, data formats, selectors, etc.
@@ -371,9 +373,11 @@ class BundleInfo:
     def initialize(self, session):
         """Supported API. Initialize bundle by calling custom initialization code if needed."""
         if self.custom_init:
+            from ..startup_profile import bundle_step
             try:
                 api = self._get_api(session.logger)
-                api._api_caller.initialize(api, session, self)
+                with bundle_step(self._name, "init"):
+                    api._api_caller.initialize(api, session, self)
             except Exception as e:
                 import traceback
                 session.logger.warning(traceback.format_exc())
@@ -382,9 +386,11 @@ class BundleInfo:
 
     def init_manager(self, session, name, **kw):
         """Supported API. Initialize bundle manager if needed."""
+        from ..startup_profile import bundle_step
         try:
             api = self._get_api(session.logger)
-            return api._api_caller.init_manager(api, session, self, name, **kw)
+            with bundle_step(self._name, "manager"):
+                return api._api_caller.init_manager(api, session, self, name, **kw)
         except Exception as e:
             import traceback
             session.logger.warning(traceback.format_exc())
@@ -497,8 +503,10 @@ class BundleInfo:
             if not force_import:
                 return None
         import importlib
+        from ..startup_profile import bundle_step
         try:
-            m = importlib.import_module(self.package_name)
+            with bundle_step(self._name, "import"):
+                m = importlib.import_module(self.package_name)
         except Exception as e:
             raise ToolshedError("Error importing bundle %s's module: %s" % (self.name, str(e)))
         return m
@@ -167,7 +167,10 @@ class InstalledBundleCache(list):
                         if not isinstance(data[0], str):
                             _debug("InstalledBundleCache._read_cache: obsolete cache")
                             return None  # obsolete cache format
-                        executable, mtime = data
+                        if len(data) != 3:
+                            _debug("InstalledBundleCache._read_cache: obsolete cache")
+                            return None
+                        executable, mtime, path_mtimes = data
                         if executable != sys.executable:
                             _debug("InstalledBundleCache._read_cache: different executable")
                             return None
@@ -176,6 +179,10 @@ class InstalledBundleCache(list):
                             return None
                         if not self._is_cache_newer(cache_file):
                             return None
+                        if path_mtimes != _path_mtimes():
+                            # Packages installed or removed outside ChimeraX
+                            _debug("InstalledBundleCache._read_cache: changed sys.path directories")
+                            return None
                         data = json.load(f)
                     self.extend([BundleInfo.from_cache_data(x) for x in data])
                     _debug("InstalledBundleCache._read_cache: %d bundles" % len(self))
@@ -226,7 +233,8 @@ class InstalledBundleCache(list):
                 logger.error("\"%s\": %s" % (cache_file, str(e)))
             else:
                 with f:
-                    data = [sys.executable, os.path.getmtime(sys.executable)]
+                    data = [sys.executable, os.path.getmtime(sys.executable),
+                            _path_mtimes()]
                     json.dump(data, f, ensure_ascii=False)
                     print(file=f)
                     json.dump([bi.cache_data() for bi in self], f,
@@ -330,6 +338,43 @@ class InstalledBundleCache(list):
 #
 
 
+def _path_mtimes():
+    """Modification times of site-packages directories on sys.path.
+
+    Installing or removing a distribution changes the modification time of
+    the directory holding its metadata, so a change here means the bundle
+    cache may be out of date even if ChimeraX did not do the install.
+    Other sys.path entries, such as the current or script directory, change
+    often and do not hold installed bundles so they are not included."""
+    import os
+    import sys
+    mtimes = []
+    for path in sys.path:
+        if not _is_site_packages(path):
+            continue
+        try:
+            mtimes.append([path, os.path.getmtime(path)])
+        except OSError:
+            pass
+    return mtimes
+
+
+def _is_site_packages(path):
+    """Whether a sys.path directory is where distributions are installed."""
+    import os
+    import site
+    if not path or not os.path.isdir(path):
+        return False
+    if os.path.basename(os.path.normpath(path)) in ('site-packages', 'dist-packages'):
+        return True
+    site_dirs = list(getattr(site, 'getsitepackages', lambda: [])())
+    user_site = getattr(site, 'getusersitepackages', lambda: None)()
+    if user_site:
+        site_dirs.append(user_site)
+    path = os.path.realpath(path)
+    return any(os.path.realpath(d) == path for d in site_dirs)
+
+
 def _extract_extra_keywords(kwds):
     result = {}
     if isinstance(kwds, str):
@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+
+def test_batch_items_unique_names():
+    from chimerax.core.batch import batch_items
+
+    items = batch_items(["a/x.pdb", "b/x.pdb.gz", "c/y.cif", "d/x.cif"])
+    assert [name for path, name in items] == ["x", "x_2", "y", "x_3"]
+    assert all(os.path.isabs(path) for path, name in items)
+
+
+def test_batch_substitute():
+    from chimerax.core.batch import substitute
+
+    cmds = substitute(
+        ["open {file}", "save {output}/{stem}_{index}.png"], "/data/x.pdb", "x", "/out", 3
+    )
+    assert cmds == ["open /data/x.pdb", "save /out/x_3.png"]
+
+
+def test_batch_claim_once(tmp_path):
+    from chimerax.core.batch import _claim
+
+    out = str(tmp_path)
+    assert _claim(out, "x")
+    assert not _claim(out, "x")
+    (tmp_path / "y.json").write_text("{}")
+    assert not _claim(out, "y")
+
+
+def test_batch_worker(test_production_session, tmp_path):
+    from chimerax.core.batch import batch_items, batch_worker, collect_results, JOB_FILE
+
+    out = str(tmp_path / "out")
+    os.makedirs(out)
+    items = batch_items(["good.pdb", "bad.pdb"])
+    job = {
+        "commands": ["version", "{stem}command"],
+        "items": items,
+        "output_directory": out,
+    }
+    job_path = os.path.join(out, JOB_FILE)
+    with open(job_path, "w") as f:
+        json.dump(job, f)
+    # A finished result is not run again.
+    done = {"file": items[0][0], "index": 0, "status": "ok", "previous": True}
+    with open(os.path.join(out, "good.json"), "w") as f:
+        json.dump(done, f)
+
+    assert batch_worker(test_production_session, job_path) == os.EX_OK
+    good, bad = collect_results(out, items)
+    assert good == done
+    assert bad["status"] == "error"
+    assert bad["commands"] == ["version", "badcommand"]
+    assert os.path.getsize(os.path.join(out, "bad.log")) > 0
+    assert not os.path.exists(os.path.join(out, "bad.claim"))
@@ -0,0 +1,114 @@
+import numpy
+import pytest
+
+
+def _write_session(path, state, compress, previous_path=None):
+    from chimerax.core.session_chunks import SessionChunkWriter
+
+    header = b"# ChimeraX Session version 4\n"
+    with open(path, "wb") as f:
+        f.write(header)
+        writer = SessionChunkWriter(f, len(header), compress, previous_path)
+        replaced = writer.replace_arrays(state)
+        writer.finish(b"state stream")
+    return writer, replaced
+
+
+def _load(path, replaced):
+    from chimerax.core.session_chunks import SessionChunkReader, ChunkReference
+
+    reader = SessionChunkReader(open(path, "rb"), check_header=True)
+    assert reader.state_stream().read() == b"state stream"
+    loaded = {
+        k: (reader.load(v.info) if isinstance(v, ChunkReference) else v)
+        for k, v in replaced.items()
+    }
+    return reader, loaded
+
+
+def _is_memory_mapped(a):
+    import mmap
+
+    while isinstance(a, numpy.ndarray):
+        a = a.base
+    return isinstance(a, memoryview) and isinstance(a.obj, mmap.mmap)
+
+
+def _state():
+    rng = numpy.random.default_rng(0)
+    big = rng.random((300, 100))
+    return {
+        "big": big,
+        "same": big.copy(),
+        "ints": numpy.arange(50000, dtype=numpy.int32).reshape((500, 100)),
+        "bytes": bytes(range(256)) * 1000,
+        "small": numpy.arange(10),
+    }
+
+
+@pytest.mark.parametrize("compress", ["none", "gzip"])
+def test_session_chunks_round_trip(tmp_path, monkeypatch, compress):
+    from chimerax.core import session_chunks
+    from chimerax.core.session_chunks import ChunkReference
+
+    # Split compressed arrays into several blocks.
+    monkeypatch.setattr(session_chunks, "chunk_block_bytes", 2**17)
+    state = _state()
+    path = str(tmp_path / "test.cxs")
+    writer, replaced = _write_session(path, state, compress)
+    assert not isinstance(replaced["small"], ChunkReference)
+    assert isinstance(replaced["bytes"], ChunkReference)
+
+    reader, loaded = _load(path, replaced)
+    try:
+        assert isinstance(loaded["bytes"], bytes)
+        assert loaded["bytes"] == state["bytes"]
+        for name in ("big", "same", "ints", "small"):
+            a = loaded[name]
+            assert a.dtype == state[name].dtype
+            assert numpy.array_equal(a, state[name])
+        # Identical arrays share a chunk but restore as independent arrays.
+        loaded["big"][0, 0] = -1
+        assert loaded["same"][0, 0] == state["same"][0, 0]
+        if compress == "none" and session_chunks.map_uncompressed:
+            assert _is_memory_mapped(loaded["big"])
+            assert not _is_memory_mapped(loaded["same"])
+    finally:
+        reader.close()
+
+
+def test_session_chunks_reuse(tmp_path):
+    state = _state()
+    path1 = str(tmp_path / "first.cxs")
+    path2 = str(tmp_path / "second.cxs")
+    _write_session(path1, state, "gzip")
+    state["ints"] = state["ints"] + 1
+    writer, replaced = _write_session(path2, state, "gzip", previous_path=path1)
+    assert writer.reused_bytes == state["big"].nbytes + len(state["bytes"])
+
+    reader, loaded = _load(path2, replaced)
+    try:
+        for name in ("big", "same", "ints"):
+            assert numpy.array_equal(loaded[name], state[name])
+        assert loaded["bytes"] == state["bytes"]
+    finally:
+        reader.close()
+
+
+def test_session_included_map_memory_mapped(test_production_session, tmp_path):
+    from chimerax.core import session_chunks
+    from chimerax.core.commands import run
+    from chimerax.map import volume_from_grid_data
+    from chimerax.map_data import ArrayGridData
+
+    session = test_production_session
+    a = numpy.arange(100000, dtype=numpy.float32).reshape((40, 50, 50))
+    volume_from_grid_data(ArrayGridData(a.copy()), session)
+    path = str(tmp_path / "map.cxs")
+    run(session, "save %s chunked true compress none includeMaps true" % path)
+    run(session, "close")
+    run(session, "open %s" % path)
+    v = session.models[0]
+    assert numpy.array_equal(v.data.array, a)
+    if session_chunks.map_uncompressed:
+        assert _is_memory_mapped(v.data.array)
@@ -0,0 +1,48 @@
+import math
+import operator
+
+import numpy
+import pytest
+
+
+def test_threads_are_default():
+    from chimerax.core.threadq import apply_to_list
+
+    # Closures that modify caller state only work in threads.
+    seen = []
+    apply_to_list(lambda i: seen.append(i), [(i,) for i in range(5)], nthread=2)
+    assert sorted(seen) == list(range(5))
+
+
+def test_process_results_in_order():
+    from chimerax.core.threadq import apply_to_list, shutdown_process_pool
+
+    try:
+        results = apply_to_list(operator.mul, [(i, 3) for i in range(6)], nproc=2)
+    finally:
+        shutdown_process_pool()
+    assert results == [0, 3, 6, 9, 12, 15]
+
+
+def test_process_shared_arrays():
+    from chimerax.core import threadq
+
+    n = threadq.shared_array_min_bytes // 8 + 100
+    args = [(numpy.arange(n, dtype=numpy.float64), float(i)) for i in range(3)]
+    try:
+        results = threadq.apply_to_list(numpy.multiply, args, nproc=2)
+    finally:
+        threadq.shutdown_process_pool()
+    for i, r in enumerate(results):
+        assert isinstance(r, numpy.ndarray)
+        assert (r == numpy.arange(n) * i).all()
+
+
+def test_process_error_raised():
+    from chimerax.core.threadq import apply_to_list, shutdown_process_pool
+
+    try:
+        with pytest.raises(ValueError):
+            apply_to_list(math.sqrt, [(4.0,), (-1.0,)], nproc=2)
+    finally:
+        shutdown_process_pool()
@@ -38,8 +38,13 @@ class _SessionAPI(BundleAPI):
 
                     @property
                     def open_args(self):
-                        from chimerax.core.commands import BoolArg
-                        return { 'resize_window': BoolArg, 'combine': BoolArg }
+                        from chimerax.core.commands import BoolArg, SaveFileNameArg
+                        return {
+                            'resize_window': BoolArg,
+                            'combine': BoolArg,
+                            'profile': BoolArg,
+                            'profile_file': SaveFileNameArg,
+                        }
 
             elif name == "ChimeraX commands":
                 class Info(OpenerInfo):
@@ -96,10 +101,13 @@ class _SessionAPI(BundleAPI):
 
                     @property
                     def save_args(self):
-                        from chimerax.core.commands import BoolArg, IntArg, EnumOf
+                        from chimerax.core.commands import BoolArg, IntArg, EnumOf, SaveFileNameArg
                         return {
                             'include_maps': BoolArg,
                             'compress': EnumOf(('lz4', 'gzip', 'none')),
+                            'chunked': BoolArg,
+                            'profile': BoolArg,
+                            'profile_file': SaveFileNameArg,
                             'version': IntArg,
                         }
 
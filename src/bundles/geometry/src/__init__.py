@@ -47,7 +47,7 @@ from ._geometry import segment_intercepts_spheres, points_within_planes
 from ._geometry import cylinder_rotations, half_cylinder_rotations, cylinder_rotations_x3d
 from ._geometry import distances_from_origin, distances_parallel_to_axis, distances_perpendicular_to_axis
 from ._geometry import fill_small_ring, fill_6ring
-from .align import align_points
+from .align import align_points, rmsd_matrix
 from .symmetry import cyclic_symmetry_matrices
 from .symmetry import dihedral_symmetry_matrices
 from .symmetry import tetrahedral_symmetry_matrices, tetrahedral_orientations
@@ -60,6 +60,8 @@ from .icosahedron import coordinate_system_names as icosahedral_orientations
 from .icosahedron import coordinate_system_transform as icosahedral_coordinate_system_transform
 from .spline import arc_lengths
 from .adaptive_tree import AdaptiveTree
+from .triangle_tree import TriangleTree
+from .close_pairs import close_point_pairs, close_point_pair_blocks
 from .plane import Plane, PlaneNoIntersectionError
 
 from chimerax.core.toolshed import BundleAPI
@@ -97,3 +97,143 @@ def quaternion_rotation_matrix(q):
          (2 * (lm + ns), - l2 + m2 - n2 + s2, 2 * (mn - ls)),
          (2 * (ln - ms), 2 * (mn + ls), - l2 - m2 + n2 + s2))
     return m
+
+def rmsd_matrix(xyz, ref_xyz = None, fit = True, block_size = 256, nthread = None):
+    '''
+    Supported API.
+    Compute the root mean square distance (RMSD) between each pair of point
+    sets taken from two stacks of point sets, for instance the coordinate sets
+    of a trajectory or many predicted models of the same protein.  Points are
+    paired by their order in each set.
+
+    Parameters
+    ----------
+    xyz : numpy float M by N by 3 array
+      M sets of N points.
+    ref_xyz : numpy float K by N by 3 array or None
+      K sets of N points.  If None, RMSD of all pairs of sets in xyz are computed.
+    fit : bool
+      Whether to superimpose each pair of sets by the rotation and translation
+      minimizing RMSD before computing RMSD, otherwise the points are compared
+      without moving them.
+    block_size : int
+      The matrix is computed in blocks of this many sets by this many sets to
+      bound memory use, with blocks computed in parallel threads.
+    nthread : int or None
+      Number of threads, default half the number of CPU cores.
+
+    Returns
+    -------
+    rmsd : numpy float64 M by K array
+      If ref_xyz is None this is an M by M symmetric matrix with zero diagonal.
+    '''
+    from numpy import asarray, float64, empty
+    xyz = asarray(xyz, float64)
+    same = ref_xyz is None
+    ref_xyz = xyz if same else asarray(ref_xyz, float64)
+    if xyz.ndim != 3 or ref_xyz.ndim != 3 or xyz.shape[2] != 3 or ref_xyz.shape[2] != 3:
+        raise ValueError('rmsd_matrix(): point sets must be arrays of shape (sets, points, 3)')
+    if xyz.shape[1] != ref_xyz.shape[1]:
+        raise ValueError('rmsd_matrix(): point sets have different numbers of points, %d and %d'
+                         % (xyz.shape[1], ref_xyz.shape[1]))
+
+    m, n = len(xyz), len(ref_xyz)
+    rmsd = empty((m, n), float64)
+    if m == 0 or n == 0:
+        return rmsd
+    if xyz.shape[1] == 0:
+        rmsd[:] = 0
+        return rmsd
+
+    if fit:
+        # Center each set.
+        a = xyz - xyz.mean(axis = 1)[:,None,:]
+        b = a if same else ref_xyz - ref_xyz.mean(axis = 1)[:,None,:]
+    else:
+        # A common translation reduces round-off without changing RMSD.
+        center = xyz.mean(axis = (0,1))
+        a = xyz - center
+        b = a if same else ref_xyz - center
+    asq = (a*a).sum(axis = (1,2))
+    bsq = asq if same else (b*b).sum(axis = (1,2))
+
+    bs = max(1, block_size)
+    blocks = [(i, j) for i in range(0, m, bs) for j in range(0, n, bs)
+              if not same or j >= i]
+    def compute_block(i, j):
+        ai, bj = a[i:i+bs], b[j:j+bs]
+        msd = _mean_square_distances(ai, asq[i:i+bs], bj, bsq[j:j+bs], fit)
+        rmsd[i:i+len(ai), j:j+len(bj)] = msd
+        if same and j > i:
+            rmsd[j:j+len(bj), i:i+len(ai)] = msd.T
+    if len(blocks) == 1:
+        compute_block(*blocks[0])
+    else:
+        from chimerax.core.threadq import apply_to_list
+        apply_to_list(compute_block, blocks, nthread = nthread)
+
+    from numpy import sqrt, maximum
+    maximum(rmsd, 0, out = rmsd)	# Round-off can give slightly negative values.
+    sqrt(rmsd, out = rmsd)
+    if same:
+        rmsd.flat[::m+1] = 0
+    return rmsd
+
+def _mean_square_distances(a, asq, b, bsq, fit):
+    '''
+    Mean square distance between each point set in a and each in b, for
+    centered sets optimally superimposed if fit is true.  Uses the largest
+    eigenvalue of the 4 by 4 quaternion key matrix found by Newton iteration
+    on its characteristic polynomial (Theobald QCP method) so no eigenvectors
+    or rotation matrices are computed.
+    '''
+    na, nb, np = len(a), len(b), a.shape[1]
+    if not fit:
+        dot = a.reshape((na, 3*np)) @ b.reshape((nb, 3*np)).T
+        return (asq[:,None] + bsq[None,:] - 2*dot) / np
+
+    # Inner product matrices S = a^T b for every pair, shape (na, nb, 3, 3).
+    s = a.transpose((0,2,1)).reshape((3*na, np)) @ b.transpose((1,0,2)).reshape((np, 3*nb))
+    s = s.reshape((na, 3, nb, 3)).transpose((0,2,1,3))
+    sxx, sxy, sxz = s[...,0,0], s[...,0,1], s[...,0,2]
+    syx, syy, syz = s[...,1,0], s[...,1,1], s[...,1,2]
+    szx, szy, szz = s[...,2,0], s[...,2,1], s[...,2,2]
+
+    # Key matrix is traceless so characteristic polynomial is x^4 + c2 x^2 + c1 x + c0.
+    c2 = -2 * (s*s).sum(axis = (2,3))
+    c1 = -8 * (sxx*(syy*szz - syz*szy) - sxy*(syx*szz - syz*szx) + sxz*(syx*szy - syy*szx))
+    k00, k11 = sxx + syy + szz, sxx - syy - szz
+    k22, k33 = -sxx + syy - szz, -sxx - syy + szz
+    k01, k02, k03 = syz - szy, szx - sxz, sxy - syx
+    k12, k13, k23 = sxy + syx, szx + sxz, syz + szy
+    c0 = _symmetric_4x4_determinant(k00, k01, k02, k03, k11, k12, k13, k22, k23, k33)
+
+    # Newton iteration converges to largest root starting from upper bound.
+    e = 0.5 * (asq[:,None] + bsq[None,:])
+    from numpy import abs as absolute
+    for iter in range(50):
+        e2 = e*e
+        f = (e2 + c2)*e2 + c1*e + c0
+        df = 4*e2*e + 2*c2*e + c1
+        df[df == 0] = 1
+        step = f / df
+        e -= step
+        if (absolute(step) <= 1e-11 * absolute(e)).all():
+            break
+    return (asq[:,None] + bsq[None,:] - 2*e) / np
+
+def _symmetric_4x4_determinant(a00, a01, a02, a03, a11, a12, a13, a22, a23, a33):
+    # Expansion by 2 by 2 minors of the first two and last two rows.
+    s0 = a00*a11 - a01*a01
+    s1 = a00*a12 - a01*a02
+    s2 = a00*a13 - a01*a03
+    s3 = a01*a12 - a11*a02
+    s4 = a01*a13 - a11*a03
+    s5 = a02*a13 - a12*a03
+    c5 = a22*a33 - a23*a23
+    c4 = a12*a33 - a13*a23
+    c3 = a12*a23 - a13*a22
+    c2 = a02*a33 - a03*a23
+    c1 = a02*a23 - a03*a22
+    c0 = a02*a13 - a03*a12
+    return s0*c5 - s1*c4 + s2*c3 + s3*c2 - s4*c1 + s5*c0
@@ -0,0 +1,82 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+'''
+Find pairs of points from two sets that are within a cutoff distance.
+
+Points are put in a grid of cells with cutoff size edges and the points
+in each cell and its 26 neighbor cells are compared.  All cells are
+handled together with numpy operations, so this is fast for large point
+sets, and the pairs can be produced a block of points at a time to limit
+memory use.
+'''
+
+def close_point_pair_blocks(xyz1, xyz2, cutoff, block_size = 10000):
+    '''
+    Yield (indices1, indices2, distances) arrays for all point pairs within
+    cutoff distance, processing block_size points of xyz1 at a time.
+    '''
+    import numpy
+    if len(xyz1) == 0 or len(xyz2) == 0 or cutoff <= 0:
+        return
+    origin = numpy.minimum(xyz1.min(axis=0), xyz2.min(axis=0))
+    # Pad by one cell on each side so neighboring cell keys never wrap.
+    cells1 = numpy.floor((xyz1 - origin) / cutoff).astype(numpy.int64) + 1
+    cells2 = numpy.floor((xyz2 - origin) / cutoff).astype(numpy.int64) + 1
+    ny, nz = [int(max(cells1[:,a].max(), cells2[:,a].max())) + 2 for a in (1,2)]
+    def cell_keys(cells):
+        return (cells[:,0] * ny + cells[:,1]) * nz + cells[:,2]
+    keys2 = cell_keys(cells2)
+    order = numpy.argsort(keys2, kind = 'stable')
+    sorted_keys2 = keys2[order]
+    offsets = [(dx * ny + dy) * nz + dz for dx in (-1,0,1) for dy in (-1,0,1) for dz in (-1,0,1)]
+    for start in range(0, len(xyz1), block_size):
+        keys1 = cell_keys(cells1[start:start+block_size])
+        indices1 = numpy.arange(start, start + len(keys1))
+        for offset in offsets:
+            nkeys = keys1 + offset
+            lo = numpy.searchsorted(sorted_keys2, nkeys, 'left')
+            counts = numpy.searchsorted(sorted_keys2, nkeys, 'right') - lo
+            total = counts.sum()
+            if total == 0:
+                continue
+            i1 = numpy.repeat(indices1, counts)
+            run_offsets = numpy.repeat(lo - (numpy.cumsum(counts) - counts), counts)
+            i2 = order[numpy.arange(total) + run_offsets]
+            d = numpy.sqrt(((xyz1[i1] - xyz2[i2])**2).sum(axis=1))
+            close = (d <= cutoff)
+            yield i1[close], i2[close], d[close]
+
+def close_point_pairs(xyz1, xyz2, cutoff, block_size = 10000):
+    '''
+    Return indices into xyz1 and xyz2 of point pairs within cutoff distance,
+    and their distances.
+    '''
+    import numpy
+    blocks = list(close_point_pair_blocks(xyz1, xyz2, cutoff, block_size))
+    if not blocks:
+        dtype = numpy.result_type(xyz1.dtype, xyz2.dtype)
+        return numpy.empty((0,), numpy.int64), numpy.empty((0,), numpy.int64), numpy.empty((0,), dtype)
+    i1, i2, d = [numpy.concatenate(a) for a in zip(*blocks)]
+    return i1, i2, d
@@ -0,0 +1,205 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+'''
+Bounding volume hierarchy of triangles used to speed up picking on
+surfaces with many triangles.  Triangles are sorted along a Morton
+(Z-order) curve through their centers and cut into leaves of leaf_size
+consecutive triangles.  Each tree level pairs adjacent nodes of the level
+below, so the tree is built with a few numpy operations per level.
+Queries test all boxes at one tree level at a time so the Python overhead
+grows with tree depth, not with the number of nodes.
+'''
+
+class TriangleTree:
+    '''
+    Bounding box hierarchy for triangles given vertices (N x 3 float) and
+    triangles (M x 3 int).  The arrays are referenced, not copied,
+    so the tree must be discarded when the geometry changes.
+    '''
+    def __init__(self, vertices, triangles, leaf_size = 256):
+        self.vertices = vertices
+        self.triangles = triangles
+        self.leaf_size = leaf_size
+        self._build()
+
+    def _build(self):
+        from numpy import arange, minimum, maximum
+        va, ta = self.vertices, self.triangles
+        tv = va[ta]				# M x 3 x 3 triangle corners
+        tmin, tmax = tv.min(axis = 1), tv.max(axis = 1)
+        del tv
+        self._order = order = _morton_order(0.5 * (tmin + tmax))
+
+        # Leaf boxes from consecutive runs of sorted triangles.
+        nt = len(ta)
+        starts = arange(0, nt, self.leaf_size)
+        self._leaf_start = starts
+        self._leaf_end = (starts + self.leaf_size).clip(max = nt)
+        bmin = minimum.reduceat(tmin[order], starts)
+        bmax = maximum.reduceat(tmax[order], starts)
+
+        # Levels from leaves up to the root, level[i] children are 2i, 2i+1.
+        levels = [(bmin, bmax)]
+        while len(bmin) > 1:
+            if len(bmin) % 2:
+                bmin = minimum.reduceat(bmin, arange(0, len(bmin), 2))
+                bmax = maximum.reduceat(bmax, arange(0, len(bmax), 2))
+            else:
+                bmin = minimum(bmin[0::2], bmin[1::2])
+                bmax = maximum(bmax[0::2], bmax[1::2])
+            levels.append((bmin, bmax))
+        levels.reverse()
+        self._levels = levels
+
+    def _leaf_triangles(self, leaf):
+        return self._order[self._leaf_start[leaf]:self._leaf_end[leaf]]
+
+    def _children(self, nodes, level):
+        '''Child node indices at level + 1 of the given nodes.'''
+        from numpy import concatenate
+        c = concatenate((2*nodes, 2*nodes+1))
+        return c[c < len(self._levels[level+1][0])]
+
+    def first_intercept(self, xyz1, xyz2, triangle_mask = None):
+        '''
+        Find the closest triangle intercepted by the line segment xyz1 to xyz2.
+        Return the fraction of the distance (0-1) along the segment and the
+        triangle index, or (None, None) if no triangle is hit.  If triangle_mask
+        is given only triangles with mask value true are considered.
+        '''
+        from numpy import array, float64, argsort
+        p = array(xyz1, float64)
+        d = array(xyz2, float64) - p
+        nodes = array([0])
+        last = len(self._levels) - 1
+        for level, (bmin, bmax) in enumerate(self._levels):
+            tlo, thi = _slab_range(bmin[nodes] - p, bmax[nodes] - p, d)
+            hit = (tlo <= thi) & (thi >= 0) & (tlo <= 1)
+            nodes, tlo = nodes[hit], tlo[hit]
+            if level < last and len(nodes) > 0:
+                nodes = self._children(nodes, level)
+
+        from . import closest_triangle_intercept
+        va, ta = self.vertices, self.triangles
+        fmin = tmin = None
+        for i in argsort(tlo):
+            if fmin is not None and tlo[i] > fmin:
+                break	# Remaining leaves are farther than the closest hit.
+            tnums = self._leaf_triangles(nodes[i])
+            if triangle_mask is not None:
+                tnums = tnums[triangle_mask[tnums]]
+                if len(tnums) == 0:
+                    continue
+            f, t = closest_triangle_intercept(va, ta[tnums], xyz1, xyz2)
+            if f is not None and (fmin is None or f < fmin):
+                fmin, tmin = f, tnums[t]
+        return fmin, tmin
+
+    def triangles_within_planes(self, planes):
+        '''
+        Return a boolean mask of the triangles that have at least one vertex
+        within all of the planes.  Each plane is a 4-vector v and a point is
+        within if v0*x + v1*y + v2*z + v3 >= 0.
+        '''
+        from numpy import array, float64, zeros, concatenate, unique
+        planes = array(planes, float64).reshape((-1,4))
+        n, offset = planes[:,:3], planes[:,3]
+        npos = (n > 0)
+        tmask = zeros((len(self.triangles),), bool)
+        inside_nodes = []
+        nodes = array([0])
+        last = len(self._levels) - 1
+        for level, (bmin, bmax) in enumerate(self._levels):
+            bmin, bmax = bmin[nodes], bmax[nodes]
+            # Largest and smallest plane function values over each box.
+            hi = _box_plane_extreme(bmax, bmin, n, npos) + offset
+            lo = _box_plane_extreme(bmin, bmax, n, npos) + offset
+            inside = (lo >= 0).all(axis = 1)
+            if inside.any():
+                inside_nodes.append((level, nodes[inside]))
+            nodes = nodes[~(hi < 0).any(axis = 1) & ~inside]
+            if level < last and len(nodes) > 0:
+                nodes = self._children(nodes, level)
+
+        # Nodes entirely within the planes cover a contiguous range of sorted triangles.
+        for level, lnodes in inside_nodes:
+            span = 2 ** (last - level)	# Leaves per node at this level
+            for node in lnodes:
+                l0, l1 = node*span, min((node+1)*span, len(self._leaf_start)) - 1
+                tmask[self._order[self._leaf_start[l0]:self._leaf_end[l1]]] = True
+
+        if len(nodes) > 0:
+            tnums = concatenate([self._leaf_triangles(leaf) for leaf in nodes])
+            t = self.triangles[tnums]
+            vi = unique(t)
+            from . import points_within_planes
+            vin = zeros((len(self.vertices),), bool)
+            vin[vi] = points_within_planes(self.vertices[vi], planes)
+            tmask[tnums[vin[t].any(axis = 1)]] = True
+        return tmask
+
+def _morton_order(points, bits = 10):
+    '''
+    Return indices that sort points along a Morton (Z-order) space filling
+    curve so nearby points are mostly close in the ordering.
+    '''
+    from numpy import uint64, zeros
+    pmin, pmax = points.min(axis = 0), points.max(axis = 0)
+    size = (pmax - pmin).max()
+    scale = ((1 << bits) - 1) / size if size > 0 else 0
+    q = ((points - pmin) * scale).astype(uint64)
+    code = zeros((len(points),), uint64)
+    for b in range(bits):
+        for a in range(3):
+            code |= ((q[:,a] >> uint64(b)) & uint64(1)) << uint64(3*b + a)
+    return code.argsort(kind = 'stable')
+
+def _slab_range(bmin, bmax, d):
+    '''
+    Parameter range (tlo, thi) along direction d where a line from the origin
+    is inside each box.  An empty range has tlo > thi.
+    '''
+    from numpy import errstate, where, inf, maximum, minimum
+    with errstate(divide = 'ignore', invalid = 'ignore'):
+        t1, t2 = bmin / d, bmax / d
+    t1, t2 = minimum(t1, t2), maximum(t1, t2)
+    # Axes parallel to the line: inside slab if origin is between the planes.
+    parallel = (d == 0)
+    if parallel.any():
+        inside = (bmin <= 0) & (bmax >= 0)
+        t1 = where(parallel, where(inside, -inf, inf), t1)
+        t2 = where(parallel, where(inside, inf, -inf), t2)
+    return t1.max(axis = 1), t2.min(axis = 1)
+
+def _box_plane_extreme(bhi, blo, n, npos):
+    '''
+    For boxes (K x 3) and plane normals (P x 3) return the K x P values of
+    normal dotted with the box corner taking bhi where the normal component
+    is positive and blo otherwise.  With bhi = box maximum this is the largest
+    value over the box, with bhi = box minimum the smallest.
+    '''
+    from numpy import where
+    corners = where(npos[None,:,:], bhi[:,None,:], blo[:,None,:])	# K x P x 3
+    return (corners * n[None,:,:]).sum(axis = 2)
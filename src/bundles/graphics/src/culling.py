@@ -0,0 +1,169 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+class InstanceCulling:
+    '''
+    Skip drawing instances of instanced drawings that are outside the camera
+    view or clip planes.  Each instance is tested with a bounding sphere of the
+    drawing geometry.  The View sets this on the renderer while drawing the
+    scene, and each drawing only updates its instance buffers when the set of
+    visible instances changes from the previous frame.
+    '''
+
+    minimum_instances = 1000
+    '''Drawings with fewer instances are drawn without culling.'''
+
+    def __init__(self):
+        self.planes = None	# N x 4 float32 array, scene coordinates
+        self.view_planes = None	# Planes not including clip planes
+        self.frame = None	# Identifies frame so each drawing is culled once
+        self.drawn_instances = 0
+        self.culled_instances = 0
+
+    def start_frame(self, view_planes, clip_planes):
+        '''
+        Set the scene planes bounding the view and the clip planes for a
+        new frame and reset counts.  Either can be None.
+        '''
+        if clip_planes is None:
+            planes = view_planes
+        elif view_planes is None:
+            planes = clip_planes
+        else:
+            from numpy import concatenate
+            planes = concatenate((view_planes, clip_planes))
+        self.planes = planes
+        self.view_planes = view_planes
+        global _frame_count
+        _frame_count += 1
+        self.frame = _frame_count
+        self.drawn_instances = 0
+        self.culled_instances = 0
+
+    def local_planes(self, scene_positions, clipping = True):
+        '''
+        Return the culling planes transformed to the coordinates that are
+        mapped to the scene by each of the scene positions, as a list of
+        N x 4 arrays.  If clipping is false the clip planes are not included.
+        Returns None if there are no planes.
+        '''
+        planes = self.planes if clipping else self.view_planes
+        if planes is None:
+            return None
+        return [_transform_planes(planes, p) for p in scene_positions]
+
+    def visible_instances(self, spheres, local_planes):
+        '''
+        Return a mask of the instance bounding spheres that are at least
+        partly on the positive side of all planes in any of the local plane sets.
+        Spheres are (centers, radii) in the local plane coordinates.
+        '''
+        centers, radii = spheres
+        visible = None
+        for planes in local_planes:
+            v = spheres_within_planes(centers, radii, planes)
+            visible = v if visible is None else (visible | v)
+        return visible
+
+    def count(self, visible, displayed_mask):
+        '''Add to counts of drawn and culled instances.'''
+        from numpy import count_nonzero
+        if displayed_mask is None:
+            drawn = count_nonzero(visible)
+            shown = len(visible)
+        else:
+            drawn = count_nonzero(visible & displayed_mask)
+            shown = count_nonzero(displayed_mask)
+        self.drawn_instances += drawn
+        self.culled_instances += shown - drawn
+
+_frame_count = 0
+
+def view_culling_planes(camera, window_size, clip_planes):
+    '''
+    Return planes bounding the camera view and the clip planes, each as an
+    N x 4 array in scene coordinates or None if there are no planes.
+    The side planes of the camera view are only used for cameras that render
+    a single view and can compute sight lines (see Camera.ray()).
+    Planes include points with (nx,ny,nz,c)*(x,y,z,1) >= 0.
+    '''
+    from numpy import array, float32
+    vplanes = None
+    w, h = window_size
+    if camera.number_of_views() == 1 and w > 0 and h > 0:
+        p = camera.rectangle_bounding_planes((0,0), (w,h), window_size)
+        if len(p) > 0:
+            vplanes = array(p, float32)
+    cplanes = clip_planes.planes()
+    cplanes = array([p.opengl_vec4() for p in cplanes], float32) if cplanes else None
+    return vplanes, cplanes
+
+def instance_spheres(positions, bounds):
+    '''
+    Bounding spheres for copies of geometry with the given bounds at each of
+    the positions.  Returns N x 3 centers and length N radii, float32.
+    '''
+    center, radius = bounds.center(), bounds.radius()
+    from numpy import float32, sqrt
+    sas = positions.shift_and_scale_array()
+    if sas is not None:
+        scale = abs(sas[:,3])
+        centers = sas[:,:3] + sas[:,3:4] * center.astype(float32)
+    else:
+        pa = positions.array()
+        rot = pa[:,:,:3]
+        centers = (rot @ center + pa[:,:,3]).astype(float32)
+        # Largest axis scale bounds the radius for non-uniform scaling.
+        scale = sqrt((rot*rot).sum(axis=1).max(axis=1))
+    radii = (radius * scale).astype(float32)
+    return centers, radii
+
+def spheres_within_planes(centers, radii, planes):
+    '''Mask of spheres at least partly on the positive side of all planes.'''
+    from numpy import ones
+    inside = ones((len(centers),), bool)
+    for plane in planes:
+        d = centers @ plane[:3]
+        d += plane[3] + radii
+        inside &= (d >= 0)
+    return inside
+
+def _transform_planes(planes, place):
+    '''
+    Transform planes in scene coordinates to the coordinates that place maps
+    to scene coordinates.  Normals are rescaled to unit length so distances
+    are in the new coordinates.
+    '''
+    if place.is_identity():
+        return planes
+    m = place.matrix
+    from numpy import empty, float32, sqrt
+    p = empty(planes.shape, float32)
+    n = planes[:,:3]
+    p[:,:3] = n @ m[:,:3]
+    p[:,3] = n @ m[:,3] + planes[:,3]
+    s = sqrt((p[:,:3]*p[:,:3]).sum(axis=1))
+    s[s == 0] = 1
+    p /= s[:,None]
+    return p
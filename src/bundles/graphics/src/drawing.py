@@ -93,6 +93,12 @@ class Drawing:
 
         self._cached_geometry_bounds = None	# Triangles, positions not included. Local coords.
         self._cached_position_bounds = None	# Triangles including positions, children not included. Scene coords.
+        self._triangle_tree = None		# Bounding box tree for picking, cached.
+        self._triangle_tree_picks = 0		# Picks since geometry changed, tree built on second.
+        self._instance_spheres = None		# Bounding spheres of instances for culling, cached.
+        self._culled_positions = None		# bool numpy array, instances within view.
+        self._culled_frame = None		# Frame when culling was last computed.
+        self._culled_planes = None		# Culling planes in parent coordinates.
 
         # Geometry and colors
         self._vertices = None		# N x 3 float32 numpy array
@@ -257,10 +263,16 @@ class Drawing:
             if sc:
                 self._cached_geometry_bounds = None
                 self._cached_position_bounds = None
+                self._instance_spheres = None
+                if key != '_triangle_mask':
+                    self._triangle_tree = None
+                    self._triangle_tree_picks = 0
             else:
                 sc = key in ('_displayed_positions', '_positions')
                 if sc:
                     self._cached_position_bounds = None
+                    if key == '_positions':
+                        self._instance_spheres = None
             self.redraw_needed(shape_changed=sc)
 
         super(Drawing, self).__setattr__(key, value)
@@ -273,6 +285,12 @@ class Drawing:
     Dot = 'dot'
     "Display style showing only dots at triangle vertices."
 
+    pick_tree_triangles = 100000
+    '''
+    Drawings with at least this many triangles build a bounding box tree
+    to speed up picking with first_intercept() and planes_pick().
+    '''
+
     def _get_display_style(self):
         return self._display_style
     def _set_display_style(self, style):
@@ -807,8 +825,21 @@ class Drawing:
         if len(self._vertex_buffers) == 0:
             self._create_vertex_buffers()
 
+        # Skip instances outside the view
+        if not self._cull_instances(renderer):
+            return
+
         # Update opengl buffers to reflect drawing changes
-        self._update_buffers()
+        if self._attribute_changes:
+            from . import opengl
+            fs = opengl._frame_statistics
+            if fs is None:
+                self._update_buffers()
+            else:
+                from time import perf_counter
+                t0 = perf_counter()
+                self._update_buffers()
+                fs.add_time('buffer_updates', perf_counter() - t0)
 
         ds = self._draw_highlight if highlighted_only else self._draw_shape
         ds.activate_bindings(renderer)
@@ -942,6 +973,7 @@ class Drawing:
             '_vertex_colors' in changes or
             '_positions' in changes or
             '_displayed_positions' in changes or
+            '_culled_positions' in changes or
             '_highlighted_positions' in changes):
             c = self.colors if self._vertex_colors is None else None
             pm = self._position_mask()
@@ -966,8 +998,60 @@ class Drawing:
             if sp is not None:
                 import numpy
                 dp = sp if dp is None else numpy.logical_and(dp, sp)
+        cp = self._culled_positions
+        if cp is not None:
+            import numpy
+            dp = cp if dp is None else numpy.logical_and(dp, cp)
         return dp
 
+    def _cull_instances(self, renderer):
+        '''
+        Find the instances within the view and clip planes when the renderer
+        has instance culling enabled.  Instance buffers are only updated if
+        the visible instances changed.  Returns False if no instances are visible.
+        '''
+        culling = getattr(renderer, 'instance_culling', None)
+        if culling is not None and self._culled_frame == culling.frame:
+            cp = self._culled_positions		# Already culled for this frame.
+            return cp is None or cp.any()
+
+        planes = spheres = None
+        if culling is not None and len(self._positions) >= culling.minimum_instances:
+            spos = self.parent.get_scene_positions(displayed_only=True)
+            planes = culling.local_planes(spos, clipping = self.allow_clipping)
+            spheres = self._instance_spheres
+            if spheres is None and planes is not None:
+                b = self.geometry_bounds()
+                if b is not None:
+                    from .culling import instance_spheres
+                    self._instance_spheres = spheres = instance_spheres(self._positions, b)
+                    self._culled_planes = None
+        if planes is None or spheres is None:
+            if self._culled_positions is not None:
+                self._set_culled_positions(None)
+            return True
+
+        self._culled_frame = culling.frame
+        cplanes = self._culled_planes
+        from numpy import array_equal
+        if (cplanes is None or len(planes) != len(cplanes)
+                or not all(array_equal(p, cp) for p, cp in zip(planes, cplanes))):
+            visible = culling.visible_instances(spheres, planes)
+            cp = self._culled_positions
+            if cp is None or not array_equal(visible, cp):
+                self._set_culled_positions(visible)
+            self._culled_planes = planes
+        cp = self._culled_positions
+        culling.count(cp, self._displayed_positions)
+        return cp.any()
+
+    def _set_culled_positions(self, mask):
+        # Set directly so the change does not trigger a redraw.
+        self._culled_positions = mask
+        if mask is None:
+            self._culled_planes = None
+        self._attribute_changes.add('_culled_positions')
+
     def bounds(self):
         '''
         The bounds of all displayed parts of a drawing and its children and all descendants, including
@@ -1096,21 +1180,50 @@ class Drawing:
         if ta.shape[1] != 3:
             # TODO: Intercept only for triangles, not lines or points.
             return None
+        tree = self._pick_triangle_tree()
+        if tree is None:
+            from chimerax.geometry import closest_triangle_intercept
+            def intercept(xyz1, xyz2):
+                return closest_triangle_intercept(va, ta, xyz1, xyz2)
+        else:
+            tmask = self._triangle_mask
+            def intercept(xyz1, xyz2):
+                return tree.first_intercept(xyz1, xyz2, tmask)
+        masked = (tree is None)		# Tree gives triangle number including hidden triangles.
         p = None
-        from chimerax.geometry import closest_triangle_intercept
         if self.positions.is_identity():
-            fmin, tmin = closest_triangle_intercept(va, ta, mxyz1, mxyz2)
+            fmin, tmin = intercept(mxyz1, mxyz2)
             if fmin is not None:
-                p = PickedTriangle(fmin, tmin, 0, self)
+                p = PickedTriangle(fmin, tmin, 0, self, masked)
         else:
             pos_nums = self.bounds_intercept_copies(self.geometry_bounds(), mxyz1, mxyz2)
             for i in pos_nums:
                 cxyz1, cxyz2 = self.positions[i].inverse() * (mxyz1, mxyz2)
-                fmin, tmin = closest_triangle_intercept(va, ta, cxyz1, cxyz2)
+                fmin, tmin = intercept(cxyz1, cxyz2)
                 if fmin is not None and (p is None or fmin < p.distance):
-                    p = PickedTriangle(fmin, tmin, i, self)
+                    p = PickedTriangle(fmin, tmin, i, self, masked)
         return p
 
+    def _pick_triangle_tree(self):
+        '''
+        Return a bounding box tree of the triangles for fast picking, or None
+        if the drawing has too few triangles.  The tree is built on the second
+        pick after the geometry changes so that drawings whose geometry changes
+        every frame, such as a map contour level being dragged, are not slowed
+        by building trees that are used only once.
+        '''
+        t = self._triangle_tree
+        if t is None:
+            ta = self.triangles
+            if ta is None or ta.shape[1] != 3 or len(ta) < self.pick_tree_triangles:
+                return None
+            self._triangle_tree_picks += 1
+            if self._triangle_tree_picks < 2:
+                return None
+            from chimerax.geometry import TriangleTree
+            t = self._triangle_tree = TriangleTree(self.vertices, ta)
+        return t
+
     def bounds_intercept_copies(self, bounds, mxyz1, mxyz2):
         '''
         Return indices of positions where line segment intercepts displayed bounds.
@@ -1180,14 +1293,21 @@ class Drawing:
                 # For non-instances pick using all vertices.
                 from chimerax.geometry import transform_planes
                 pplanes = transform_planes(self.position, planes)
-                vmask = points_within_planes(self.vertices, pplanes)
-                if vmask.sum() > 0:
-                    t = self.triangles
-                    from numpy import logical_or, logical_and
-                    tmask = logical_or(vmask[t[:,0]], vmask[t[:,1]])
-                    logical_or(tmask, vmask[t[:,2]], tmask)
+                tree = self._pick_triangle_tree()
+                if tree is None:
+                    tmask = None
+                    vmask = points_within_planes(self.vertices, pplanes)
+                    if vmask.sum() > 0:
+                        t = self.triangles
+                        from numpy import logical_or
+                        tmask = logical_or(vmask[t[:,0]], vmask[t[:,1]])
+                        logical_or(tmask, vmask[t[:,2]], tmask)
+                else:
+                    tmask = tree.triangles_within_planes(pplanes)
+                if tmask is not None:
                     tm = self._triangle_mask
                     if tm is not None:
+                        from numpy import logical_and
                         logical_and(tmask, tm, tmask)
                     if tmask.sum() > 0:
                         picks.append(PickedTriangles(tmask, self))
@@ -1951,11 +2071,14 @@ class PickedTriangle(Pick):
     '''
     A picked triangle of a drawing.
     '''
-    def __init__(self, distance, triangle_number, copy_number, drawing):
+    def __init__(self, distance, triangle_number, copy_number, drawing, masked_number = True):
         Pick.__init__(self, distance)
         tm = drawing.triangle_mask
         # Convert to from displayed triangle number to all triangles number.
-        tnum = triangle_number if tm is None else tm.nonzero()[0][triangle_number]
+        if tm is None or not masked_number:
+            tnum = triangle_number
+        else:
+            tnum = tm.nonzero()[0][triangle_number]
         self.triangle_number = tnum
         self._copy = copy_number
         self._drawing = drawing
@@ -0,0 +1,203 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+class FrameProfiler:
+    '''
+    Record rendering times and drawing statistics for each frame drawn by a View.
+    CPU time is measured for each drawing pass, and the number of OpenGL
+    draw calls, triangles, instances and bytes of buffer data uploaded are
+    counted.  Statistics for the most recent frames are kept.  Times do not
+    include asynchronous GPU rendering unless synchronize is true, which waits
+    for the GPU to finish each pass and so slows rendering.
+    '''
+
+    def __init__(self, frames = 100, synchronize = False):
+        from collections import deque
+        self.frames = deque(maxlen = frames)
+        "FrameStatistics for the most recent frames."
+        self.synchronize = synchronize
+        self.frame_count = 0
+        self._frame = None
+        self._pending_times = {}	# Times recorded between frames, added to next frame
+
+    def start_frame(self, frame_number):
+        f = FrameStatistics(frame_number)
+        f.times.update(self._pending_times)
+        self._pending_times.clear()
+        self._frame = f
+        from . import opengl
+        opengl.set_frame_statistics(f)
+
+    def finish_frame(self, render = None):
+        f = self._frame
+        if f is None:
+            return
+        if self.synchronize and render is not None:
+            render.finish_rendering()
+        from time import perf_counter
+        f.times['total'] = perf_counter() - f.start_time
+        self._frame = None
+        from . import opengl
+        opengl.set_frame_statistics(None)
+        self.frames.append(f)
+        self.frame_count += 1
+
+    def add_time(self, name, seconds):
+        '''
+        Add to the time for a named part of the current frame.  If no frame
+        is being drawn the time is saved for the next frame, replacing any
+        earlier time with that name, so only the change check preceding a
+        drawn frame is included.
+        '''
+        f = self._frame
+        if f is None:
+            self._pending_times[name] = seconds
+        else:
+            f.add_time(name, seconds)
+
+    def add_times_to_last_frame(self, times):
+        '''Add times measured outside View.draw(), such as by the update loop.'''
+        if self.frames:
+            ft = self.frames[-1].times
+            for name, t in times.items():
+                ft[name] = ft.get(name, 0) + t
+
+    def timer(self, name, render = None):
+        '''Context manager that adds the time of its block to the named time.'''
+        return _Timer(self, name, render if self.synchronize else None)
+
+    def statistics(self):
+        '''
+        Return a dictionary mapping each time and count name to a dictionary
+        with the mean, minimum, maximum and last value over the kept frames.
+        '''
+        frames = self.frames
+        names = []
+        for f in frames:
+            for name in f.values():
+                if name not in names:
+                    names.append(name)
+        counts = FrameStatistics.count_names
+        names = [n for n in names if n not in counts] + [n for n in names if n in counts]
+        stats = {}
+        for name in names:
+            values = [f.values().get(name, 0) for f in frames]
+            stats[name] = {
+                'mean': sum(values) / len(values),
+                'min': min(values),
+                'max': max(values),
+                'last': values[-1],
+            }
+        return stats
+
+    def json_data(self):
+        frames = self.frames
+        return {
+            'frames': len(frames),
+            'frames_drawn': self.frame_count,
+            'synchronize': self.synchronize,
+            'statistics': self.statistics(),
+            'recent_frames': [f.json_data() for f in frames],
+        }
+
+    def write_json(self, path):
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.json_data(), f, indent = 1)
+
+    def report(self):
+        '''Return a text table of mean and maximum values over the kept frames.'''
+        stats = self.statistics()
+        n = len(self.frames)
+        lines = ['Graphics profile for last %d frames' % n]
+        if n == 0:
+            return lines[0]
+        total = stats.get('total')
+        if total and total['mean'] > 0:
+            lines[0] += ', %.1f frames per second drawing rate' % (1 / total['mean'])
+        lines.append('%-20s %10s %10s' % ('', 'mean', 'max'))
+        for name, s in stats.items():
+            if name in FrameStatistics.count_names:
+                fmt = '%-20s %10.0f %10.0f'
+                lines.append(fmt % (name, s['mean'], s['max']))
+            else:
+                fmt = '%-20s %10.2f %10.2f  msec'
+                lines.append(fmt % (name, 1000 * s['mean'], 1000 * s['max']))
+        return '\n'.join(lines)
+
+class FrameStatistics:
+    '''Times in seconds and drawing counts for one frame.'''
+
+    count_names = ('draw_calls', 'triangles', 'instances', 'buffer_uploads', 'upload_bytes')
+
+    def __init__(self, frame_number):
+        from time import perf_counter
+        self.frame_number = frame_number
+        self.start_time = perf_counter()
+        self.times = {}
+        self.draw_calls = 0
+        self.triangles = 0
+        self.instances = 0
+        self.buffer_uploads = 0
+        self.upload_bytes = 0
+
+    def add_time(self, name, seconds):
+        times = self.times
+        times[name] = times.get(name, 0) + seconds
+
+    def count_draw(self, triangles, instances):
+        self.draw_calls += 1
+        self.triangles += triangles
+        self.instances += instances
+
+    def count_upload(self, nbytes):
+        self.buffer_uploads += 1
+        self.upload_bytes += nbytes
+
+    def values(self):
+        v = dict(self.times)
+        for name in self.count_names:
+            v[name] = getattr(self, name)
+        return v
+
+    def json_data(self):
+        data = self.values()
+        data['frame_number'] = self.frame_number
+        return data
+
+class _Timer:
+    def __init__(self, profiler, name, render):
+        self._profiler = profiler
+        self._name = name
+        self._render = render
+    def __enter__(self):
+        from time import perf_counter
+        self._start = perf_counter()
+        return self
+    def __exit__(self, *exc):
+        if self._render is not None:
+            self._render.finish_rendering()
+        from time import perf_counter
+        self._profiler.add_time(self._name, perf_counter() - self._start)
+        return False
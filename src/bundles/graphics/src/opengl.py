@@ -41,6 +41,17 @@ GL = None
 # OpenGL workarounds:
 stencil8_needed = False
 
+# FrameStatistics counting draw calls and buffer uploads while profiling.
+_frame_statistics = None
+
+def set_frame_statistics(frame_statistics):
+    '''
+    Count draw calls, triangles, instances and buffer bytes uploaded
+    using the given frameprofile.FrameStatistics, or stop counting if None.
+    '''
+    global _frame_statistics
+    _frame_statistics = frame_statistics
+
 class OpenGLVersionError(RuntimeError):
     pass
 
@@ -448,6 +459,7 @@ class Render:
         self._near_far_clip = (0,1)             # Scene coord distances from eye
         self._clip_planes = []                  # Up to 8 4-tuples
         self._num_enabled_clip_planes = 0
+        self.instance_culling = None            # InstanceCulling set by View while drawing
 
         self.lighting = Lighting()
         self._lighting_buffer = None          # Uniform buffer for lighting parameters
@@ -2829,6 +2841,8 @@ class Buffer:
                 GL.glBufferData(btype, size, d, GL.GL_STATIC_DRAW)
             else:
                 GL.glBufferSubData(btype, 0, size, d)
+            if _frame_statistics is not None:
+                _frame_statistics.count_upload(size)
             GL.glBindBuffer(btype, 0)
             self.opengl_buffer = b
             self.buffered_array = d
@@ -2857,6 +2871,10 @@ class Buffer:
             GL.glDrawElements(element_type, ne, GL.GL_UNSIGNED_INT, eo)
         else:
             GL.glDrawElementsInstanced(element_type, ne, GL.GL_UNSIGNED_INT, eo, ninst)
+        if _frame_statistics is not None:
+            ni = 1 if ninst is None else ninst
+            nt = ne // 3 if element_type == GL_TRIANGLES else 0
+            _frame_statistics.count_draw(nt * ni, ni)
 
     def shader_has_required_capabilities(self, shader):
         if not self.requires_capabilities:
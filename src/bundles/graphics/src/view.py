@@ -51,6 +51,15 @@ class View:
         self._time_graphics = False
         self.update_lighting = True
 
+        # Skip instances of instanced drawings outside the view and clip planes.
+        self.cull_instances = True
+        from .culling import InstanceCulling
+        self.instance_culling = InstanceCulling()
+        "Counts of drawn and culled instances for the last frame."
+
+        self.frame_profiler = None
+        "FrameProfiler recording per-frame drawing times and statistics, or None."
+
         self._drawing_manager = dm = _RedrawNeeded()
         if trigger_set:
             self.drawing.set_redraw_callback(dm)
@@ -168,6 +177,10 @@ class View:
         if use_calllist and gllist.replay_opengl(self, drawings, camera, swap_buffers):
             return
         
+        prof = self.frame_profiler
+        if prof:
+            prof.start_frame(self.frame_number)
+
         if check_for_changes:
             self.check_for_drawing_change()
 
@@ -192,17 +205,28 @@ class View:
         if self._overlays:
             odrawings = sum([o.all_drawings(displayed_only = True) for o in self._overlays], [])
             from .drawing import draw_overlays
-            draw_overlays(odrawings, r)
+            with self._profile('overlays'):
+                draw_overlays(odrawings, r)
 
         if use_calllist:
             gllist.call_opengl_list(self, trace=True)
         
         if swap_buffers:
             if camera.do_swap_buffers():
-                r.swap_buffers()
+                with self._profile('swap_buffers'):
+                    r.swap_buffers()
             self.redraw_needed = False
+            if prof:
+                prof.finish_frame(r)
             if getattr(self, 'use_opengl_done_current', True):
                 r.done_current()
+        elif prof:
+            prof.finish_frame(r)
+
+    def _profile(self, name):
+        '''Context manager timing a part of frame drawing when profiling.'''
+        prof = self.frame_profiler
+        return _no_profiling if prof is None else prof.timer(name, self._render)
 
     def _draw_scene(self, camera, drawings):
 
@@ -224,8 +248,10 @@ class View:
             
         silhouette = self.silhouette
 
-        shadow, multishadow = self._compute_shadowmaps(opaque_drawings, transparent_drawings, camera)
-            
+        with self._profile('shadows'):
+            shadow, multishadow = self._compute_shadowmaps(opaque_drawings, transparent_drawings, camera)
+        r.instance_culling = self._start_instance_culling(camera, shadow or multishadow)
+
         from .drawing import draw_depth, draw_opaque, draw_transparent, draw_highlight_outline, draw_on_top
         for vnum in range(camera.number_of_views()):
             camera.set_render_target(vnum, r)
@@ -252,30 +278,54 @@ class View:
                 # Initial depth pass optimization to avoid lighting
                 # calculation on hidden geometry
                 if opaque_drawings:
-                    draw_depth(r, opaque_drawings)
+                    with self._profile('depth_prepass'):
+                        draw_depth(r, opaque_drawings)
                     r.allow_equal_depth(True)
             self._start_timing()
             if opaque_drawings:
-                draw_opaque(r, opaque_drawings)
+                with self._profile('opaque'):
+                    draw_opaque(r, opaque_drawings)
             if highlight_drawings:
                 r.outline.set_outline_mask()       # copy depth to outline framebuffer
             if transparent_drawings:
                 if silhouette.enabled:
                     # Draw opaque object silhouettes behind transparent surfaces
-                    silhouette.draw_silhouette(r)
-                draw_transparent(r, transparent_drawings)
+                    with self._profile('silhouette'):
+                        silhouette.draw_silhouette(r)
+                with self._profile('transparent'):
+                    draw_transparent(r, transparent_drawings)
             self._finish_timing()
             if multishadow:
                 r.allow_equal_depth(False)
             if silhouette.enabled:
-                silhouette.finish_silhouette_drawing(r)
+                with self._profile('silhouette'):
+                    silhouette.finish_silhouette_drawing(r)
             if highlight_drawings:
-                draw_highlight_outline(r, highlight_drawings, color = self._highlight_color,
-                                       pixel_width = self._highlight_width)
+                with self._profile('highlight'):
+                    draw_highlight_outline(r, highlight_drawings, color = self._highlight_color,
+                                           pixel_width = self._highlight_width)
             if on_top_drawings:
-                draw_on_top(r, on_top_drawings)
+                with self._profile('on_top'):
+                    draw_on_top(r, on_top_drawings)
             if offscreen:
                 offscreen.finish(r)
+        r.instance_culling = None
+
+    def _start_instance_culling(self, camera, shadows):
+        '''
+        Return the instance culling for drawing this frame, or None if instances
+        are not culled.  Shadows are cast by instances outside the view so no
+        culling is done when shadows are shown.
+        '''
+        culling = self.instance_culling
+        r = self._render
+        if not self.cull_instances or shadows or r.recording_opengl:
+            vplanes = cplanes = None
+        else:
+            from .culling import view_culling_planes
+            vplanes, cplanes = view_culling_planes(camera, r.render_size(), self.clip_planes)
+        culling.start_frame(vplanes, cplanes)
+        return None if culling.planes is None else culling
 
     def _drawings_by_pass(self, drawings):
         pass_drawings = {}
@@ -289,6 +339,17 @@ class View:
         return [pass_drawings.get(draw_pass, []) for draw_pass in passes]
 
     def check_for_drawing_change(self):
+        '''
+        Check if the scene, camera or clip planes changed, and if so
+        set redraw_needed and return true.
+        '''
+        prof = self.frame_profiler
+        if prof is None:
+            return self._check_for_drawing_change()
+        with prof.timer('check_changes'):
+            return self._check_for_drawing_change()
+
+    def _check_for_drawing_change(self):
         trig = self.triggers
         if trig:
             trig.activate_trigger('graphics update', self)
@@ -1107,6 +1168,9 @@ class View:
         c.eye_separation_scene *= f
         c.redraw_needed = True
 
+from contextlib import nullcontext
+_no_profiling = nullcontext()
+
 class _RedrawNeeded:
 
     def __init__(self):
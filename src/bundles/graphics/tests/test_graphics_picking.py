@@ -0,0 +1,77 @@
+import numpy
+import pytest
+
+
+def _random_mesh(seed=0, num_vertices=2000, num_triangles=5000):
+    rng = numpy.random.default_rng(seed)
+    vertices = (rng.random((num_vertices, 3)) * 10).astype(numpy.float32)
+    triangles = rng.integers(0, num_vertices, (num_triangles, 3)).astype(numpy.int32)
+    return vertices, triangles
+
+
+def _random_segments(seed=1, count=200):
+    rng = numpy.random.default_rng(seed)
+    xyz1 = rng.random((count, 3)) * 10 + (-20, 0, 0)
+    xyz2 = rng.random((count, 3)) * 10 + (20, 0, 0)
+    return list(zip(xyz1, xyz2))
+
+
+def _brute_force_intercept(vertices, triangles, xyz1, xyz2, triangle_mask=None):
+    from chimerax.geometry import closest_triangle_intercept
+
+    if triangle_mask is None:
+        return closest_triangle_intercept(vertices, triangles, xyz1, xyz2)
+    tnums = triangle_mask.nonzero()[0]
+    f, t = closest_triangle_intercept(vertices, triangles[tnums], xyz1, xyz2)
+    return f, (None if t is None else tnums[t])
+
+
+@pytest.mark.parametrize("masked", [False, True])
+def test_triangle_tree_intercept(masked):
+    from chimerax.geometry import TriangleTree
+
+    vertices, triangles = _random_mesh()
+    tmask = numpy.random.default_rng(2).random(len(triangles)) < 0.5 if masked else None
+    tree = TriangleTree(vertices, triangles, leaf_size=16)
+    hits = 0
+    for xyz1, xyz2 in _random_segments():
+        f, t = tree.first_intercept(xyz1, xyz2, tmask)
+        bf, bt = _brute_force_intercept(vertices, triangles, xyz1, xyz2, tmask)
+        if bf is None:
+            assert f is None
+        else:
+            hits += 1
+            assert t == bt
+            assert f == pytest.approx(bf)
+    assert hits > 0
+
+
+@pytest.mark.parametrize("masked", [False, True])
+def test_drawing_pick_uses_tree(masked):
+    from chimerax.graphics import Drawing
+
+    vertices, triangles = _random_mesh()
+    tmask = numpy.random.default_rng(2).random(len(triangles)) < 0.5 if masked else None
+    drawings = []
+    for tree_triangles in (0, len(triangles) + 1):
+        d = Drawing("mesh")
+        d.pick_tree_triangles = tree_triangles
+        d.set_geometry(vertices, None, triangles)
+        if tmask is not None:
+            d.set_triangle_mask(tmask)
+        drawings.append(d)
+    tree_drawing, brute_force_drawing = drawings
+
+    for xyz1, xyz2 in _random_segments():
+        p = tree_drawing.first_intercept(xyz1, xyz2)
+        bp = brute_force_drawing.first_intercept(xyz1, xyz2)
+        if bp is None:
+            assert p is None
+        else:
+            # Triangle numbers index all triangles whether or not they are masked.
+            assert p.triangle_number == bp.triangle_number
+            assert p.distance == pytest.approx(bp.distance)
+            if tmask is not None:
+                assert tmask[p.triangle_number]
+    assert tree_drawing._triangle_tree is not None
+    assert brute_force_drawing._triangle_tree is None
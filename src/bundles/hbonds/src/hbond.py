@@ -28,7 +28,7 @@ from .acceptor_geom import acc_syn_anti, acc_phi_psi, acc_theta_tau, acc_generic
 from .donor_geom import don_theta_tau, don_upsilon_tau, don_generic, don_water
 from .common_geom import ConnectivityError, AtomTypeError
 from chimerax.chem_group import find_group
-from chimerax.geometry import distance_squared
+from chimerax.geometry import distance_squared, close_point_pairs
 from .hydpos import hyd_positions
 from chimerax.atomic.idatm import type_info, tetrahedral, planar, linear, single
 from chimerax.atomic import Element
@@ -300,21 +300,272 @@ def find_coordset_hbonds(session, structure, **kw):
     """Like find_hbonds, but takes a single structure and cycles through its coordsets
        and finds the hydrogen bonds for each.  Returns a list of lists of hydrogen
        bonds, one list per coordset.
+
+       Uses find_trajectory_hbonds(), so the 'cache_da' keyword is not needed and
+       'inter_model'/'inter_submodel' have no effect for a single structure.
     """
-    hbonds = []
-    cs_ids = structure.coordset_ids
-    structure.active_coordset_change_notify = False
+    if not kw.get('intra_model', True):
+        return [[] for cs_id in structure.coordset_ids]
+    tkw = { k:v for k,v in kw.items() if k in ('donors', 'acceptors', 'dist_slop', 'angle_slop', 'status') }
+    return find_trajectory_hbonds(session, structure, **tkw).hbond_lists()
+
+def find_trajectory_hbonds(session, structure, *, donors=None, acceptors=None, dist_slop=0.0,
+        angle_slop=0.0, coordset_ids=None, block_size=50, status=True):
+    """Find hydrogen bonds in every coordset of a structure, e.g. a dynamics trajectory,
+       using the same criteria as find_hbonds().
+
+       Donors and acceptors are classified once for the whole trajectory.  Donor-acceptor
+       distances are tested with NumPy for blocks of 'block_size' coordsets at a time, and
+       only pairs within H-bond distance in a coordset get the angle tests for that coordset.
+
+       'coordset_ids' restricts the search to those coordsets (default all).
+
+       Returns a TrajectoryHBonds instance holding the donor/acceptor pairs that are
+       H-bonded in at least one coordset and a pair x coordset occupancy matrix.
+    """
+    from chimerax.atomic import Atoms, Atom
+    if coordset_ids is None:
+        coordset_ids = structure.coordset_ids
+    if donors and not isinstance(donors, Atoms):
+        donors = Atoms(donors)
+    if acceptors and not isinstance(acceptors, Atoms):
+        acceptors = Atoms(acceptors)
+
+    global _compute_cache, _problem, _truncated
+    _compute_cache = {}
+    _problem = None
+    _truncated = set()
+    criteria = _HBondCriteria(dist_slop, angle_slop)
+
+    Atom._hb_coord = Atom.coord
     cur_cs_id = structure.active_coordset_id
+    structure.active_coordset_change_notify = False
     try:
-        for cs_id in cs_ids:
-            structure.active_coordset_id = cs_id
-            kw['cache_da'] = cs_id != cs_ids[-1]
-            hbonds.append(find_hbonds(session, [structure], **kw))
+        if status:
+            session.logger.status("Finding donors and acceptors in model '%s'" % structure.name,
+                blank_after=0)
+        acc_atoms, acc_data = _find_acceptors(structure, criteria.a_params, acceptors,
+            criteria.generic_acc_info)
+        don_atoms, don_data = _find_donors(structure, criteria.d_params, donors,
+            criteria.generic_don_info)
+        hbonds = _trajectory_hbonds(session, structure, coordset_ids, don_atoms, don_data,
+            acc_atoms, acc_data, criteria, block_size, status)
     finally:
-        structure.active_coordset_od = cur_cs_id
+        structure.active_coordset_id = cur_cs_id
         structure.active_coordset_change_notify = True
+        delattr(Atom, "_hb_coord")
+        _problem = None
+    if _truncated:
+        session.logger.warning("%d atoms were skipped as donors/acceptors due to missing"
+            " heavy-atom bond partners" % len(_truncated))
+    _truncated = None
+    if status:
+        session.logger.status("")
     return hbonds
 
+def _trajectory_hbonds(session, structure, cs_ids, don_atoms, don_data, acc_atoms, acc_data,
+        criteria, block_size, status):
+    from chimerax.atomic import Atoms
+    from numpy import array, float32, int64, sqrt, unique, zeros, empty
+    donors, acceptors = Atoms(don_atoms), Atoms(acc_atoms)
+    nd, na, nf = len(donors), len(acceptors), len(cs_ids)
+    test_dist = array([dd[3] for dd in don_data], float32)
+    if (acceptors.element_numbers == 16).any():
+        from .common_geom import SULFUR_COMP
+        test_dist += SULFUR_COMP
+    dci, aci = donors.coord_indices, acceptors.coord_indices
+    metal_atoms = structure.atoms.filter(structure.atoms.elements.is_metal)
+    mci = metal_atoms.coord_indices
+
+    hb_don, hb_acc, hb_frame = [], [], []
+    bad_pairs = set()
+    atom_type_errors = set()
+    if nd > 0 and na > 0:
+        max_test_dist = test_dist.max()
+        for b0 in range(0, nf, block_size):
+            block = cs_ids[b0:b0+block_size]
+            if status:
+                session.logger.status("Finding hydrogen bonds in coordsets %d-%d of %d"
+                    % (b0+1, b0+len(block), nf), blank_after=0)
+            xyz = array([structure.coordset(cs_id).xyzs for cs_id in block], float32)
+            dxyz, axyz = xyz[:,dci], xyz[:,aci]
+            # Pairs that can come within H-bond distance in this block of coordsets.
+            # Atoms that move far within the block (e.g. waters wrapping across a periodic
+            # box) would make the candidate cutoff huge, so those are searched per coordset.
+            dmove = sqrt(((dxyz - dxyz[0])**2).sum(axis=2)).max(axis=0)
+            amove = sqrt(((axyz - axyz[0])**2).sum(axis=2)).max(axis=0)
+            dfast, afast = dmove > _block_move_limit, amove > _block_move_limit
+            dslow, aslow = (~dfast).nonzero()[0], (~afast).nonzero()[0]
+            cutoff = max_test_dist + 2*_block_move_limit
+            di, ai, d0 = close_point_pairs(dxyz[0,dslow], axyz[0,aslow], cutoff)
+            di, ai = dslow[di], aslow[ai]
+            keep = (d0 <= test_dist[di] + dmove[di] + amove[ai]) & (dci[di] != aci[ai])
+            di, ai = di[keep], ai[keep]
+            d2 = ((dxyz[:,di] - axyz[:,ai])**2).sum(axis=2)
+            within = (d2 <= test_dist[di]**2)
+            dfast, afast = dfast.nonzero()[0], afast.nonzero()[0]
+            for f, cs_id in enumerate(block):
+                fdi, fai = di[within[f]], ai[within[f]]
+                if len(dfast) > 0 or len(afast) > 0:
+                    fdi, fai = _fast_atom_pairs(dxyz[f], axyz[f], dfast, afast, dslow,
+                        test_dist, max_test_dist, dci, aci, fdi, fai)
+                if len(fdi) == 0:
+                    continue
+                structure.active_coordset_id = cs_id
+                metal_xyz = xyz[f,mci]
+                donor_hyds = {}
+                for d, a in zip(fdi, fai):
+                    if (d, a) in bad_pairs:
+                        continue
+                    if d not in donor_hyds:
+                        donor_hyds[d] = hyd_positions(don_atoms[d])
+                    ok = _pair_hbonded(don_atoms[d], donor_hyds[d], don_data[d], acc_data[a],
+                        criteria, metal_xyz, axyz[f,a], dxyz[f,d], atom_type_errors)
+                    if ok is None:
+                        bad_pairs.add((d, a))
+                    elif ok:
+                        hb_don.append(d)
+                        hb_acc.append(a)
+                        hb_frame.append(b0 + f)
+    if bad_pairs:
+        session.logger.warning("Skipped %d possible H-bond(s) with bad connectivities"
+            % len(bad_pairs))
+    for msg in sorted(atom_type_errors):
+        session.logger.warning(msg)
+
+    if hb_don:
+        keys = array(hb_don, int64)*na + array(hb_acc, int64)
+        pair_keys, pair_index = unique(keys, return_inverse = True)
+        occupancy = zeros((len(pair_keys), nf), bool)
+        occupancy[pair_index, hb_frame] = True
+        pair_donors, pair_acceptors = donors[pair_keys // na], acceptors[pair_keys % na]
+    else:
+        occupancy = empty((0, nf), bool)
+        pair_donors = pair_acceptors = Atoms()
+    return TrajectoryHBonds(pair_donors, pair_acceptors, list(cs_ids), occupancy)
+
+# Donors and acceptors moving more than this distance (Angstroms) within a block
+# of coordsets are searched for H-bond partners in each coordset separately.
+_block_move_limit = 2.0
+
+def _fast_atom_pairs(dxyz, axyz, dfast, afast, dslow, test_dist, max_test_dist, dci, aci,
+        di, ai):
+    """Add donor/acceptor pairs within H-bond distance in one coordset that involve
+       donors or acceptors that move far within a block of coordsets.
+    """
+    from numpy import concatenate
+    dis, ais = [di], [ai]
+    # Fast donors with all acceptors, then other donors with fast acceptors.
+    for dsub, asub in ((dfast, None), (dslow, afast)):
+        if len(dsub) == 0 or (asub is not None and len(asub) == 0):
+            continue
+        # Same squared distance test as pairs of slow moving atoms.
+        pdi, pai, d = close_point_pairs(dxyz[dsub], axyz if asub is None else axyz[asub],
+            max_test_dist + 0.1)
+        pdi = dsub[pdi]
+        if asub is not None:
+            pai = asub[pai]
+        d2 = ((dxyz[pdi] - axyz[pai])**2).sum(axis=1)
+        keep = (d2 <= test_dist[pdi]**2) & (dci[pdi] != aci[pai])
+        dis.append(pdi[keep])
+        ais.append(pai[keep])
+    return concatenate(dis), concatenate(ais)
+
+def _pair_hbonded(donor_atom, donor_hyds, donor_data, acc_data, criteria,
+        metal_xyz, acc_xyz, don_xyz, atom_type_errors):
+    """Apply the find_hbonds() acceptor, donor and metal-coordination tests to a pair
+       within H-bond distance.  Returns None if the connectivity is bad.  Donor atom
+       type errors are added to the 'atom_type_errors' set, as find_hbonds() warns
+       about them, and the pair is not H-bonded.
+    """
+    acc_atom, geom_func, args = acc_data
+    geom_type, tau_sym, arg_list, test_dist = donor_data
+    try:
+        if not geom_func(donor_atom, donor_hyds, *args):
+            return False
+        donor_func, donor_args = criteria.donor_test(donor_atom, geom_type, tau_sym, arg_list)
+        if not donor_func(donor_atom, donor_hyds, acc_atom, *donor_args):
+            return False
+    except ConnectivityError:
+        return None
+    except AtomTypeError as e:
+        atom_type_errors.add(str(e))
+        return False
+    if len(metal_xyz) > 0:
+        from chimerax.geometry import angle
+        close = ((metal_xyz - acc_xyz)**2).sum(axis=1) <= 16.0
+        for mxyz in metal_xyz[close]:
+            if angle(don_xyz, acc_xyz, mxyz) < 45.0:
+                return False
+    return True
+
+class TrajectoryHBonds:
+    """Hydrogen bonds found in multiple coordsets by find_trajectory_hbonds().
+
+       'donors' and 'acceptors' are Atoms collections, one entry per H-bonded pair,
+       'coordset_ids' are the coordsets examined, and 'occupancy' is a boolean NumPy array
+       of size (number of pairs, number of coordsets) that is True where a pair is H-bonded.
+    """
+    def __init__(self, donors, acceptors, coordset_ids, occupancy):
+        self.donors = donors
+        self.acceptors = acceptors
+        self.coordset_ids = coordset_ids
+        self.occupancy = occupancy
+
+    @property
+    def num_pairs(self):
+        return len(self.donors)
+
+    @property
+    def num_coordsets(self):
+        return len(self.coordset_ids)
+
+    def counts(self):
+        """Number of coordsets in which each pair is H-bonded"""
+        return self.occupancy.sum(axis=1)
+
+    def fractions(self):
+        """Fraction of coordsets in which each pair is H-bonded"""
+        n = self.num_coordsets
+        return self.counts() / n if n > 0 else self.counts().astype(float)
+
+    def longest_runs(self):
+        """Longest number of consecutive coordsets in which each pair is H-bonded"""
+        from numpy import zeros, diff, int8, maximum
+        occ = self.occupancy
+        runs = zeros((len(occ),), int)
+        if occ.size == 0:
+            return runs
+        padded = zeros((occ.shape[0], occ.shape[1]+2), int8)
+        padded[:,1:-1] = occ
+        change = diff(padded, axis=1)
+        spairs, starts = (change == 1).nonzero()
+        epairs, ends = (change == -1).nonzero()
+        # Starts and ends are both ordered by pair then coordset so they match up.
+        maximum.at(runs, spairs, ends - starts)
+        return runs
+
+    def statistics(self):
+        """List of (donor, acceptor, fraction, longest run) tuples ordered by decreasing
+           fraction of coordsets H-bonded
+        """
+        fractions, runs = self.fractions(), self.longest_runs()
+        stats = [(d, a, f, r) for d, a, f, r in zip(self.donors, self.acceptors, fractions, runs)]
+        stats.sort(key=lambda s: -s[2])
+        return stats
+
+    def coordset_hbonds(self, cs_id):
+        """List of (donor, acceptor) pairs H-bonded in the given coordset"""
+        f = self.coordset_ids.index(cs_id)
+        pairs = self.occupancy[:,f].nonzero()[0]
+        return list(zip(self.donors[pairs], self.acceptors[pairs]))
+
+    def hbond_lists(self):
+        """List of (donor, acceptor) lists, one per coordset, as from find_coordset_hbonds()"""
+        donors, acceptors = list(self.donors), list(self.acceptors)
+        return [[(donors[p], acceptors[p]) for p in column.nonzero()[0]]
+                for column in self.occupancy.T]
+
 def find_hbonds(session, structures, *, inter_model=True, intra_model=True, donors=None, acceptors=None,
         dist_slop=0.0, angle_slop=0.0, inter_submodel=False, cache_da=False, status=True):
     """Hydrogen bond detection based on criteria in "Three-dimensional
@@ -394,89 +645,8 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
         # Used (as necessary) to cache expensive calculations (by other functions also)
         _compute_cache = {}
 
-        process_key = (dist_slop, angle_slop)
-        if process_key not in processed_acceptor_params:
-            # copy.deepcopy() refuses to copy functions (even as
-            # references), so do this instead...
-            a_params = []
-            for p in acceptor_params:
-                a_params.append(copy.copy(p))
-
-            for i in range(len(a_params)):
-                a_params[i][3] = _process_arg_tuple(a_params[i][3], dist_slop, angle_slop)
-            processed_acceptor_params[process_key] = a_params
-        else:
-            a_params = processed_acceptor_params[process_key]
-
-        # compute some info for generic acceptors/donors
-        generic_acc_info = {}
-        # oxygens...
-        generic_O_acc_args = _process_arg_tuple([3.53, 90], dist_slop, angle_slop)
-        generic_acc_info['misc_O'] = (acc_generic, generic_O_acc_args)
-        # dictionary based on bonded atom's geometry...
-        generic_acc_info['O2-'] = {
-            single: (acc_generic, generic_O_acc_args),
-            linear: (acc_generic, generic_O_acc_args),
-            planar: (acc_phi_psi, _process_arg_tuple([3.53, 90, 130], dist_slop, angle_slop)),
-            tetrahedral: (acc_generic, generic_O_acc_args)
-        }
-        generic_acc_info['O3-'] = generic_acc_info['O2-']
-        generic_acc_info['O2'] = {
-            single: (acc_generic, generic_O_acc_args),
-            linear: (acc_generic, generic_O_acc_args),
-            planar: (acc_phi_psi, _process_arg_tuple([3.30, 110, 130], dist_slop, angle_slop)),
-            tetrahedral: (acc_theta_tau, _process_arg_tuple(
-                [3.03, 100, -180, 145], dist_slop, angle_slop))
-        }
-        # list based on number of known bonded atoms...
-        generic_acc_info['O3'] = [
-            (acc_generic, generic_O_acc_args),
-            (acc_theta_tau, _process_arg_tuple([3.17, 100, -161, 145], dist_slop, angle_slop)),
-            (acc_phi_psi, _process_arg_tuple([3.42, 120, 135], dist_slop, angle_slop))
-        ]
-        # nitrogens...
-        generic_N_acc_args = _process_arg_tuple([3.42, 90], dist_slop, angle_slop)
-        generic_acc_info['misc_N'] = (acc_generic, generic_N_acc_args)
-        generic_acc_info['N2'] = (acc_phi_psi, _process_arg_tuple([3.42, 140, 135],
-                dist_slop, angle_slop))
-        # tuple based on number of bonded heavy atoms...
-        generic_N3_mult_heavy_acc_args = _process_arg_tuple([3.30, 153, -180, 145],
-                dist_slop, angle_slop)
-        generic_acc_info['N3'] = (
-            (acc_generic, generic_N_acc_args),
-            # only one example to draw from; weaken by .1A, 5 degrees
-            (acc_theta_tau, _process_arg_tuple([3.13, 98, -180, 150], dist_slop, angle_slop)),
-            (acc_theta_tau, generic_N3_mult_heavy_acc_args),
-            (acc_theta_tau, generic_N3_mult_heavy_acc_args)
-        )
-        # one example only; weaken by .1A, 5 degrees
-        generic_acc_info['N1'] = (acc_theta_tau, _process_arg_tuple(
-                    [3.40, 136, -180, 145], dist_slop, angle_slop))
-        # sulfurs...
-        # one example only; weaken by .1A, 5 degrees
-        generic_acc_info['S2'] = (acc_phi_psi, _process_arg_tuple([3.83, 85, 140],
-                dist_slop, angle_slop))
-        generic_acc_info['Sar'] = generic_acc_info['S3-'] = (acc_generic,
-                _process_arg_tuple([3.83, 85], dist_slop, angle_slop))
-        # now the donors...
-
-        # planar nitrogens
-        gen_don_Npl_1h_params = (don_theta_tau, _process_arg_tuple([2.23, 136,
-            2.23, 141, 140, 2.46, 136, 140], dist_slop, angle_slop))
-        gen_don_Npl_2h_params = (don_upsilon_tau, _process_arg_tuple([3.30, 90, -153,
-            135, -45, 3.30, 90, -146, 140, -37.5, 130, 3.40, 108, -166, 125, -35, 140],
-            dist_slop, angle_slop))
-        gen_don_O_dists = [2.41, 2.28, 2.28, 3.27, 3.14, 3.14]
-        gen_don_O_params = (don_generic, _process_arg_tuple(gen_don_O_dists, dist_slop, angle_slop))
-        gen_don_N_dists = [2.36, 2.48, 2.48, 3.30, 3.42, 3.42]
-        gen_don_N_params = (don_generic, _process_arg_tuple(gen_don_N_dists, dist_slop, angle_slop))
-        gen_don_S_dists = [2.42, 2.42, 2.42, 3.65, 3.65, 3.65]
-        gen_don_S_params = (don_generic, _process_arg_tuple(gen_don_S_dists, dist_slop, angle_slop))
-        generic_don_info = {
-            'O': gen_don_O_params,
-            'N': gen_don_N_params,
-            'S': gen_don_S_params
-        }
+        criteria = _HBondCriteria(dist_slop, angle_slop)
+        a_params, generic_acc_info = criteria.a_params, criteria.generic_acc_info
 
         from chimerax.atom_search import AtomSearchTree
         metal_coord = {}
@@ -520,41 +690,8 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
                 for acc_atom, geom_func, args in acc_tree.search(metal._hb_coord, 4.0):
                     metal_coord.setdefault(acc_atom, []).append(metal)
 
-        if process_key not in processed_donor_params:
-            # find max donor distances before they get squared..
-
-            # copy.deepcopy() refuses to copy functions (even as
-            # references), so do this instead...
-            d_params = []
-            for p in donor_params:
-                d_params.append(copy.copy(p))
-
-            for di in range(len(d_params)):
-                geom_type = d_params[di][2]
-                arg_list = d_params[di][4]
-                don_rad = Element.bond_radius('N')
-                if geom_type == theta_tau:
-                    max_dist = max((arg_list[0], arg_list[2], arg_list[5]))
-                elif geom_type == upsilon_tau:
-                    max_dist = max((arg_list[0], arg_list[5], arg_list[11]))
-                elif geom_type == water:
-                    max_dist = max((arg_list[1], arg_list[4], arg_list[8]))
-                else:
-                    max_dist = max(gen_don_O_dists + gen_don_N_dists + gen_don_S_dists)
-                    don_rad = Element.bond_radius('S')
-                d_params[di].append(max_dist + dist_slop + don_rad + Element.bond_radius('H'))
-
-            for i in range(len(d_params)):
-                d_params[i][4] = _process_arg_tuple(d_params[i][4], dist_slop, angle_slop)
-            processed_donor_params[process_key] = d_params
-        else:
-            d_params = processed_donor_params[process_key]
-
-        generic_water_params = _process_arg_tuple([2.36, 2.36 + OH_bond_dist, 146],
-                                dist_slop, angle_slop)
-        generic_theta_tau_params = _process_arg_tuple([2.48, 132], dist_slop, angle_slop)
-        generic_upsilon_tau_params = _process_arg_tuple([3.42, 90, -161, 125], dist_slop, angle_slop)
-        generic_generic_params = _process_arg_tuple([2.48, 3.42, 130, 90], dist_slop, angle_slop)
+        d_params = criteria.d_params
+        generic_don_info = criteria.generic_don_info
         for dmi in range(len(structures)):
             structure = structures[dmi]
             if status:
@@ -623,38 +760,10 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
                             raise
                         if verbose:
                             session.logger.info("\t%s satisfies acceptor criteria" % acc_atom)
-                        if geom_type == upsilon_tau:
-                            donor_func = don_upsilon_tau
-                            add_args = generic_upsilon_tau_params + [tau_sym]
-                        elif geom_type == theta_tau:
-                            donor_func = don_theta_tau
-                            add_args = generic_theta_tau_params
-                        elif geom_type == water:
-                            donor_func = don_water
-                            add_args = generic_water_params
-                        else:
-                            if donor_atom.idatm_type in ["Npl", "N2+"]:
-                                heavys = 0
-                                for bonded in donor_atom.neighbors:
-                                    if bonded.element.number > 1:
-                                        heavys += 1
-                                if heavys > 1:
-                                    info = gen_don_Npl_1h_params
-                                else:
-                                    info = gen_don_Npl_2h_params
-                            else:
-                                info = generic_don_info[donor_atom.element.name]
-                            donor_func, arg_list = info
-                            add_args = generic_generic_params
-                            if donor_func == don_upsilon_tau:
-                                # tack on generic
-                                # tau symmetry
-                                add_args = generic_upsilon_tau_params + [4]
-                            elif donor_func == don_theta_tau:
-                                add_args = generic_theta_tau_params
+                        donor_func, donor_args = criteria.donor_test(donor_atom, geom_type,
+                            tau_sym, arg_list)
                         try:
-                            if not donor_func(donor_atom, donor_hyds, acc_atom,
-                                    *tuple(arg_list + add_args)):
+                            if not donor_func(donor_atom, donor_hyds, acc_atom, *donor_args):
                                 continue
                         except ConnectivityError as e:
                             session.logger.info("Skipping possible donor with bad geometry: %s\n%s\n"
@@ -734,6 +843,176 @@ def find_hbonds(session, structures, *, inter_model=True, intra_model=True, dono
         delattr(Atom, "_hb_coord")
     return hbonds
 
+class _HBondCriteria:
+    """Processed donor/acceptor parameters for given distance and angle slop"""
+
+    def __init__(self, dist_slop, angle_slop):
+        process_key = (dist_slop, angle_slop)
+        if process_key not in processed_acceptor_params:
+            # copy.deepcopy() refuses to copy functions (even as
+            # references), so do this instead...
+            a_params = []
+            for p in acceptor_params:
+                a_params.append(copy.copy(p))
+
+            for i in range(len(a_params)):
+                a_params[i][3] = _process_arg_tuple(a_params[i][3], dist_slop, angle_slop)
+            processed_acceptor_params[process_key] = a_params
+        else:
+            a_params = processed_acceptor_params[process_key]
+
+        # compute some info for generic acceptors/donors
+        generic_acc_info = {}
+        # oxygens...
+        generic_O_acc_args = _process_arg_tuple([3.53, 90], dist_slop, angle_slop)
+        generic_acc_info['misc_O'] = (acc_generic, generic_O_acc_args)
+        # dictionary based on bonded atom's geometry...
+        generic_acc_info['O2-'] = {
+            single: (acc_generic, generic_O_acc_args),
+            linear: (acc_generic, generic_O_acc_args),
+            planar: (acc_phi_psi, _process_arg_tuple([3.53, 90, 130], dist_slop, angle_slop)),
+            tetrahedral: (acc_generic, generic_O_acc_args)
+        }
+        generic_acc_info['O3-'] = generic_acc_info['O2-']
+        generic_acc_info['O2'] = {
+            single: (acc_generic, generic_O_acc_args),
+            linear: (acc_generic, generic_O_acc_args),
+            planar: (acc_phi_psi, _process_arg_tuple([3.30, 110, 130], dist_slop, angle_slop)),
+            tetrahedral: (acc_theta_tau, _process_arg_tuple(
+                [3.03, 100, -180, 145], dist_slop, angle_slop))
+        }
+        # list based on number of known bonded atoms...
+        generic_acc_info['O3'] = [
+            (acc_generic, generic_O_acc_args),
+            (acc_theta_tau, _process_arg_tuple([3.17, 100, -161, 145], dist_slop, angle_slop)),
+            (acc_phi_psi, _process_arg_tuple([3.42, 120, 135], dist_slop, angle_slop))
+        ]
+        # nitrogens...
+        generic_N_acc_args = _process_arg_tuple([3.42, 90], dist_slop, angle_slop)
+        generic_acc_info['misc_N'] = (acc_generic, generic_N_acc_args)
+        generic_acc_info['N2'] = (acc_phi_psi, _process_arg_tuple([3.42, 140, 135],
+                dist_slop, angle_slop))
+        # tuple based on number of bonded heavy atoms...
+        generic_N3_mult_heavy_acc_args = _process_arg_tuple([3.30, 153, -180, 145],
+                dist_slop, angle_slop)
+        generic_acc_info['N3'] = (
+            (acc_generic, generic_N_acc_args),
+            # only one example to draw from; weaken by .1A, 5 degrees
+            (acc_theta_tau, _process_arg_tuple([3.13, 98, -180, 150], dist_slop, angle_slop)),
+            (acc_theta_tau, generic_N3_mult_heavy_acc_args),
+            (acc_theta_tau, generic_N3_mult_heavy_acc_args)
+        )
+        # one example only; weaken by .1A, 5 degrees
+        generic_acc_info['N1'] = (acc_theta_tau, _process_arg_tuple(
+                    [3.40, 136, -180, 145], dist_slop, angle_slop))
+        # sulfurs...
+        # one example only; weaken by .1A, 5 degrees
+        generic_acc_info['S2'] = (acc_phi_psi, _process_arg_tuple([3.83, 85, 140],
+                dist_slop, angle_slop))
+        generic_acc_info['Sar'] = generic_acc_info['S3-'] = (acc_generic,
+                _process_arg_tuple([3.83, 85], dist_slop, angle_slop))
+        # now the donors...
+
+        # planar nitrogens
+        gen_don_Npl_1h_params = (don_theta_tau, _process_arg_tuple([2.23, 136,
+            2.23, 141, 140, 2.46, 136, 140], dist_slop, angle_slop))
+        gen_don_Npl_2h_params = (don_upsilon_tau, _process_arg_tuple([3.30, 90, -153,
+            135, -45, 3.30, 90, -146, 140, -37.5, 130, 3.40, 108, -166, 125, -35, 140],
+            dist_slop, angle_slop))
+        gen_don_O_dists = [2.41, 2.28, 2.28, 3.27, 3.14, 3.14]
+        gen_don_O_params = (don_generic, _process_arg_tuple(gen_don_O_dists, dist_slop, angle_slop))
+        gen_don_N_dists = [2.36, 2.48, 2.48, 3.30, 3.42, 3.42]
+        gen_don_N_params = (don_generic, _process_arg_tuple(gen_don_N_dists, dist_slop, angle_slop))
+        gen_don_S_dists = [2.42, 2.42, 2.42, 3.65, 3.65, 3.65]
+        gen_don_S_params = (don_generic, _process_arg_tuple(gen_don_S_dists, dist_slop, angle_slop))
+        generic_don_info = {
+            'O': gen_don_O_params,
+            'N': gen_don_N_params,
+            'S': gen_don_S_params
+        }
+
+        if process_key not in processed_donor_params:
+            # find max donor distances before they get squared..
+
+            # copy.deepcopy() refuses to copy functions (even as
+            # references), so do this instead...
+            d_params = []
+            for p in donor_params:
+                d_params.append(copy.copy(p))
+
+            for di in range(len(d_params)):
+                geom_type = d_params[di][2]
+                arg_list = d_params[di][4]
+                don_rad = Element.bond_radius('N')
+                if geom_type == theta_tau:
+                    max_dist = max((arg_list[0], arg_list[2], arg_list[5]))
+                elif geom_type == upsilon_tau:
+                    max_dist = max((arg_list[0], arg_list[5], arg_list[11]))
+                elif geom_type == water:
+                    max_dist = max((arg_list[1], arg_list[4], arg_list[8]))
+                else:
+                    max_dist = max(gen_don_O_dists + gen_don_N_dists + gen_don_S_dists)
+                    don_rad = Element.bond_radius('S')
+                d_params[di].append(max_dist + dist_slop + don_rad + Element.bond_radius('H'))
+
+            for i in range(len(d_params)):
+                d_params[i][4] = _process_arg_tuple(d_params[i][4], dist_slop, angle_slop)
+            processed_donor_params[process_key] = d_params
+        else:
+            d_params = processed_donor_params[process_key]
+
+        generic_water_params = _process_arg_tuple([2.36, 2.36 + OH_bond_dist, 146],
+                                dist_slop, angle_slop)
+        generic_theta_tau_params = _process_arg_tuple([2.48, 132], dist_slop, angle_slop)
+        generic_upsilon_tau_params = _process_arg_tuple([3.42, 90, -161, 125], dist_slop, angle_slop)
+        generic_generic_params = _process_arg_tuple([2.48, 3.42, 130, 90], dist_slop, angle_slop)
+
+        self.a_params = a_params
+        self.d_params = d_params
+        self.generic_acc_info = generic_acc_info
+        self.generic_don_info = generic_don_info
+        self.gen_don_Npl_1h_params = gen_don_Npl_1h_params
+        self.gen_don_Npl_2h_params = gen_don_Npl_2h_params
+        self.generic_water_params = generic_water_params
+        self.generic_theta_tau_params = generic_theta_tau_params
+        self.generic_upsilon_tau_params = generic_upsilon_tau_params
+        self.generic_generic_params = generic_generic_params
+
+    def donor_test(self, donor_atom, geom_type, tau_sym, arg_list):
+        """Return the donor geometry function and its arguments following the
+           donor atom, donor hydrogen positions and acceptor atom
+        """
+        if geom_type == upsilon_tau:
+            donor_func = don_upsilon_tau
+            add_args = self.generic_upsilon_tau_params + [tau_sym]
+        elif geom_type == theta_tau:
+            donor_func = don_theta_tau
+            add_args = self.generic_theta_tau_params
+        elif geom_type == water:
+            donor_func = don_water
+            add_args = self.generic_water_params
+        else:
+            if donor_atom.idatm_type in ["Npl", "N2+"]:
+                heavys = 0
+                for bonded in donor_atom.neighbors:
+                    if bonded.element.number > 1:
+                        heavys += 1
+                if heavys > 1:
+                    info = self.gen_don_Npl_1h_params
+                else:
+                    info = self.gen_don_Npl_2h_params
+            else:
+                info = self.generic_don_info[donor_atom.element.name]
+            donor_func, arg_list = info
+            add_args = self.generic_generic_params
+            if donor_func == don_upsilon_tau:
+                # tack on generic
+                # tau symmetry
+                add_args = self.generic_upsilon_tau_params + [4]
+            elif donor_func == don_theta_tau:
+                add_args = self.generic_theta_tau_params
+        return donor_func, tuple(arg_list + add_args)
+
 def _process_arg_tuple(arg_tuple, dist_slop, angle_slop):
     new_args = []
     for arg in arg_tuple:
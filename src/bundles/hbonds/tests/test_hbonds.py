@@ -5,3 +5,18 @@ def test_hbonds(test_production_session):
     run(session, "open 2gbp")
     hbonds = find_hbonds(session, session.models[:1], dist_slop=rec_dist_slop, angle_slop=rec_angle_slop)
     assert(len(hbonds) == 793), "Expected to find 793 hbonds in 2gbp; actually found %d" % len(hbonds)
+
+def test_trajectory_hbonds(test_production_session):
+    from chimerax.core.commands import run
+    from chimerax.hbonds import find_hbonds, find_trajectory_hbonds, rec_dist_slop, rec_angle_slop
+    session = test_production_session
+    run(session, "open 2gbp")
+    s = session.models[0]
+    from numpy import array
+    xyz = s.atoms.coords
+    s.add_coordsets(array([xyz, xyz, xyz]), replace=True)
+    hbonds = find_hbonds(session, [s], dist_slop=rec_dist_slop, angle_slop=rec_angle_slop)
+    traj = find_trajectory_hbonds(session, s, dist_slop=rec_dist_slop, angle_slop=rec_angle_slop)
+    assert traj.occupancy.shape == (len(hbonds), 3)
+    assert traj.occupancy.all()
+    assert set(traj.coordset_hbonds(traj.coordset_ids[1])) == set(hbonds)
@@ -226,6 +226,12 @@ class _MapBundle(BundleAPI):
                         })
                     if _name == "MRC density map":
                         args.update({'value_type': EnumOf(('int8', 'int16', 'uint16','float16', 'float32'))})
+                    if _name == "Zarr map":
+                        args.update({
+                            'brick_size': Int1or3Arg,
+                            'compress': BoolArg,
+                            'compress_level': IntArg,
+                        })
                     return args
 
                 def save_args_widget(self, session):
@@ -48,6 +48,8 @@ class _VolumeSettings(Settings):
                            (.6,.75,.9,1),
                            (.8,.8,.6,1)),
 	'data_cache_size': None,                # None or float value in Mbytes.  None means use half physical memory.
+        'data_cache_disk_size': 0.0,            # Mbytes of decoded map data kept on disk.  0 means no disk cache.
+        'data_cache_directory': None,           # None means use the user cache directory.
         'selectable_subregions': False,
         'subregion_button': 'middle',
         'box_padding': 0.0,
@@ -60,6 +62,7 @@ class _VolumeSettings(Settings):
         'voxel_limit_for_plane': 256.0,         # Mvoxels
         'limit_voxel_count': True,
         'voxel_limit': 16.0,                    # Mvoxels
+        'level_of_detail': False,
         'auto_show_subregion': False,
         'adjust_camera': False,
         'shown_panels': ('Threshold and Color', 'Display style'),
@@ -118,6 +121,8 @@ class VolumeDefaultSettings:
 
     if key == 'data_cache_size':
       return self.data_cache_size()	# Compute default value if none is saved.
+    if key == 'data_cache_directory':
+      return self.data_cache_directory()
     return getattr(self._settings, key)
 
   # ---------------------------------------------------------------------------
@@ -135,6 +140,16 @@ class VolumeDefaultSettings:
         csize_mb = csize/(2**20)
     return csize_mb
 
+  # ---------------------------------------------------------------------------
+  #
+  def data_cache_directory(self):
+    cdir = self._settings.data_cache_directory
+    if cdir is None:
+      from chimerax import app_dirs
+      from os.path import join
+      cdir = join(app_dirs.user_cache_dir, 'volume_data')
+    return cdir
+
   # ---------------------------------------------------------------------------
   #
   def rendering_option_names(self):
@@ -144,6 +159,7 @@ class VolumeDefaultSettings:
             'outline_box_linewidth',
             'limit_voxel_count',
             'voxel_limit',
+            'level_of_detail',
             'color_mode',
             'colormap_on_gpu',
             'colormap_size',
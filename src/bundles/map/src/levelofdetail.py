@@ -0,0 +1,227 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Multi-resolution pyramids and automatic level of detail for large maps.
+#
+# The "volume pyramid" command adds 2x2x2 averaged copies of a map as
+# subsamples so that coarse steps read little data.  With the rendering
+# option level_of_detail enabled the volume step and region are chosen from
+# the current view each time the camera or map moves: the coarsest
+# power of 2 step whose voxels are no larger than a screen pixel is used,
+# and when zoomed in the region is cropped to the visible part of the map
+# so that full resolution can be shown within the voxel limit.
+#
+def volume_pyramid(session, volumes, levels = 4, on_disk = False, directory = None):
+    '''
+    Compute a multi-resolution pyramid of 2x2x2 averaged maps for each volume
+    and use it when the volume is displayed with step 2, 4, 8, ....
+
+    Parameters
+    ----------
+    volumes : list of Volume
+    levels : int
+      Number of pyramid levels.  Level N has cell size 2**N.
+    on_disk : bool
+      Whether to store the levels as a Zarr directory next to the map file,
+      named <mapname>_pyramid.zarr, and reuse it if the map file is unchanged.
+      Otherwise the levels are kept in memory.
+    directory : string
+      Zarr directory for the pyramid levels.  Implies on_disk.
+    '''
+    if levels < 1:
+        from chimerax.core.errors import UserError
+        raise UserError('volume pyramid levels must be at least 1, got %d' % levels)
+
+    from chimerax.map_data.pyramid import pyramid_grid, pyramid_directory
+    from time import time
+    for v in volumes:
+        if on_disk or directory:
+            dir = directory or pyramid_directory(v.data)
+            if dir is None:
+                from chimerax.core.errors import UserError
+                raise UserError('Map %s has no file, specify the pyramid directory'
+                                % v.name_with_id())
+        else:
+            dir = None
+        t0 = time()
+        sg = pyramid_grid(v.data, levels, dir, log = session.logger)
+        t1 = time()
+        v.replace_data(sg)
+        v._drawings_need_update()
+        sizes = ', '.join('%d,%d,%d' % g.size for c,g in sorted(sg.available_subsamplings.items())
+                          if c != (1,1,1))
+        where = 'in %s' % dir if dir else 'in memory'
+        session.logger.info('Made pyramid for %s %s, level sizes %s, %.2f seconds'
+                            % (v.name_with_id(), where, sizes, t1-t0))
+    session.logger.status('')
+
+# -----------------------------------------------------------------------------
+#
+def register_volume_pyramid_command(logger):
+    from chimerax.core.commands import CmdDesc, register, IntArg, BoolArg, SaveFolderNameArg
+    from .mapargs import MapsArg
+
+    desc = CmdDesc(
+        required = [('volumes', MapsArg)],
+        keyword = [('levels', IntArg),
+                   ('on_disk', BoolArg),
+                   ('directory', SaveFolderNameArg)],
+        synopsis = 'Compute multi-resolution pyramid for fast display of large maps')
+    register('volume pyramid', desc, volume_pyramid, logger=logger)
+
+# -----------------------------------------------------------------------------
+# Update step and region of volumes using the level_of_detail rendering option
+# when the camera, window size, or volume position changes.
+#
+class LevelOfDetailManager:
+    def __init__(self, session):
+        self._session = session
+        self._last_view = {}		# Volume -> view parameters when last updated
+        self._handler = session.triggers.add_handler('new frame', self._new_frame)
+
+    def _new_frame(self, *_):
+        s = self._session
+        from .volume import Volume
+        vlist = [v for v in s.models.list(type = Volume)
+                 if v.rendering_options.level_of_detail]
+        if len(vlist) == 0:
+            s._volume_lod_manager = None
+            from chimerax.core.triggerset import DEREGISTER
+            return DEREGISTER
+
+        view = s.main_view
+        c = view.camera
+        vp = (tuple(c.position.matrix.flat), tuple(view.window_size))
+        last = self._last_view
+        for v in vlist:
+            if not v.display or not v.parents_displayed:
+                continue
+            key = vp + (tuple(v.scene_position.matrix.flat),)
+            if last.get(v) == key:
+                continue
+            last[v] = key
+            update_level_of_detail(v, view)
+        for v in tuple(last.keys()):
+            if v.deleted:
+                del last[v]
+
+# -----------------------------------------------------------------------------
+#
+def level_of_detail_manager(session, create = True):
+    m = getattr(session, '_volume_lod_manager', None)
+    if m is None and create:
+        session._volume_lod_manager = m = LevelOfDetailManager(session)
+    return m
+
+# -----------------------------------------------------------------------------
+# Switch to a new region and step if the view needs a different resolution
+# or shows parts of the map outside the current region.
+#
+def update_level_of_detail(v, view):
+    ro = v.rendering_options
+    if v.image_shown and ro.image_mode != 'full region':
+        return False
+    if v.showing_one_plane:
+        return False
+
+    r = view_region_and_step(v, view)
+    if r is None:
+        return False
+    vmin, vmax, step = r
+
+    cmin, cmax, cstep = v.region
+    contains = ([c <= m for c,m in zip(cmin, vmin)] + [c >= m for c,m in zip(cmax, vmax)])
+    if tuple(cstep) == tuple(step) and all(contains):
+        # Current region covers view.  Keep it unless it is much bigger than needed.
+        from .volume import subarray_size
+        if subarray_size(cmin, cmax, step) <= 8 * subarray_size(vmin, vmax, step):
+            return False
+
+    # Pad region so small motions don't require a new region.
+    size = v.data.size
+    pad = [(b-a)//4 for a,b in zip(vmin, vmax)]
+    rmin = [max(0, a-p) for a,p in zip(vmin, pad)]
+    rmax = [min(s-1, b+p) for b,p,s in zip(vmax, pad, size)]
+    return v.new_region(rmin, rmax, step, adjust_step = False, adjust_voxel_limit = False)
+
+# -----------------------------------------------------------------------------
+# Return the ijk region of the volume visible in the window and the
+# step size matching the screen pixel size, or None if the volume is not
+# in view.  The step is increased if needed to stay within the voxel limit.
+#
+def view_region_and_step(v, view, samples = 9):
+    d = v.data
+    size = d.size
+    vmin, vmax = (0,0,0), tuple(s-1 for s in size)
+
+    w, h = view.window_size
+    planes = view.camera.rectangle_bounding_planes((0,0), (w,h), (w,h))
+    if len(planes) > 0:
+        tf = v.scene_position * d.ijk_to_xyz_transform
+        r = _visible_ijk_bounds(vmin, vmax, tf, planes, samples)
+        if r is None:
+            return None		# Volume is not in view.
+        # Refine the visible region bounds by sampling again.
+        vmin, vmax = _visible_ijk_bounds(*r, tf, planes, samples) or r
+
+    center = v.scene_position * d.ijk_to_xyz_transform * tuple(0.5*(a+b) for a,b in zip(vmin,vmax))
+    psize = view.pixel_size(center)
+    step = []
+    for vs in d.step:
+        s = 1
+        while 2*s*vs <= psize:
+            s *= 2
+        step.append(s)
+
+    ro = v.rendering_options
+    from .volume import ijk_step_for_voxel_limit, faces_per_axis
+    fpa = faces_per_axis(v.image_shown, ro.image_mode)
+    lstep = ijk_step_for_voxel_limit(vmin, vmax, (1,1,1), fpa,
+                                     ro.limit_voxel_count, ro.voxel_limit)
+    step = tuple(max(s,ls) for s,ls in zip(step, lstep))
+    return vmin, vmax, step
+
+# -----------------------------------------------------------------------------
+# Sample grid points in an ijk box and return the bounding box of samples whose
+# surrounding cell may intersect the view planes.
+#
+def _visible_ijk_bounds(ijk_min, ijk_max, ijk_to_scene, planes, samples):
+    from numpy import linspace, meshgrid, array, float32
+    axes = [linspace(a, b, samples) for a,b in zip(ijk_min, ijk_max)]
+    spacing = [(b-a)/(samples-1) for a,b in zip(ijk_min, ijk_max)]
+    i, j, k = meshgrid(*axes, indexing = 'ij')
+    ijk = array((i.ravel(), j.ravel(), k.ravel()), float32).T
+    xyz = ijk_to_scene.transform_points(ijk)
+    # Bound on half diagonal of sample cell in scene units.
+    r = 0.5 * sum(s*l for s,l in zip(spacing, ijk_to_scene.axes_lengths()))
+    dist = xyz @ planes[:,:3].T + planes[:,3]
+    near = (dist >= -r).all(axis = 1)
+    if not near.any():
+        return None
+    inside = ijk[near]
+    from math import floor, ceil
+    bmin = tuple(max(a, int(floor(x - s))) for a,x,s in zip(ijk_min, inside.min(axis=0), spacing))
+    bmax = tuple(min(b, int(ceil(x + s))) for b,x,s in zip(ijk_max, inside.max(axis=0), spacing))
+    return bmin, bmax
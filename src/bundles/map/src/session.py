@@ -319,10 +319,13 @@ def state_from_grid_data(data, session_path = None, include_maps = False):
     s['size'] = dt.size
     s['value_type'] = str(dt.value_type)
     compress_maps = False  # No advantage since session is compressed.  Ticket #4002
-    bytes = dt.matrix().tobytes()
+    # Save an array rather than bytes so chunked sessions saved without
+    # compression can memory map it on restore.
+    from numpy import ascontiguousarray
+    array = ascontiguousarray(dt.matrix())
 
     MAX_MSGPACK_OBJECT_SIZE = 2**32-1
-    if len(bytes) > MAX_MSGPACK_OBJECT_SIZE:
+    if array.nbytes > MAX_MSGPACK_OBJECT_SIZE:
       from chimerax.core.errors import UserError
       raise UserError('ChimeraX session files cannot include maps over 4 Gbytes in size.\n\n' +
                       'You tried to save map "%s"' % dt.name +
@@ -335,10 +338,10 @@ def state_from_grid_data(data, session_path = None, include_maps = False):
     if compress_maps:
       from gzip import compress
       s['array_compression'] = 'gzip'
-      s['array'] = compress(bytes)
+      s['array'] = compress(array.tobytes())
     else:
       s['array_compression'] = 'none'
-      s['array'] = bytes
+      s['array'] = array
     save_position = True
   else:
     save_position = False
@@ -389,10 +392,15 @@ def grid_data_from_state(s, gdcache, session, file_paths):
         # Older sessions without array_compression attribute used gzip and base64 encoding.
         from base64 import b64decode
         bytes = decompress(b64decode(s['array']))
-    from numpy import frombuffer, dtype
-    a = frombuffer(bytes, dtype = dtype(s['value_type']))
-    if not a.flags.writeable:
-      a = a.copy()
+    from numpy import frombuffer, dtype, ndarray
+    value_type = dtype(s['value_type'])
+    if isinstance(bytes, ndarray) and bytes.dtype == value_type and bytes.flags.writeable:
+      # Use array without copying, it may be memory mapped from a chunked session file.
+      a = bytes
+    else:
+      a = frombuffer(bytes, dtype = value_type)
+      if not a.flags.writeable:
+        a = a.copy()
     array = a.reshape(s['size'][::-1])
     from chimerax.map_data import ArrayGridData
     dlist = [ArrayGridData(array)]
@@ -684,6 +692,7 @@ rendering_options_attributes = (
   'outline_box_linewidth',
   'limit_voxel_count',
   'voxel_limit',
+  'level_of_detail',
   'color_mode',
   'colormap_on_gpu',
   'colormap_size',
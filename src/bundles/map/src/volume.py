@@ -187,6 +187,10 @@ class Volume(Model):
       from chimerax.std_commands.lighting import lighting
       lighting(session, 'full')
 
+    if self.rendering_options.level_of_detail:
+      from .levelofdetail import level_of_detail_manager
+      level_of_detail_manager(session)
+
   # ---------------------------------------------------------------------------
   #
   def call_change_callbacks(self, change_types):
@@ -2742,6 +2746,10 @@ class RenderingOptions:
     Whether to auto-adjust step size so at most voxel_limit voxels are shown.
   voxel_limit : 16
     Choose step size so the region has at most this many Mvoxels.
+  level_of_detail : False
+    Whether to choose the step size and region from the current view as the
+    camera moves.  The coarsest power of 2 step with voxels no bigger than a
+    screen pixel is used and the region is cropped to the part of the map in view.
   color_mode : 'auto8'
     Sets the pixel format for image style rendering color vs grayscale,
     transparent vs opaque, and bits per color component.
@@ -2848,6 +2856,7 @@ class RenderingOptions:
     self.outline_box_linewidth = 1
     self.limit_voxel_count = True           # auto-adjust step size
     self.voxel_limit = 16                   # Mvoxels
+    self.level_of_detail = False            # step and region chosen from view
     self.color_modes = (
       'auto4', 'auto8', 'auto12', 'auto16',
       'opaque4', 'opaque8', 'opaque12', 'opaque16',
@@ -3381,8 +3390,27 @@ def data_cache(session):
     size = ds['data_cache_size'] * (2**20)
     from chimerax.map_data import datacache
     session._volume_data_cache = dc = datacache.Data_Cache(size = size)
+    set_disk_data_cache(session)
   return dc
 
+# -----------------------------------------------------------------------------
+# Optional on-disk tier of the data cache for decoded map data.
+#
+def set_disk_data_cache(session):
+  dc = data_cache(session)
+  ds = default_settings(session)
+  size = ds['data_cache_disk_size'] * (2**20)
+  if size <= 0:
+    dc.disk_cache = None
+    return
+  directory = ds['data_cache_directory']
+  ddc = dc.disk_cache
+  if ddc is None or ddc.directory != directory:
+    from chimerax.map_data import datacache
+    dc.disk_cache = datacache.Disk_Data_Cache(directory, size)
+  else:
+    ddc.resize(size)
+
 # -----------------------------------------------------------------------------
 # Open and display a map using Volume Viewer.
 #
@@ -3890,7 +3918,7 @@ class MultiChannelSeries(Model):
 def save_map(session, path, format_name, models = None, region = None, step = (1,1,1),
              mask_zone = True, subsamples = None, chunk_shapes = None, append = None,
              compress = None, compress_method = None, compress_level = None, compress_shuffle = None,
-             base_index = 1, value_type = None, **kw):
+             base_index = 1, value_type = None, brick_size = None, **kw):
     '''
     Supported API.
     Save a density map file having any of the known density map formats.
@@ -3958,6 +3986,14 @@ def save_map(session, path, format_name, models = None, region = None, step = (1
         value_type: string
             Numeric value type to save in MRC file.  Can be int8, int16, uint16, float16, float32.
             If not specified then the closest type holding the actual map value type is used.
+
+    Parameters below only supported for Zarr format (\*.zarr)
+
+    Parameters:
+        brick_size: 1 or 3 integers
+            Size of the bricks (Zarr chunks) the map is divided into.  Each brick is
+            compressed separately so regions can be read without reading the whole map.
+            Default 64,64,64.  The compress and compress_level options also apply.
     '''
     if models is None:
         vlist = session.models.list(type = Volume)
@@ -4008,6 +4044,8 @@ def save_map(session, path, format_name, models = None, region = None, step = (1
         options['compress'] = True
     if value_type is not None:
         options['value_type'] = value_type
+    if brick_size is not None:
+        options['brick_size'] = brick_size
     if path in ('browse', 'browser'):
         from chimerax.map_data import select_save_path
         path, format_name = select_save_path()
@@ -35,6 +35,8 @@ def register_volume_command(logger):
 
     global_options = [
                ('data_cache_size', FloatArg),
+               ('data_cache_disk_size', FloatArg),
+               ('data_cache_directory', StringArg),
                ('show_on_open', BoolArg),
                ('voxel_limit_for_open', FloatArg),
                ('show_plane', BoolArg),
@@ -51,6 +53,7 @@ def register_volume_command(logger):
 #               ('outline_box_linewidth', FloatArg),
                ('limit_voxel_count', BoolArg),
                ('voxel_limit', FloatArg),
+               ('level_of_detail', BoolArg),
                ('colormap_on_gpu', BoolArg),
                ('color_mode', EnumOf(ro.color_modes)),
                ('colormap_size', IntArg),
@@ -146,6 +149,10 @@ def register_volume_command(logger):
     from . import channels
     channels.register_volume_channels_command(logger)
 
+    # Register volume pyramid command
+    from . import levelofdetail
+    levelofdetail.register_volume_pyramid_command(logger)
+
     
 # -----------------------------------------------------------------------------
 #
@@ -186,6 +193,8 @@ def volume(session,
            coordinate_system = None,
 # Global options.
            data_cache_size = None,
+           data_cache_disk_size = None,
+           data_cache_directory = None,
            show_on_open = None,
            voxel_limit_for_open = None,
            show_plane = None,
@@ -197,6 +206,7 @@ def volume(session,
            outline_box_linewidth = None,
            limit_voxel_count = None,  # auto-adjust step size
            voxel_limit = None,  # Mvoxels
+           level_of_detail = None,  # step and region chosen from view
            color_mode = None,  # image rendering pixel formats
            colormap_on_gpu = None,  # image colormapping on gpu or cpu
            colormap_size = None,  # image colormapping
@@ -285,6 +295,10 @@ def volume(session,
     Parameters:
         data_cache_size: float
             In Mbytes
+        data_cache_disk_size: float
+            In Mbytes.  Size of on-disk cache of decoded map data, 0 means no disk cache.
+        data_cache_directory: string
+            Directory for on-disk cache of decoded map data.
         show_on_open: bool
         voxel_limit_for_open: float
         show_plane: bool
@@ -300,6 +314,8 @@ def volume(session,
         limit_voxel_count: bool
             Auto-adjust step size.
         voxel_limit: float (Mvoxels)
+        level_of_detail: bool
+            Choose step size and region from the current view as the camera moves.
         color_mode: string
             Image rendering pixel formats: 'auto4', 'auto8', 'auto12', 'auto16',
             'opaque4', 'opaque8', 'opaque12', 'opaque16', 'rgba4', 'rgba8', 'rgba12', 'rgba16',
@@ -422,6 +438,10 @@ def volume(session,
     for v in vlist:
         apply_volume_options(v, dsettings, rsettings, image_mode_off, session)
 
+    if rsettings.get('level_of_detail') and vlist:
+        from .levelofdetail import level_of_detail_manager
+        level_of_detail_manager(session)
+
     if calculate_surfaces:
         for v in vlist:
             v._update_surfaces()
@@ -431,7 +451,7 @@ def volume(session,
 def _render_settings(options):
     ropt = (
         'show_outline_box', 'outline_box_rgb', 'outline_box_linewidth',
-        'limit_voxel_count', 'voxel_limit', 'color_mode', 'colormap_on_gpu',
+        'limit_voxel_count', 'voxel_limit', 'level_of_detail', 'color_mode', 'colormap_on_gpu',
         'colormap_size', 'colormap_extend_left', 'colormap_extend_right',
         'blend_on_gpu', 'projection_mode', 'ray_step', 'plane_spacing', 'full_region_on_gpu',
         'bt_correction', 'minimal_texture_memory', 'maximum_intensity_projection',
@@ -463,7 +483,7 @@ def _render_settings(options):
 # -----------------------------------------------------------------------------
 #
 def global_settings(kw, include_pickable = False):
-    gopt = ('data_cache_size', 'show_on_open', 'voxel_limit_for_open',
+    gopt = ('data_cache_size', 'data_cache_disk_size', 'data_cache_directory', 'show_on_open', 'voxel_limit_for_open',
             'show_plane', 'voxel_limit_for_plane', 'initial_colors')
     if include_pickable:
         gopt += ('pickable',)
@@ -487,6 +507,10 @@ def apply_global_settings(session, gsettings):
         dc = data_cache(session)
         dc.resize(gsettings['data_cache_size'] * (2**20))
 
+    if 'data_cache_disk_size' in gsettings or 'data_cache_directory' in gsettings:
+        from .volume import set_disk_data_cache
+        set_disk_data_cache(session)
+
     if 'pickable' in gsettings:
         from . import maps_pickable
         maps_pickable(session, gsettings['pickable'])
@@ -840,6 +864,8 @@ def camel_case(string):
 def volume_default_values(session,
 # Global options.
            data_cache_size = None,
+           data_cache_disk_size = None,
+           data_cache_directory = None,
            show_on_open = None,
            voxel_limit_for_open = None,
            show_plane = None,
@@ -851,6 +877,7 @@ def volume_default_values(session,
            outline_box_linewidth = None,
            limit_voxel_count = None,  # auto-adjust step size
            voxel_limit = None,  # Mvoxels
+           level_of_detail = None,  # step and region chosen from view
            color_mode = None,  # image rendering pixel formats
            colormap_on_gpu = None,  # image colormapping on gpu or cpu
            colormap_size = None,  # image colormapping
@@ -923,6 +950,8 @@ def default_settings_text(session):
     ds = default_settings(session)
     lines = ['Default volume settings',
              'data cache size = %.3g Mbytes' % ds['data_cache_size'],
+             'data cache disk size = %.3g Mbytes' % ds['data_cache_disk_size'],
+             'data cache directory = %s' % ds['data_cache_directory'],
              'show on open = %s' % ds['show_on_open'],
              'show plane = %s' % ds['show_plane'],
              'voxel limit for open = %.3g Mvoxels' % ds['voxel_limit_for_open'],
@@ -24,24 +24,28 @@
 
 # -----------------------------------------------------------------------------
 # Maintain a cache of data objects using a limited amount of memory.
-# The least recently accessed data is released first.
+# The least recently accessed data is released first.  Optionally a second
+# tier on disk keeps arrays that were released from memory so that they need
+# not be read and decoded again from the original file.
 #
 
 # -----------------------------------------------------------------------------
 #
 class Data_Cache:
 
-  def __init__(self, size):
+  def __init__(self, size, disk_cache = None):
 
     self.size = size
     self.used = 0
     self.time = 1
-    self.data = {}
+    from collections import OrderedDict
+    self.data = OrderedDict()		# Least recently used first
     self.groups = {}
+    self.disk_cache = disk_cache	# Disk_Data_Cache or None
 
   # ---------------------------------------------------------------------------
   #
-  def cache_data(self, key, value, size, description, groups = []):
+  def cache_data(self, key, value, size, description, groups = [], disk_key = None):
 
     self.remove_key(key)
     d = Cached_Data(key, value, size, description,
@@ -57,6 +61,9 @@ class Data_Cache:
     self.used = self.used + size
     self.reduce_use()
 
+    if disk_key is not None and self.disk_cache is not None:
+      self.disk_cache.cache_data(disk_key, value)
+
   # ---------------------------------------------------------------------------
   #
   def lookup_data(self, key):
@@ -65,12 +72,22 @@ class Data_Cache:
     if key in data:
       d = data[key]
       d.last_access = self.time_stamp()
+      data.move_to_end(key)
       v = d.value
     else:
       v = None
     self.reduce_use()
     return v
 
+  # ---------------------------------------------------------------------------
+  #
+  def lookup_disk_data(self, disk_key):
+
+    dc = self.disk_cache
+    if dc is None or disk_key is None:
+      return None
+    return dc.lookup_data(disk_key)
+
   # ---------------------------------------------------------------------------
   #
   def remove_key(self, key):
@@ -99,17 +116,15 @@ class Data_Cache:
     self.reduce_use()
 
   # ---------------------------------------------------------------------------
+  # Release least recently used data that is not referenced elsewhere.
   #
   def reduce_use(self):
 
     if self.used <= self.size:
       return
 
-    data = self.data
-    dlist = list(data.values())
-    dlist.sort(key = lambda d: d.last_access)
     import sys
-    for d in dlist:
+    for d in tuple(self.data.values()):
       if sys.getrefcount(d.value) == 2:
         self.remove_data(d)
         if self.used <= self.size:
@@ -149,3 +164,136 @@ class Cached_Data:
     self.description = description
     self.last_access = time_stamp
     self.groups = groups
+
+# -----------------------------------------------------------------------------
+# Keep decoded arrays as .npy files in a directory using a limited amount of
+# disk space.  Keys are hashed to file names.  Keys should include the size
+# and modification time of the source files (see GridData.disk_cache_key())
+# so that entries for changed files are never found and eventually purged.
+# File modification times are updated on access so the least recently used
+# files are removed first.
+#
+class Disk_Data_Cache:
+
+  suffix = '.npy'
+
+  def __init__(self, directory, size):
+
+    self.directory = directory
+    self.size = size
+    # Directory is scanned once and then files are tracked in memory.
+    self.files = self._scan_files()	# Path to size, least recently used first
+    self.used = sum(self.files.values())
+
+  # ---------------------------------------------------------------------------
+  #
+  def path(self, key):
+
+    from hashlib import sha1
+    from os.path import join
+    return join(self.directory, sha1(repr(key).encode('utf-8')).hexdigest() + self.suffix)
+
+  # ---------------------------------------------------------------------------
+  #
+  def cache_data(self, key, value):
+
+    if value.nbytes > self.size:
+      return
+    path = self.path(key)
+    if path in self.files:
+      self.files.move_to_end(path)
+      return
+    import os
+    try:
+      os.makedirs(self.directory, exist_ok = True)
+      # Write to temporary file and rename so partially written files are never read.
+      tmp_path = '%s.%d.tmp' % (path, os.getpid())
+      with open(tmp_path, 'wb') as f:
+        from numpy import save
+        save(f, value, allow_pickle = False)
+        size = f.tell()
+      os.replace(tmp_path, path)
+    except OSError:
+      return		# Disk full or directory not writable.
+    self._add_file(path, size)
+    self.reduce_use()
+
+  # ---------------------------------------------------------------------------
+  #
+  def lookup_data(self, key):
+
+    path = self.path(key)
+    if path not in self.files:
+      from os.path import exists
+      if not exists(path):
+        return None	# Could have been written by another ChimeraX.
+    import os
+    try:
+      from numpy import load
+      value = load(path, allow_pickle = False)
+      os.utime(path)
+      size = os.path.getsize(path)
+    except (OSError, ValueError):
+      return None
+    self._add_file(path, size)
+    return value
+
+  # ---------------------------------------------------------------------------
+  # Record file as most recently used.
+  #
+  def _add_file(self, path, size):
+
+    files = self.files
+    self.used += size - files.pop(path, 0)
+    files[path] = size
+
+  # ---------------------------------------------------------------------------
+  #
+  def resize(self, size):
+
+    self.size = size
+    self.reduce_use()
+
+  # ---------------------------------------------------------------------------
+  #
+  def _scan_files(self):
+
+    import os
+    files = []
+    try:
+      for e in os.scandir(self.directory):
+        if e.name.endswith(self.suffix) and e.is_file():
+          st = e.stat()
+          files.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+      pass
+    files.sort()
+    from collections import OrderedDict
+    return OrderedDict((path, size) for mtime, size, path in files)
+
+  # ---------------------------------------------------------------------------
+  #
+  def reduce_use(self):
+
+    files = self.files
+    import os
+    while self.used > self.size and files:
+      path, size = files.popitem(last = False)
+      self.used -= size
+      try:
+        os.remove(path)
+      except OSError:
+        pass
+
+  # ---------------------------------------------------------------------------
+  #
+  def clear(self):
+
+    import os
+    for path in self._scan_files():
+      try:
+        os.remove(path)
+      except OSError:
+        pass
+    self.files.clear()
+    self.used = 0
@@ -90,6 +90,9 @@ file_formats = [
   MapFileFormat('SPIDER volume data', 'spider', ['spider'], ['spi','vol']),
   MapFileFormat('TOM toolbox EM density map', 'tom_em', ['tom_em'], ['em']),
   MapFileFormat('UHBD grid, binary', 'uhbd', ['uhbd'], ['grd']),
+  MapFileFormat('Zarr map', 'zarr', ['zarr'], ['zarr'], writable = True,
+                writer_options = ('brick_size', 'compress', 'compress_level'),
+                allow_directory = True),
   ]
   
 # -----------------------------------------------------------------------------
@@ -327,7 +330,9 @@ def save_grid_data(grids, path, session, format = None, options = {}):
 
   if tpath != path:
     import os, os.path, shutil
-    if os.path.exists(path):
+    if os.path.isdir(path):
+      shutil.rmtree(path)
+    elif os.path.exists(path):
       os.remove(path)
     shutil.move(tpath, path)
 
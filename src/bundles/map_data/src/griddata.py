@@ -176,6 +176,7 @@ class GridData:
     if path != self.path:
       self.path = path
       self.name = self.name_from_path(path)
+      self._disk_cache_file_stats = None
       self.call_callbacks('path changed')
       
     if format and format != self.file_type:
@@ -433,8 +434,9 @@ class GridData:
       return m
 
     if hasattr(self, 'read_xy_plane'):
-      return None	# Don't look for subregion when only full planes are cached
-    
+      # Don't look for subregion when only full planes are cached
+      return self._disk_cached_data(dcache, key, origin, size, step)
+
     # Look for a matrix containing the desired matrix
     group = self
     kd = dcache.group_keys_and_data(group)
@@ -460,7 +462,17 @@ class GridData:
       dcache.lookup_data(key)			# update access time
       return m
 
-    return None
+    return self._disk_cached_data(dcache, key, origin, size, step)
+
+  # ---------------------------------------------------------------------------
+  # Look for decoded data saved on disk
+  #
+  def _disk_cached_data(self, dcache, key, origin, size, step):
+
+    m = dcache.lookup_disk_data(self.disk_cache_key(origin, size, step))
+    if m is not None:
+      self._cache_in_memory(dcache, m, key, origin, size, step)
+    return m
 
   # ---------------------------------------------------------------------------
   #
@@ -471,11 +483,45 @@ class GridData:
       return
 
     key = (self, tuple(origin), tuple(size), tuple(step))
+    disk_key = self.disk_cache_key(origin, size, step)
+    self._cache_in_memory(dcache, m, key, origin, size, step, disk_key)
+
+  # ---------------------------------------------------------------------------
+  #
+  def _cache_in_memory(self, dcache, m, key, origin, size, step, disk_key = None):
+
     elements = m.size
     bytes = elements * m.itemsize
     groups = [self]
     descrip = self.data_description(origin, size, step)
-    dcache.cache_data(key, m, bytes, descrip, groups)
+    dcache.cache_data(key, m, bytes, descrip, groups, disk_key = disk_key)
+
+  # ---------------------------------------------------------------------------
+  # Key identifying decoded data in an on-disk cache that persists between
+  # sessions.  Includes size and modification time of source files so stale
+  # data is not used.  Returns None if the data does not come from unmodified files.
+  #
+  def disk_cache_key(self, origin, size, step):
+
+    if self.writable or not self.path:
+      return None
+    file_stats = getattr(self, '_disk_cache_file_stats', None)
+    if file_stats is None:
+      multiple_files = isinstance(self.path, (list, tuple))
+      paths = self.path if multiple_files else [self.path]
+      import os
+      try:
+        file_stats = tuple((p, os.path.getsize(p), os.path.getmtime(p)) for p in paths)
+      except OSError:
+        return None
+      # A single file is checked for changes every time.  Image stacks may have
+      # thousands of files so those are checked again after clear_cache().
+      if multiple_files:
+        self._disk_cache_file_stats = file_stats
+    key = (self.__class__.__name__, self.file_type, self.grid_id, self.time, self.channel,
+           self.size, str(self.value_type), file_stats,
+           tuple(origin), tuple(size), tuple(step))
+    return key
 
   # ---------------------------------------------------------------------------
   #
@@ -501,6 +547,8 @@ class GridData:
   #
   def clear_cache(self):
 
+    self._disk_cache_file_stats = None	# Check if files changed.
+
     dcache = self.data_cache
     if dcache is None:
       return
@@ -0,0 +1,236 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Multi-resolution pyramids of 2x2x2 averaged copies of a map.  The pyramid
+# levels are added as subsamples of a SubsampledGrid so that displaying a map
+# at step 2, 4, 8, ... reads a small precomputed array instead of the full
+# resolution data.  Levels can be held in memory or written as a Zarr
+# directory next to the map file and reused the next time the map is opened.
+#
+from . import GridData
+
+# -----------------------------------------------------------------------------
+# Map with half the grid size made by averaging 2x2x2 blocks of another map.
+# Values are computed from the parent map when read.
+#
+class BinnedGrid(GridData):
+
+  def __init__(self, grid_data):
+
+    self.parent = g = grid_data
+    size = tuple((s+1)//2 for s in g.size)
+    step = tuple(2*s for s in g.step)
+    GridData.__init__(self, size, g.value_type, g.origin, step,
+                      cell_angles = g.cell_angles, rotation = g.rotation,
+                      name = g.name, default_color = g.rgba)
+
+  # ---------------------------------------------------------------------------
+  #
+  def read_matrix(self, ijk_origin, ijk_size, ijk_step, progress):
+
+    p = self.parent
+    porigin = tuple(2*o for o in ijk_origin)
+    psize = tuple(min(2*s, ps-po) for s,ps,po in zip(ijk_size, p.size, porigin))
+    pm = p.cached_data(porigin, psize, (1,1,1))
+    if pm is None:
+      # Read without caching to avoid flushing the data cache with full resolution data.
+      pm = p.read_matrix(porigin, psize, (1,1,1), progress)
+    m = bin_matrix(pm, self.value_type)
+    if tuple(ijk_step) != (1,1,1):
+      si,sj,sk = ijk_step
+      from numpy import ascontiguousarray
+      m = ascontiguousarray(m[::sk,::sj,::si])
+    return m
+
+# -----------------------------------------------------------------------------
+# Average 2x2x2 blocks of a 3d array.  Odd sized axes repeat the last plane.
+#
+def bin_matrix(m, value_type = None):
+
+  from numpy import float32, pad
+  if [s for s in m.shape if s % 2]:
+    m = pad(m, [(0, s % 2) for s in m.shape], mode = 'edge')
+  ks, js, is_ = [s//2 for s in m.shape]
+  b = m.reshape((ks,2,js,2,is_,2)).astype(float32, copy = False).mean(axis = (1,3,5))
+  if value_type is not None and b.dtype != value_type:
+    if value_type.kind in 'iu':
+      b = b.round()
+    b = b.astype(value_type)
+  return b
+
+# -----------------------------------------------------------------------------
+# Return a SubsampledGrid with pyramid levels of 2x2x2 averaged copies of
+# grid_data at cell sizes 2, 4, 8, ... up to 2**levels.  If directory is
+# given the levels are read from or written to a Zarr directory there,
+# otherwise they are computed in memory.
+#
+def pyramid_grid(grid_data, levels, directory = None, log = None):
+
+  from .subsample import SubsampledGrid
+  if isinstance(grid_data, SubsampledGrid):
+    sg = grid_data
+    primary = sg.available_subsamplings[(1,1,1)]
+  else:
+    primary = grid_data
+    dcache = grid_data.data_cache
+    sg = SubsampledGrid(grid_data)
+    sg.data_cache = dcache
+
+  if directory is None:
+    grids = memory_pyramid(primary, levels, log)
+  else:
+    grids = disk_pyramid(primary, levels, directory, log)
+
+  for level, g in enumerate(grids, 1):
+    c = 2**level
+    g.data_cache = sg.data_cache
+    sg.add_subsamples(g, (c,c,c))
+
+  return sg
+
+# -----------------------------------------------------------------------------
+#
+def memory_pyramid(grid_data, levels, log = None):
+
+  from .arraygrid import ArrayGridData
+  grids = []
+  g = grid_data
+  for level in range(levels):
+    b = BinnedGrid(g)
+    if min(b.size) < 1:
+      break
+    m = read_slabs(b, log)
+    g = ArrayGridData(m, b.origin, b.step, b.cell_angles, b.rotation, name = b.name)
+    grids.append(g)
+    if min(g.size) == 1:
+      break
+  return grids
+
+# -----------------------------------------------------------------------------
+# Read a binned grid a slab of planes at a time so the full resolution
+# parent data is never read into memory all at once.
+#
+def read_slabs(binned_grid, log = None, slab_mvoxels = 64):
+
+  b = binned_grid
+  isz, jsz, ksz = b.size
+  from numpy import empty
+  m = empty((ksz, jsz, isz), b.value_type)
+  nk = max(1, int(slab_mvoxels * 2**20) // (8 * isz * jsz))
+  for k0 in range(0, ksz, nk):
+    n = min(nk, ksz - k0)
+    m[k0:k0+n] = b.read_matrix((0,0,k0), (isz,jsz,n), (1,1,1), None)
+    if log:
+      log.status('Computing %d x %d x %d level of %s, plane %d of %d'
+                 % (isz, jsz, ksz, b.name, k0+n, ksz))
+  return m
+
+# -----------------------------------------------------------------------------
+# Pyramid levels stored as arrays "1", "2", ... in a Zarr group directory
+# with OME-Zarr multiscales attributes.  The map file modification time and
+# size are recorded so that a stale pyramid is recomputed.  For maps without a
+# file the name, size, step and value type are recorded.
+#
+def disk_pyramid(grid_data, levels, directory, log = None):
+
+  from os.path import join, exists
+  from .zarr.zarr_format import read_json, Zarr_Data
+  from .zarr.zarr_grid import ZarrGrid
+
+  source = pyramid_source_stamp(grid_data)
+  attrs = read_json(directory, '.zattrs', {})
+  saved = attrs.get('chimerax_pyramid', {})
+  reuse = (saved.get('source') == source)
+  nsaved = len(saved.get('levels', [])) if reuse else 0
+
+  from .zarr.write_zarr import write_zarr_grid_data
+  grids = []
+  g = grid_data
+  for level in range(1, levels+1):
+    lpath = join(directory, '%d' % level)
+    if level > nsaved or not exists(join(lpath, '.zarray')):
+      b = BinnedGrid(g)
+      if min(b.size) < 1:
+        break
+      if log:
+        log.status('Writing pyramid level %d of %s' % (level, grid_data.name))
+      write_zarr_grid_data(b, lpath, {'compress': True, 'compress_level': 1})
+    g = ZarrGrid(Zarr_Data(lpath), directory)
+    grids.append(g)
+    if min(g.size) == 1:
+      break
+
+  write_pyramid_attributes(directory, grids, source)
+  return grids
+
+# -----------------------------------------------------------------------------
+#
+def pyramid_source_stamp(grid_data):
+
+  path = grid_data.path
+  if isinstance(path, (list, tuple)):
+    path = path[0]
+  if not path:
+    # Map with no file, for instance computed by a volume operation.
+    g = grid_data
+    return {'name': g.name, 'grid_size': list(g.size), 'step': list(g.step),
+            'value_type': str(g.value_type)}
+  from os import stat
+  st = stat(path)
+  return {'path': path, 'mtime': st.st_mtime, 'size': st.st_size,
+          'grid_size': list(grid_data.size)}
+
+# -----------------------------------------------------------------------------
+#
+def write_pyramid_attributes(directory, grids, source):
+
+  import json
+  from os.path import join
+  with open(join(directory, '.zgroup'), 'w') as f:
+    json.dump({'zarr_format': 2}, f)
+  datasets = [{'path': '%d' % level,
+               'coordinateTransformations': [{'type': 'scale',
+                                              'scale': list(reversed(g.step))}]}
+              for level, g in enumerate(grids, 1)]
+  attrs = {
+    'multiscales': [{'version': '0.4', 'datasets': datasets,
+                     'axes': [{'name': a, 'type': 'space'} for a in 'zyx']}],
+    'chimerax_pyramid': {'source': source, 'levels': [g.size for g in grids]},
+  }
+  with open(join(directory, '.zattrs'), 'w') as f:
+    json.dump(attrs, f, indent = 2)
+
+# -----------------------------------------------------------------------------
+# Default pyramid directory next to the map file.
+#
+def pyramid_directory(grid_data):
+
+  path = grid_data.path
+  if isinstance(path, (list, tuple)):
+    path = path[0]
+  if not path:
+    return None
+  from os.path import splitext
+  return splitext(path)[0] + '_pyramid.zarr'
@@ -0,0 +1,108 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Write a grid as a Zarr version 2 array directory with zlib compressed bricks.
+# The grid is read and written one slab of bricks at a time so that maps
+# larger than memory can be converted.  Bricks are compressed in parallel threads.
+#
+def write_zarr_grid_data(grid_data, path, options = {}, progress = None):
+
+  brick_size = options.get('brick_size', (64,64,64))
+  if isinstance(brick_size, int):
+    brick_size = (brick_size,)*3
+  compress = options.get('compress', False)
+  level = options.get('compress_level', 5)
+
+  import os, json
+  os.makedirs(path, exist_ok = True)
+  clear_zarr_directory(path)
+  isz, jsz, ksz = grid_data.size
+  bi, bj, bk = brick_size
+  vtype = grid_data.value_type
+  zarray = {
+    'zarr_format': 2,
+    'shape': [ksz, jsz, isz],
+    'chunks': [bk, bj, bi],
+    'dtype': vtype.str,
+    'compressor': {'id': 'zlib', 'level': level} if compress else None,
+    'fill_value': 0,
+    'order': 'C',
+    'filters': None,
+  }
+  with open(os.path.join(path, '.zarray'), 'w') as f:
+    json.dump(zarray, f, indent = 2)
+
+  g = grid_data
+  attrs = {'chimerax': {'origin': list(g.origin), 'step': list(g.step),
+                        'cell_angles': list(g.cell_angles),
+                        'rotation': [list(r) for r in g.rotation]}}
+  with open(os.path.join(path, '.zattrs'), 'w') as f:
+    json.dump(attrs, f, indent = 2)
+
+  from zlib import compress as zlib_compress
+  from numpy import zeros
+  def write_brick(args, path = path):
+    index, brick = args
+    data = brick.tobytes()
+    if compress:
+      data = zlib_compress(data, level)
+    with open(os.path.join(path, '.'.join('%d' % b for b in index)), 'wb') as f:
+      f.write(data)
+
+  from concurrent.futures import ThreadPoolExecutor
+  from .zarr_format import brick_threads
+  with ThreadPoolExecutor(max_workers = brick_threads()) as e:
+    for zb, k0 in enumerate(range(0, ksz, bk)):
+      if progress:
+        progress.plane(k0)
+      kn = min(bk, ksz - k0)
+      slab = g.matrix((0,0,k0), (isz,jsz,kn))
+      bricks = []
+      for yb, j0 in enumerate(range(0, jsz, bj)):
+        for xb, i0 in enumerate(range(0, isz, bi)):
+          brick = zeros((bk,bj,bi), vtype)	# Zarr edge bricks are padded to full size.
+          b = slab[:, j0:j0+bj, i0:i0+bi]
+          brick[:b.shape[0],:b.shape[1],:b.shape[2]] = b
+          bricks.append(((zb,yb,xb), brick))
+      list(e.map(write_brick, bricks))
+
+# -----------------------------------------------------------------------------
+# Remove the metadata and bricks of an existing Zarr array or group so that
+# bricks of a larger or differently bricked map are not left behind.  Brick
+# files are named by their indices, e.g. 0.1.2, or are nested directories of
+# indices for the "/" dimension separator.  Other files are left alone.
+#
+def clear_zarr_directory(path):
+
+  import os, re, shutil
+  brick_name = re.compile(r'^\d+(\.\d+)*$')
+  for e in os.scandir(path):
+    if e.name in ('.zarray', '.zattrs', '.zgroup'):
+      os.remove(e.path)
+    elif brick_name.match(e.name):
+      if e.is_dir(follow_symlinks = False):
+        shutil.rmtree(e.path)
+      else:
+        os.remove(e.path)
@@ -0,0 +1,263 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Read Zarr version 2 array directories.  Data is stored as a regular grid of
+# bricks (Zarr "chunks"), each brick in its own file, optionally compressed.
+# Only the bricks overlapping a requested region are read, and bricks are
+# decoded in parallel threads.
+#
+# Directory layout:
+#
+#   map.zarr/.zarray    JSON: shape, chunks, dtype, compressor, fill_value, order
+#   map.zarr/.zattrs    JSON: optional attributes, ChimeraX stores origin and step
+#   map.zarr/0.0.0      brick with z,y,x brick indices 0,0,0
+#   map.zarr/0.0.1      ...
+#
+# A Zarr group directory (.zgroup) holding OME-Zarr "multiscales" datasets
+# opens the first dataset and uses the others as subsampled copies.
+#
+class Zarr_Data:
+
+  def __init__(self, path, array_name = None):
+
+    self.path = path
+    self.name = array_name
+
+    attrs = read_json(path, '.zattrs', {})
+    self.attributes = attrs
+    zarray = read_json(path, '.zarray')
+    if zarray is None:
+      raise SyntaxError('Zarr directory %s has no .zarray file' % path)
+    if zarray.get('zarr_format') != 2:
+      raise SyntaxError('Only Zarr format version 2 is supported, got %s'
+                        % zarray.get('zarr_format'))
+    if zarray.get('order', 'C') != 'C':
+      raise SyntaxError('Only C order Zarr arrays are supported')
+    if zarray.get('filters'):
+      raise SyntaxError('Zarr array filters are not supported')
+
+    shape = tuple(zarray['shape'])
+    chunks = tuple(zarray['chunks'])
+    # Drop leading singleton axes (e.g. OME-Zarr time and channel).
+    while len(shape) > 3 and shape[0] == 1:
+      shape, chunks = shape[1:], chunks[1:]
+    self.leading_axes = len(zarray['shape']) - len(shape)
+    if len(shape) != 3:
+      raise SyntaxError('Zarr array must be 3-dimensional, got shape %s' % str(shape))
+
+    from numpy import dtype
+    self.value_type = dtype(zarray['dtype'])
+    self.fill_value = zarray.get('fill_value') or 0
+    self.brick_size = tuple(reversed(chunks))		# x,y,z
+    self.data_size = tuple(reversed(shape))		# x,y,z
+    self.separator = zarray.get('dimension_separator', '.')
+    self.decompress = decompressor(zarray.get('compressor'))
+
+    cx = attrs.get('chimerax', {})
+    self.data_origin = tuple(cx.get('origin', (0,0,0)))
+    self.data_step = tuple(cx.get('step', (1,1,1)))
+    self.cell_angles = tuple(cx.get('cell_angles', (90,90,90)))
+    self.rotation = tuple(tuple(r) for r in cx.get('rotation', ((1,0,0),(0,1,0),(0,0,1))))
+
+    self._brick_cache = Brick_Cache(256 * 2**20)
+
+  # ---------------------------------------------------------------------------
+  #
+  def brick_path(self, bijk):
+
+    index = [0]*self.leading_axes + list(reversed(bijk))
+    from os.path import join
+    return join(self.path, self.separator.join('%d' % b for b in index))
+
+  # ---------------------------------------------------------------------------
+  #
+  def read_brick(self, bijk):
+
+    from os.path import exists
+    path = self.brick_path(bijk)
+    bsize = tuple(reversed(self.brick_size))
+    from numpy import full, frombuffer
+    if not exists(path):
+      return full(bsize, self.fill_value, self.value_type)
+    with open(path, 'rb') as f:
+      data = f.read()
+    if self.decompress:
+      data = self.decompress(data)
+    return frombuffer(data, self.value_type).reshape(bsize)
+
+  # ---------------------------------------------------------------------------
+  # Assemble the region from the bricks it overlaps.
+  #
+  def read_matrix(self, ijk_origin, ijk_size, ijk_step, array, progress = None):
+
+    axis_pieces = [brick_pieces(o, s, t, b) for o,s,t,b in
+                   zip(ijk_origin, ijk_size, ijk_step, self.brick_size)]
+    pieces = [((bi,bj,bk), (si,sj,sk), (ai,aj,ak))
+              for bi,si,ai in axis_pieces[0]
+              for bj,sj,aj in axis_pieces[1]
+              for bk,sk,ak in axis_pieces[2]]
+
+    cache = self._brick_cache
+    needed = [bijk for bijk, bslice, aslice in pieces if cache.lookup(bijk) is None]
+    if len(needed) > 1:
+      from concurrent.futures import ThreadPoolExecutor
+      with ThreadPoolExecutor(max_workers = brick_threads()) as e:
+        bricks = list(e.map(self.read_brick, needed))
+    else:
+      bricks = [self.read_brick(bijk) for bijk in needed]
+    for bijk, brick in zip(needed, bricks):
+      cache.add(bijk, brick)
+
+    for count, ((bi,bj,bk), (si,sj,sk), (ai,aj,ak)) in enumerate(pieces):
+      brick = cache.lookup((bi,bj,bk))
+      if brick is None:
+        brick = self.read_brick((bi,bj,bk))	# Evicted from cache by larger bricks.
+      array[ak,aj,ai] = brick[sk,sj,si]
+      if progress:
+        progress.fraction(count / len(pieces))
+    return array
+
+# -----------------------------------------------------------------------------
+# For one axis, find the bricks overlapping region origin o, size s, step t,
+# returning brick index, slice within brick, and slice within output array.
+#
+def brick_pieces(o, s, t, b):
+
+  pieces = []
+  end = o + s		# One past last region index
+  for bi in range(o // b, (end - 1) // b + 1):
+    bstart, bend = bi*b, min((bi+1)*b, end)
+    first = o + ((max(bstart, o) - o + t - 1) // t) * t	# First region index in brick
+    if first >= bend:
+      continue		# Step skips this brick.
+    last = first + ((bend - 1 - first) // t) * t
+    pieces.append((bi, slice(first - bstart, last - bstart + 1, t),
+                   slice((first - o) // t, (last - o) // t + 1)))
+  return pieces
+
+# -----------------------------------------------------------------------------
+#
+class Brick_Cache:
+
+  def __init__(self, size):
+
+    self.size = size
+    self.used = 0
+    from collections import OrderedDict
+    self.bricks = OrderedDict()
+
+  def lookup(self, bijk):
+    b = self.bricks.get(bijk)
+    if b is not None:
+      self.bricks.move_to_end(bijk)
+    return b
+
+  def add(self, bijk, brick):
+    if brick.nbytes > self.size:
+      return
+    self.bricks[bijk] = brick
+    self.used += brick.nbytes
+    while self.used > self.size:
+      k, b = self.bricks.popitem(last = False)
+      self.used -= b.nbytes
+
+# -----------------------------------------------------------------------------
+#
+def brick_threads():
+
+  import os
+  return min(8, os.cpu_count() or 1)
+
+# -----------------------------------------------------------------------------
+#
+def decompressor(compressor):
+
+  if compressor is None:
+    return None
+  cid = compressor.get('id')
+  if cid == 'zlib':
+    from zlib import decompress
+    return decompress
+  elif cid == 'gzip':
+    from gzip import decompress
+    return decompress
+  elif cid == 'bz2':
+    from bz2 import decompress
+    return decompress
+  elif cid == 'lzma':
+    from lzma import decompress
+    return decompress
+  else:
+    # Blosc, zstd, ... require the numcodecs package.
+    try:
+      from numcodecs import get_codec
+    except ImportError:
+      raise SyntaxError('Zarr compressor "%s" requires the numcodecs Python package' % cid)
+    codec = get_codec(compressor)
+    return lambda data, codec = codec: codec.decode(data)
+
+# -----------------------------------------------------------------------------
+#
+def read_json(directory, filename, default = None):
+
+  from os.path import join, exists
+  path = join(directory, filename)
+  if not exists(path):
+    return default
+  import json
+  with open(path, 'r') as f:
+    return json.load(f)
+
+# -----------------------------------------------------------------------------
+# Return list of (dataset path, relative scale) for a Zarr directory.
+# A plain array directory gives just itself.
+#
+def zarr_datasets(path):
+
+  from os.path import join, exists
+  if exists(join(path, '.zarray')):
+    return [(path, (1,1,1))]
+
+  if not exists(join(path, '.zgroup')):
+    raise SyntaxError('%s is not a Zarr directory (no .zarray or .zgroup file)' % path)
+
+  attrs = read_json(path, '.zattrs', {})
+  multiscales = attrs.get('multiscales')
+  if multiscales:
+    datasets = []
+    for ds in multiscales[0]['datasets']:
+      scale = (1,1,1)
+      for t in ds.get('coordinateTransformations', []):
+        if t.get('type') == 'scale':
+          scale = tuple(reversed(t['scale'][-3:]))
+      datasets.append((join(path, ds['path']), scale))
+    return datasets
+
+  import os
+  arrays = sorted(e.path for e in os.scandir(path)
+                  if e.is_dir() and exists(join(e.path, '.zarray')))
+  if len(arrays) == 0:
+    raise SyntaxError('Zarr group %s contains no arrays' % path)
+  return [(a, (1,1,1)) for a in arrays]
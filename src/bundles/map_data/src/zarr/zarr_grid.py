@@ -0,0 +1,83 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Wrap Zarr brick array directories as grid data.
+#
+from .. import GridData
+
+# -----------------------------------------------------------------------------
+#
+class ZarrGrid(GridData):
+
+  def __init__(self, zarr_data, path, step = None):
+
+    self.zarr_data = d = zarr_data
+    GridData.__init__(self, d.data_size, d.value_type,
+                      d.data_origin, step or d.data_step,
+                      cell_angles = d.cell_angles, rotation = d.rotation,
+                      path = path, file_type = 'zarr', grid_id = d.path)
+
+  # ---------------------------------------------------------------------------
+  #
+  def read_matrix(self, ijk_origin, ijk_size, ijk_step, progress):
+
+    from ..readarray import allocate_array
+    m = allocate_array(ijk_size, self.value_type, ijk_step, progress)
+    self.zarr_data.read_matrix(ijk_origin, ijk_size, ijk_step, m, progress)
+    return m
+
+# -----------------------------------------------------------------------------
+#
+def open_zarr(path):
+
+  from .zarr_format import Zarr_Data, zarr_datasets
+  datasets = zarr_datasets(path)
+  scales = set(scale for dpath, scale in datasets)
+  if len(scales) < len(datasets):
+    # Group of separate arrays, not a multiscale pyramid.
+    return [ZarrGrid(Zarr_Data(dpath), path) for dpath, scale in datasets]
+
+  dpath, scale = datasets[0]
+  d = Zarr_Data(dpath)
+  step = None if 'chimerax' in d.attributes else scale	# OME-Zarr physical pixel size
+  g = ZarrGrid(d, path, step = step)
+  if len(datasets) > 1:
+    g = add_subsamples(g, path, datasets[1:], scale)
+  return [g]
+
+# -----------------------------------------------------------------------------
+# Add lower resolution datasets as subsamples.
+#
+def add_subsamples(grid, path, datasets, base_scale):
+
+  from ..subsample import SubsampledGrid
+  from .zarr_format import Zarr_Data
+  g = SubsampledGrid(grid)
+  for dpath, scale in datasets:
+    cell_size = tuple(max(1, int(round(s/bs))) for s,bs in zip(scale, base_scale))
+    step = tuple(st*c for st,c in zip(grid.step, cell_size))
+    sg = ZarrGrid(Zarr_Data(dpath), path, step = step)
+    g.add_subsamples(sg, cell_size)
+  return g
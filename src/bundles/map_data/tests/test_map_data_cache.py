@@ -0,0 +1,87 @@
+import os
+
+import numpy
+
+
+def _disk_cache(directory, size):
+    from chimerax.map_data.datacache import Disk_Data_Cache
+
+    return Disk_Data_Cache(str(directory), size)
+
+
+def _grid_class():
+    from chimerax.map_data import GridData
+
+    class CountingGrid(GridData):
+        reads = 0
+
+        def __init__(self, path):
+            self.array = numpy.load(path)
+            GridData.__init__(
+                self, self.array.shape[::-1], self.array.dtype, path=path, file_type="npy"
+            )
+
+        def read_matrix(self, ijk_origin, ijk_size, ijk_step, progress):
+            CountingGrid.reads += 1
+            return self.matrix_slice(self.array, ijk_origin, ijk_size, ijk_step)
+
+    return CountingGrid
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    a = numpy.zeros(1000, numpy.float32)
+    dc = _disk_cache(tmp_path, 3 * a.nbytes + 500)
+    for key in ("a", "b", "c"):
+        dc.cache_data(key, a)
+    assert dc.lookup_data("a") is not None  # Now most recently used.
+    dc.cache_data("d", a)
+    assert dc.lookup_data("b") is None
+    for key in ("a", "c", "d"):
+        assert numpy.array_equal(dc.lookup_data(key), a)
+    assert dc.used == sum(os.path.getsize(p) for p in dc.files)
+    assert dc.used <= dc.size
+
+    # A new cache finds the files already on disk.
+    dc2 = _disk_cache(tmp_path, dc.size)
+    assert set(dc2.files) == set(dc.files)
+    assert dc2.used == dc.used
+
+    dc2.clear()
+    assert dc2.used == 0
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".npy")]
+    assert dc2.lookup_data("a") is None
+
+
+def test_disk_cache_too_large(tmp_path):
+    dc = _disk_cache(tmp_path, 100)
+    dc.cache_data("big", numpy.zeros(1000, numpy.float32))
+    assert dc.lookup_data("big") is None
+    assert dc.used == 0
+
+
+def test_grid_data_read_from_disk_cache(tmp_path):
+    from chimerax.map_data.datacache import Data_Cache
+
+    CountingGrid = _grid_class()
+    path = str(tmp_path / "map.npy")
+    a = numpy.arange(4 * 5 * 6, dtype=numpy.float32).reshape((4, 5, 6))
+    numpy.save(path, a)
+    disk_cache = _disk_cache(tmp_path / "cache", 2**20)
+
+    def read():
+        g = CountingGrid(path)
+        g.data_cache = Data_Cache(2**20, disk_cache)  # Empty memory cache.
+        return g.matrix()
+
+    assert numpy.array_equal(read(), a)
+    assert CountingGrid.reads == 1
+    assert numpy.array_equal(read(), a)
+    assert CountingGrid.reads == 1
+
+    # Changing the file makes the cached copy stale.
+    b = a + 1
+    numpy.save(path, b)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert numpy.array_equal(read(), b)
+    assert CountingGrid.reads == 2
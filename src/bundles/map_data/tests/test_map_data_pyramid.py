@@ -0,0 +1,107 @@
+import os
+
+import numpy
+import pytest
+
+
+def _array_grid(shape=(9, 10, 11), dtype=numpy.float32):
+    from chimerax.map_data import ArrayGridData
+
+    a = numpy.random.default_rng(0).random(shape) * 100
+    return ArrayGridData(a.astype(dtype), step=(0.5, 0.5, 0.5))
+
+
+def _brute_force_bin(m):
+    ks, js, is_ = [(s + 1) // 2 for s in m.shape]
+    b = numpy.empty((ks, js, is_))
+    for k in range(ks):
+        for j in range(js):
+            for i in range(is_):
+                # Odd sizes repeat the last plane.
+                block = m[2 * k : 2 * k + 2, 2 * j : 2 * j + 2, 2 * i : 2 * i + 2]
+                pad = [(0, 2 - s) for s in block.shape]
+                b[k, j, i] = numpy.pad(block, pad, mode="edge").astype(numpy.float32).mean()
+    return b
+
+
+@pytest.mark.parametrize("dtype", [numpy.float32, numpy.int16])
+def test_bin_matrix(dtype):
+    from chimerax.map_data.pyramid import bin_matrix
+
+    m = _array_grid(dtype=dtype).array
+    b = bin_matrix(m, m.dtype)
+    expected = _brute_force_bin(m)
+    assert b.dtype == m.dtype
+    if dtype == numpy.float32:
+        assert numpy.allclose(b, expected, rtol=1e-5)
+    else:
+        assert numpy.array_equal(b, numpy.round(expected).astype(dtype))
+
+
+def _check_levels(sg, m, levels):
+    from chimerax.map_data.pyramid import bin_matrix
+
+    expected = m
+    for level in range(1, levels + 1):
+        c = 2**level
+        g = sg.available_subsamplings[(c, c, c)]
+        expected = bin_matrix(expected, m.dtype)
+        assert g.size == expected.shape[::-1]
+        assert g.step == (0.5 * c,) * 3
+        assert numpy.allclose(g.matrix(), expected, rtol=1e-5)
+
+
+def test_memory_pyramid():
+    from chimerax.map_data.pyramid import pyramid_grid
+
+    g = _array_grid()
+    sg = pyramid_grid(g, 2)
+    assert sg.available_subsamplings[(1, 1, 1)] is g
+    _check_levels(sg, g.array, 2)
+
+    # Stops at a single voxel.
+    sg = pyramid_grid(_array_grid(), 10)
+    assert max(sg.available_subsamplings) == (16, 16, 16)
+
+
+def test_disk_pyramid_reuse(tmp_path):
+    from chimerax.map_data.pyramid import pyramid_grid
+
+    directory = str(tmp_path / "map_pyramid.zarr")
+    g = _array_grid()
+    _check_levels(pyramid_grid(g, 2, directory), g.array, 2)
+    level1 = os.path.join(directory, "1", ".zarray")
+    mtime = os.path.getmtime(level1)
+
+    # Same map reuses saved levels.
+    os.utime(level1, (mtime - 100, mtime - 100))
+    _check_levels(pyramid_grid(_array_grid(), 2, directory), g.array, 2)
+    assert os.path.getmtime(level1) == mtime - 100
+
+    # A different map with no file path rewrites the levels.
+    g2 = _array_grid(shape=(12, 10, 11))
+    _check_levels(pyramid_grid(g2, 2, directory), g2.array, 2)
+    assert os.path.getmtime(level1) != mtime - 100
+
+
+def test_pyramid_source_stamp(tmp_path):
+    from chimerax.map_data.pyramid import pyramid_source_stamp, pyramid_directory
+
+    g = _array_grid()
+    assert pyramid_directory(g) is None
+    stamp = pyramid_source_stamp(g)
+    assert pyramid_source_stamp(_array_grid()) == stamp
+    assert pyramid_source_stamp(_array_grid(dtype=numpy.int16)) != stamp
+    g.name = "other"
+    assert pyramid_source_stamp(g) != stamp
+
+    path = str(tmp_path / "map.mrc")
+    with open(path, "wb") as f:
+        f.write(b"1234")
+    g.path = path
+    assert pyramid_directory(g) == str(tmp_path / "map_pyramid.zarr")
+    stamp = pyramid_source_stamp(g)
+    assert stamp["path"] == path and stamp["size"] == 4
+    with open(path, "ab") as f:
+        f.write(b"5")
+    assert pyramid_source_stamp(g) != stamp
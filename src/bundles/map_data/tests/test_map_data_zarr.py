@@ -0,0 +1,42 @@
+import os
+
+import numpy
+import pytest
+
+
+def _write(path, array, brick_size, compress=False):
+    from chimerax.map_data import ArrayGridData
+    from chimerax.map_data.zarr import save
+
+    save(ArrayGridData(array), path, {"brick_size": brick_size, "compress": compress})
+
+
+def _read(path):
+    from chimerax.map_data.zarr import open as open_zarr
+
+    grids = open_zarr(path)
+    assert len(grids) == 1
+    return grids[0].matrix()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_zarr_round_trip(tmp_path, compress):
+    path = str(tmp_path / "map.zarr")
+    a = numpy.arange(20 * 30 * 40, dtype=numpy.float32).reshape((20, 30, 40))
+    _write(path, a, 16, compress)
+    assert numpy.array_equal(_read(path), a)
+
+
+def test_zarr_overwrite_with_smaller_map(tmp_path):
+    path = str(tmp_path / "map.zarr")
+    large = numpy.ones((40, 40, 40), numpy.int16)
+    _write(path, large, 8)
+    other_file = os.path.join(path, "notes.txt")
+    with open(other_file, "w") as f:
+        f.write("keep")
+
+    small = numpy.arange(10 * 12 * 14, dtype=numpy.int16).reshape((10, 12, 14))
+    _write(path, small, 16)
+    assert numpy.array_equal(_read(path), small)
+    bricks = sorted(name for name in os.listdir(path) if not name.startswith("."))
+    assert bricks == ["0.0.0", "notes.txt"]
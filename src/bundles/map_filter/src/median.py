@@ -51,13 +51,36 @@ def median_grid(volume, bin_size = 3, iterations = 1,
 # -----------------------------------------------------------------------------
 # Volume border of result is set to zero.  Bin size must be odd.
 #
-def median_array(m, bin_size=3):
+def median_array(m, bin_size=3, nthread = None):
+
+  return rank_filter_array(m, bin_size, 'median', nthread = nthread)
+
+# -----------------------------------------------------------------------------
+# Replace each value with the median, minimum, maximum or percentile of the
+# values in a box of size bin_size (x,y,z order) centered on it.  Volume border
+# of result where the box does not fit is set to zero.  Bin size must be odd.
+#
+# The array is filtered in blocks of about block_voxels output values with a
+# halo of neighbor values so that the stack of neighbor values for a block stays
+# in cache.  Blocks are computed in nthread threads (None for half the number
+# of cores).  The median is found by partial sorting (numpy partition) which
+# gives the same values as numpy median.
+#
+rank_filter_statistics = ('median', 'minimum', 'maximum', 'percentile')
+def rank_filter_array(m, bin_size = 3, statistic = 'median', percentile = 50,
+                      nthread = None, block_voxels = 2**15):
 
   if isinstance(bin_size, int):
     bin_size = (bin_size, bin_size, bin_size)
   si,sj,sk= bin_size
 
-  from numpy import zeros, empty, median
+  if si % 2 == 0 or sj % 2 == 0 or sk % 2 == 0:
+    raise ValueError('Rank filter bin size must be odd, got %d,%d,%d' % (si,sj,sk))
+  if statistic not in rank_filter_statistics:
+    raise ValueError('Unknown rank filter statistic "%s", must be one of %s'
+                     % (statistic, ', '.join(rank_filter_statistics)))
+
+  from numpy import zeros, empty
   mm = zeros(m.shape, m.dtype)
 
   if m.shape[0] < sk or m.shape[1] < sj or m.shape[2] < si:
@@ -65,19 +88,70 @@ def median_array(m, bin_size=3):
 
   ksize, jsize, isize = m.shape
   hsi,hsj,hsk = [(n-1)//2 for n in bin_size]
-  pn = empty((jsize-2*hsj,isize-2*hsi,si*sj*sk), m.dtype)
 
-  for k in range(hsk,ksize-hsk):
+  def filter_block(k0, k1, j0, j1, i0, i1):
+    # Output region k0:k1, j0:j1, i0:i1 uses input region extended by halo.
+    # Neighbor values are stacked along the first axis.
+    kb, jb, ib = k1-k0, j1-j0, i1-i0
+    pn = empty((si*sj*sk,kb,jb,ib), m.dtype)
     c = 0
     for ko in range(-hsk,hsk+1):
       for jo in range(-hsj,hsj+1):
         for io in range(-hsi,hsi+1):
-          pn[:,:,c] = m[k+ko,hsj+jo:jsize-hsj+jo,hsi+io:isize-hsi+io]
+          pn[c] = m[k0+ko:k1+ko,j0+jo:j1+jo,i0+io:i1+io]
           c += 1
-    mm[k,hsj:jsize-hsj,hsi:isize-hsi] = median(pn,axis=2)
+    mm[k0:k1,j0:j1,i0:i1] = _rank_statistic(pn, statistic, percentile)
+
+  blocks = _filter_blocks((hsk,ksize-hsk), (hsj,jsize-hsj), (hsi,isize-hsi),
+                          block_voxels)
+  if nthread == 1 or len(blocks) == 1:
+    for b in blocks:
+      filter_block(*b)
+  else:
+    from chimerax.core.threadq import apply_to_list
+    apply_to_list(filter_block, blocks, nthread = nthread)
 
   return mm
 
+# -----------------------------------------------------------------------------
+# Statistic over first axis of stacked neighbor values.  The stack is modified.
+#
+def _rank_statistic(pn, statistic, percentile):
+
+  import numpy
+  if statistic == 'median':
+    n = len(pn)
+    if pn.dtype.kind in 'fc' and numpy.isnan(pn).any():
+      return numpy.median(pn, axis = 0)	# Median is nan if any value is nan.
+    # Select the middle value, n is odd.
+    pn.partition(n//2, axis = 0)
+    return pn[n//2]
+  elif statistic == 'minimum':
+    return pn.min(axis = 0)
+  elif statistic == 'maximum':
+    return pn.max(axis = 0)
+  elif statistic == 'percentile':
+    p = numpy.percentile(pn, percentile, axis = 0, overwrite_input = True)
+    if pn.dtype.kind in 'iub':
+      p = numpy.rint(p)		# Round interpolated values for integer maps.
+    return p
+
+# -----------------------------------------------------------------------------
+# Split index ranges (z,y,x order) into blocks of at most about max_voxels
+# voxels, keeping full x rows when they fit so block memory is contiguous.
+#
+def _filter_blocks(krange, jrange, irange, max_voxels):
+
+  (k0,k1), (j0,j1), (i0,i1) = krange, jrange, irange
+  bi = min(i1-i0, max_voxels)
+  bj = min(j1-j0, max(1, max_voxels // bi))
+  bk = min(k1-k0, max(1, max_voxels // (bi*bj)))
+  blocks = [(k, min(k+bk,k1), j, min(j+bj,j1), i, min(i+bi,i1))
+            for k in range(k0,k1,bk)
+            for j in range(j0,j1,bj)
+            for i in range(i0,i1,bi)]
+  return blocks
+
 # -----------------------------------------------------------------------------
 # Test volume data set of size n containing a sphere of radius r (index units)
 # with Gaussian noise.
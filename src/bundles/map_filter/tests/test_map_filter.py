@@ -0,0 +1,60 @@
+import numpy
+import pytest
+
+
+def _rank_filter_loop(m, bin_size, statistic, percentile=50):
+    # Brute force filter over each box that fits inside the array.
+    si, sj, sk = bin_size
+    hsi, hsj, hsk = si // 2, sj // 2, sk // 2
+    ksize, jsize, isize = m.shape
+    result = numpy.zeros(m.shape, m.dtype)
+    for k in range(hsk, ksize - hsk):
+        for j in range(hsj, jsize - hsj):
+            for i in range(hsi, isize - hsi):
+                box = m[k - hsk : k + hsk + 1, j - hsj : j + hsj + 1, i - hsi : i + hsi + 1]
+                if statistic == "median":
+                    v = numpy.median(box)
+                elif statistic == "minimum":
+                    v = box.min()
+                elif statistic == "maximum":
+                    v = box.max()
+                else:
+                    v = numpy.percentile(box, percentile)
+                    if m.dtype.kind in "iu":
+                        v = numpy.rint(v)
+                result[k, j, i] = v
+    return result
+
+
+@pytest.mark.parametrize("dtype", [numpy.float32, numpy.int16])
+@pytest.mark.parametrize("statistic", ["median", "minimum", "maximum", "percentile"])
+@pytest.mark.parametrize("nthread,block_voxels", [(1, 2**15), (2, 50)])
+def test_rank_filter_matches_loop(dtype, statistic, nthread, block_voxels):
+    from chimerax.map_filter.median import rank_filter_array
+
+    rng = numpy.random.default_rng(0)
+    m = (rng.random((9, 11, 13)) * 1000).astype(dtype)
+    bin_size = (3, 5, 3)
+    result = rank_filter_array(
+        m, bin_size, statistic, percentile=30, nthread=nthread, block_voxels=block_voxels
+    )
+    expected = _rank_filter_loop(m, bin_size, statistic, percentile=30)
+    assert result.dtype == m.dtype
+    assert numpy.array_equal(result, expected)
+
+
+def test_median_array_nan():
+    from chimerax.map_filter.median import median_array
+
+    m = numpy.ones((5, 5, 5), numpy.float32)
+    m[2, 2, 2] = numpy.nan
+    result = median_array(m, 3, nthread=1)
+    assert numpy.isnan(result[1:4, 1:4, 1:4]).all()
+    assert result[0].sum() == 0
+
+
+def test_rank_filter_even_bin_size():
+    from chimerax.map_filter.median import rank_filter_array
+
+    with pytest.raises(ValueError):
+        rank_filter_array(numpy.zeros((5, 5, 5), numpy.float32), 2)
@@ -0,0 +1,328 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Exhaustive global fit search.  For each rotation on a uniform grid of
+# orientations score every grid translation of the fit points in the map using
+# FFT cross-correlation, then locally optimize the best scoring placements.
+# Returns the fits, the number of fits rejected for having too many points
+# outside the contour, and the number of placements optimized (at most n).
+#
+# Points should be in volume local coordinates.
+# Models can contain atomic models and maps that are the source of the points.
+#
+def fft_fit_search(models, points, point_weights, volume, n,
+                   angle_step = 15, peaks_per_rotation = 3,
+                   angle_tolerance = 6, shift_tolerance = 3,
+                   asymmetric_unit = True,
+                   minimum_points_in_contour = 0.5,
+                   metric = 'sum product',
+                   optimize_translation = True, optimize_rotation = True,
+                   max_steps = 2000,
+                   ijk_step_size_min = 0.01, ijk_step_size_max = 0.5,
+                   request_stop_cb = None, nthread = None):
+
+    starts = fft_placements(points, point_weights, volume, n,
+                            angle_step = angle_step,
+                            peaks_per_rotation = peaks_per_rotation,
+                            shift_tolerance = shift_tolerance, metric = metric,
+                            request_stop_cb = request_stop_cb, nthread = nthread)
+
+    from .search import optimize_placements
+    flist, outside = optimize_placements(models, points, point_weights, volume, starts,
+                                         angle_tolerance, shift_tolerance, asymmetric_unit,
+                                         minimum_points_in_contour, metric,
+                                         optimize_translation, optimize_rotation, max_steps,
+                                         ijk_step_size_min, ijk_step_size_max,
+                                         request_stop_cb, nthread)
+    return flist, outside, len(starts)
+
+# -----------------------------------------------------------------------------
+# Return the n best scoring placements of the points found by FFT correlation,
+# excluding placements close to a better one.  Placements are transforms
+# from point coordinates to volume local coordinates with the point center
+# within the volume contour bounds.
+#
+def fft_placements(points, point_weights, volume, n, angle_step = 15,
+                   peaks_per_rotation = 3, shift_tolerance = 3,
+                   metric = 'sum product', request_stop_cb = None, nthread = None):
+
+    rotations = rotation_grid(angle_step)
+    scorer = FFTScorer(points, point_weights, volume, metric, shift_tolerance)
+    nrot = len(rotations)
+
+    if nthread is None:
+        from multiprocessing import cpu_count
+        nthread = max(1, cpu_count()//2)
+    # Each thread uses several FFT size arrays, so limit threads for large maps.
+    max_threads = max(1, int(scorer.max_memory // scorer.rotation_memory))
+    nthread = min(nthread, max_threads)
+
+    peaks = []
+    from chimerax.core.threadq import apply_to_list
+    batch_size = 4*nthread
+    for bstart in range(0, nrot, batch_size):
+        if request_stop_cb and request_stop_cb('FFT search rotation %d of %d (%s grid)'
+                                               % (bstart+1, nrot, scorer.grid_size_text)):
+            break
+        args = [(i, rotations[i], peaks_per_rotation)
+                for i in range(bstart, min(nrot, bstart+batch_size))]
+        for rpeaks in apply_to_list(scorer.rotation_peaks, args, nthread = nthread):
+            peaks.extend(rpeaks)
+
+    # Order by score, breaking ties by rotation and translation for reproducibility.
+    peaks.sort(key = lambda p: (-p[0], p[1], p[2]))
+    from math import pi
+    from chimerax.geometry import bins
+    center = points.mean(axis=0)
+    b = bins.Binned_Transforms(angle_step*pi/180, max(shift_tolerance, scorer.spacing), center)
+    starts = []
+    for score, r, t in peaks:
+        tf = scorer.placement(rotations[r], t)
+        if not b.close_transforms(tf):
+            starts.append(tf)
+            b.add_transform(tf)
+            if len(starts) >= n:
+                break
+
+    return starts
+
+# -----------------------------------------------------------------------------
+# Rotations approximately uniformly covering all orientations with the given
+# spacing in degrees.  Rotation axis directions are spread on a sphere and
+# each direction is combined with spins about that direction.
+#
+def rotation_grid(angle_step):
+
+    from math import pi, ceil, radians
+    a = radians(angle_step)
+    ndir = max(1, int(ceil(4*pi/(a*a))))
+    nspin = max(1, int(ceil(2*pi/a)))
+    from chimerax.geometry import orthonormal_frame, rotation
+    from chimerax.geometry.sphere import sphere_points
+    spins = [rotation((0,0,1), 360*k/nspin) for k in range(nspin)]
+    rots = []
+    for d in sphere_points(ndir):
+        f = orthonormal_frame(d)
+        rots.extend([f * s for s in spins])
+    return rots
+
+# -----------------------------------------------------------------------------
+# Score all grid translations of rotated points by cross-correlation of the
+# map with the points spread onto a grid using trilinear weights.  The map
+# is zero padded so translations do not wrap around.  Scores are the fitmap
+# sum product (overlap), correlation or correlation about mean, except that
+# the map normalization uses interpolated squared map values.
+#
+class FFTScorer:
+
+    max_memory = 2**31     # Bytes of FFT arrays for all threads.
+
+    def __init__(self, points, point_weights, volume, metric, shift_tolerance):
+
+        self.points = points
+        from numpy import ones, float32, float64
+        w = ones((len(points),), float32) if point_weights is None else point_weights
+        self.metric = metric
+        if metric == 'correlation about mean':
+            w = w - w.mean(dtype = float64)
+        self.weights = w
+        from math import sqrt
+        self.weights_norm = sqrt((w.astype(float64)**2).sum()) or 1.0
+        self.npoints = len(points)
+
+        self.center = c = points.mean(axis=0)
+        ijk_to_xyz = volume.matrix_indices_to_xyz_transform(step = 1)
+        self.ijk_to_xyz = ijk_to_xyz
+        self.xyz_to_ijk = xyz_to_ijk = ijk_to_xyz.inverse()
+        from chimerax.geometry import norm, translation
+        self.center_tf = translation(c), translation(-c)
+
+        # Size of probe grid holding the points in any rotation.
+        from numpy import sqrt as nsqrt, array, ceil, floor
+        radius = nsqrt(((points - c)**2).sum(axis=1)).max()
+        # Grid indices per unit length along x, y, z grid axes.
+        axis_scale = array([norm(row[:3]) for row in xyz_to_ijk.matrix])
+        self.spacing = 1/axis_scale.max()
+        probe_size = [int(ceil(2*radius*s)) + 3 for s in axis_scale]
+
+        data = volume.matrix(step = 1)
+        map_size = data.shape[::-1]
+        from chimerax.map_filter.gaussian import efficient_fft_size
+        self.fft_size = fs = tuple(efficient_fft_size(ms + ps)
+                                   for ms, ps in zip(map_size, probe_size))
+        self.fft_shape = fshape = fs[::-1]
+        self.grid_size_text = '%d,%d,%d' % fs
+
+        # Range of grid translations keeping the point center inside the contour bounds.
+        from .search import search_bounds
+        bounds = search_bounds(volume)
+        corners = array([(x,y,z) for x in (bounds.xyz_min[0], bounds.xyz_max[0])
+                         for y in (bounds.xyz_min[1], bounds.xyz_max[1])
+                         for z in (bounds.xyz_min[2], bounds.xyz_max[2])], float64)
+        cijk = xyz_to_ijk.transform_points(corners)
+        c_ijk = xyz_to_ijk * c
+        self.center_range = (ceil(cijk.min(axis=0) - c_ijk).astype(int),
+                             floor(cijk.max(axis=0) - c_ijk).astype(int))
+        # Suppress peaks within the shift tolerance of a higher peak.
+        self.peak_radius = [max(1, int(round(shift_tolerance*s))) for s in axis_scale]
+
+        self.map_fft = self._map_fft(data)
+        self.map2_fft = None if metric == 'sum product' else self._map_fft(data.astype(float32)**2)
+
+        self.rotation_memory = self._rotation_memory()
+
+    # -------------------------------------------------------------------------
+    # Peak bytes of FFT size arrays used by rotation_peaks() for one rotation.
+    #
+    def _rotation_memory(self):
+        fshape = self.fft_shape
+        rsize = fshape[0]*fshape[1]*fshape[2]
+        csize = fshape[0]*fshape[1]*(fshape[2]//2+1)
+        # Complex and real array item sizes depend on the numpy version.
+        from numpy.fft import rfftn, irfftn
+        from numpy import zeros, float32
+        c = rfftn(zeros((2,2,2), float32), axes = (0,1,2))
+        cbytes = csize * c.itemsize
+        rbytes = rsize * irfftn(c, s = (2,2,2), axes = (0,1,2)).itemsize
+        # Padded probe grid, probe transform, product with map transform,
+        # inverse transform work copy and the correlation result.
+        mem = 3*cbytes + 2*rbytes
+        if self.metric != 'sum product':
+            # Mask transform, second product and correlation and temporaries
+            # for normalization.
+            mem += cbytes + 3*rbytes
+        return mem
+
+    # -------------------------------------------------------------------------
+    # Return list of (score, rotation index, translation) for the best
+    # scoring translations of points with the given rotation about their center.
+    #
+    def rotation_peaks(self, rotation_index, rotation, npeaks):
+
+        tf = self.xyz_to_ijk * self.rotation_about_center(rotation)
+        ijk = tf.transform_points(self.points)
+        from numpy import floor
+        origin = floor(ijk.min(axis=0)).astype(int)
+        ijk -= origin
+        pshape = tuple(int(s)+2 for s in ijk.max(axis=0)[::-1])
+
+        weights_fft = self._probe_fft(spread_points(ijk, self.weights, pshape))
+        score = self._correlate(self.map_fft, weights_fft)
+        del weights_fft
+
+        metric = self.metric
+        if metric != 'sum product':
+            # Normalize by map values at the points.
+            from numpy import ones, float32, sqrt, maximum
+            mask_fft = self._probe_fft(spread_points(ijk, ones((len(ijk),), float32), pshape))
+            v2sum = self._correlate(self.map2_fft, mask_fft)
+            if metric == 'correlation about mean':
+                vsum = self._correlate(self.map_fft, mask_fft)
+                v2sum -= vsum*vsum/self.npoints
+                del vsum
+            del mask_fft
+            # Avoid amplifying round-off error where the map is zero.
+            floor = max(1e-6*v2sum.max(), 1e-30)
+            score /= self.weights_norm * sqrt(maximum(v2sum, floor))
+            del v2sum
+
+        # Restrict to translations placing the point center within bounds.
+        (cmin, cmax) = self.center_range
+        from numpy import arange, ix_
+        sranges = [arange(c0 + o, c1 + o + 1) % size
+                   for c0, c1, o, size in zip(cmin, cmax, origin, self.fft_size)]
+        if min(len(r) for r in sranges) == 0:
+            return []
+        s = score[ix_(sranges[2], sranges[1], sranges[0])]
+
+        peaks = []
+        r = self.peak_radius
+        from numpy import unravel_index, isfinite
+        for p in range(npeaks):
+            k, j, i = kji = unravel_index(s.argmax(), s.shape)
+            v = s[kji]
+            if not isfinite(v):
+                break
+            t = (cmin[0]+i, cmin[1]+j, cmin[2]+k)     # Grid shift of points
+            peaks.append((float(v), rotation_index, t))
+            s[max(0,k-r[2]):k+r[2]+1, max(0,j-r[1]):j+r[1]+1, max(0,i-r[0]):i+r[0]+1] = -float('inf')
+        return peaks
+
+    # -------------------------------------------------------------------------
+    #
+    def _map_fft(self, array):
+        from numpy.fft import rfftn
+        from numpy import float32
+        return rfftn(array.astype(float32, copy = False), s = self.fft_shape, axes = (0,1,2))
+
+    def _probe_fft(self, grid):
+        f = self._map_fft(grid)
+        from numpy import conj
+        return conj(f, out = f)
+
+    def _correlate(self, map_fft, probe_fft):
+        '''Correlation of map and probe grid for all grid shifts of the probe.'''
+        from numpy.fft import irfftn
+        return irfftn(map_fft * probe_fft, s = self.fft_shape, axes = (0,1,2))
+
+    # -------------------------------------------------------------------------
+    #
+    def rotation_about_center(self, rotation):
+        ctf, cinv = self.center_tf
+        return ctf * rotation * cinv
+
+    # -------------------------------------------------------------------------
+    # Transform from point coordinates to volume local coordinates for
+    # a rotation and grid shift of the point center.
+    #
+    def placement(self, rotation, grid_shift):
+        from chimerax.geometry import translation
+        shift = self.ijk_to_xyz.transform_vector(grid_shift)
+        return translation(shift) * self.rotation_about_center(rotation)
+
+# -----------------------------------------------------------------------------
+# Spread point weights onto a grid of the given shape (z,y,x order) with
+# trilinear interpolation weights.  Points are in grid index coordinates
+# (x,y,z order) and must be within the grid.  This is the adjoint of trilinear
+# interpolation so correlating the grid with a map sums interpolated map values
+# times weights.
+#
+def spread_points(ijk, weights, shape):
+
+    from numpy import floor, bincount, concatenate, float64
+    i0 = floor(ijk).astype(int)
+    f = (ijk - i0).astype(float64)
+    g = 1 - f
+    nz, ny, nx = shape
+    index, weight = [], []
+    for dk in (0,1):
+        wk = (f if dk else g)[:,2] * weights
+        for dj in (0,1):
+            wj = wk * (f if dj else g)[:,1]
+            for di in (0,1):
+                index.append(((i0[:,2]+dk)*ny + (i0[:,1]+dj))*nx + (i0[:,0]+di))
+                weight.append(wj * (f if di else g)[:,0])
+    grid = bincount(concatenate(index), weights = concatenate(weight), minlength = nz*ny*nx)
+    return grid.reshape(shape)
@@ -17,7 +17,8 @@ def fitmap(session, atoms_or_map, in_map = None, subtract_maps = None,
            metric = None, envelope = True, zeros = False, resolution = None,
            shift = True, rotate = True, symmetric = False,
            move_whole_molecules = True,
-           search = 0, placement = 'sr', radius = None,
+           search = 0, search_method = 'random', angle_step = 15,
+           placement = 'sr', radius = None,
            cluster_angle = 6, cluster_shift = 3,
            asymmetric_unit = True, level_inside = 0.1, seed = 0, sequence = 0,
            max_steps = 2000, grid_step_min = 0.01, grid_step_max = 0.5,
@@ -47,6 +48,7 @@ def fitmap(session, atoms_or_map, in_map = None, subtract_maps = None,
       Fit each model in sequence subtracting other models first for this number of specified fits.
     search : integer
       Fit using N randomized initial placements and cluster similar results.
+      With FFT search method this is the number of best scoring placements optimized.
 
     ----------------------------------------------------------------------------
     Fitting settings
@@ -81,6 +83,11 @@ def fitmap(session, atoms_or_map, in_map = None, subtract_maps = None,
     ----------------------------------------------------------------------------
     Search options
     ----------------------------------------------------------------------------
+    search_method : 'random' or 'fft'
+      Use random initial placements, or score all rotations on a grid and all
+      translations using FFT cross-correlation and optimize the best scoring placements.
+    angle_step : float
+      Spacing in degrees of rotations scored by FFT search.
     placement : 'sr', 's', or 'r'
       Whether random placements should include shift and rotation
     radius : float
@@ -116,6 +123,12 @@ def fitmap(session, atoms_or_map, in_map = None, subtract_maps = None,
 
     check_fit_options(atoms_or_map, volume, metric, resolution,
                       symmetric, mwm, search, sequence)
+    if search and search_method == 'fft':
+        if angle_step <= 0:
+            raise UserError('FFT search angle step must be positive, got %.3g' % angle_step)
+        if placement != 'sr' or radius is not None:
+            raise UserError('FFT search scores all rotations and shifts, '
+                            'the placement and radius options cannot be used')
 
     flist = []
     log = session.logger
@@ -129,7 +142,8 @@ def fitmap(session, atoms_or_map, in_map = None, subtract_maps = None,
             fits = fit_search(atoms, v, volume, metric, envelope, zeros, shift, rotate,
                               mwm, search, placement, radius,
                               cluster_angle, cluster_shift, asymmetric_unit, level_inside,
-                              max_steps, grid_step_min, grid_step_max, log, random_seed = seed)
+                              max_steps, grid_step_min, grid_step_max, log, random_seed = seed,
+                              search_method = search_method, angle_step = angle_step)
         elif symmetric:
             fits = [fit_map_in_symmetric_map(v, volume, metric, envelope, zeros,
                                              shift, rotate, mwm,
@@ -390,7 +404,8 @@ def fit_map_in_symmetric_map(v, volume, metric, envelope, zeros,
 def fit_search(atoms, v, volume, metric, envelope, zeros, shift, rotate,
                move_whole_molecules, search, placement, radius,
                cluster_angle, cluster_shift, asymmetric_unit, level_inside,
-               max_steps, grid_step_min, grid_step_max, log = None, random_seed = 0):
+               max_steps, grid_step_min, grid_step_max, log = None, random_seed = 0,
+               search_method = 'random', angle_step = 15):
     
     # TODO: Handle case where not moving whole molecules.
 
@@ -414,7 +429,15 @@ def fit_search(atoms, v, volume, metric, envelope, zeros, shift, rotate,
     def stop_cb(msg, task = None, log = log):
         return request_stop_cb(msg, task = task, log = log)
 #    try:
-    flist, outside = FS.fit_search(
+    if search_method == 'fft':
+        from .fftsearch import fft_fit_search
+        flist, outside, nstarts = fft_fit_search(
+            mlist, points, point_weights, volume, search, angle_step, 3,
+            cluster_angle, cluster_shift, asymmetric_unit, level_inside,
+            me, shift, rotate, max_steps, grid_step_min, grid_step_max, stop_cb)
+    else:
+        nstarts = search
+        flist, outside = FS.fit_search(
             mlist, points, point_weights, volume, search, rotations, shifts,
             radius, cluster_angle, cluster_shift, asymmetric_unit, level_inside,
             me, shift, rotate, max_steps, grid_step_min, grid_step_max, stop_cb,
@@ -423,7 +446,8 @@ def fit_search(atoms, v, volume, metric, envelope, zeros, shift, rotate,
 #        task.finished()
 
     if log:
-        report_fit_search_results(flist, search, outside, level_inside, log)
+        placements = 'FFT search placements' if search_method == 'fft' else 'random placements'
+        report_fit_search_results(flist, nstarts, outside, level_inside, log, placements)
     return flist
 
 # -----------------------------------------------------------------------------
@@ -441,10 +465,11 @@ def request_stop_cb(message, task = None, log = None):
 
 # -----------------------------------------------------------------------------
 #
-def report_fit_search_results(flist, search, outside, level_inside, log):
+def report_fit_search_results(flist, search, outside, level_inside, log,
+                              placements = 'random placements'):
 
-    log.info('Found %d unique fits from %d random placements ' %
-             (len(flist), search) +
+    log.info('Found %d unique fits from %d %s ' %
+             (len(flist), search, placements) +
              'having fraction of points inside contour >= %.3f (%d of %d).\n'
              % (level_inside, search-outside,  search))
 
@@ -582,6 +607,8 @@ def register_fitmap_command(logger):
             ('grid_step_min', FloatArg),
 
 # Search options
+            ('search_method', EnumOf(('random', 'fft'))),
+            ('angle_step', FloatArg),
             ('placement', EnumOf(('sr', 's', 'r'))),
             ('radius', FloatArg),
             ('cluster_angle', FloatArg),
@@ -27,6 +27,7 @@
 #
 # Points should be in volume local coordinates.
 # Models can contain atomic models and maps that are the source of the points.
+# Results are the same for any number of threads for a given random seed.
 #
 def fit_search(models, points, point_weights, volume, n,
                rotations = True, shifts = True, radius = None,
@@ -38,74 +39,123 @@ def fit_search(models, points, point_weights, volume, n,
                max_steps = 2000,
                ijk_step_size_min = 0.01, ijk_step_size_max = 0.5,
                request_stop_cb = None,
-               random_seed = 0):
+               random_seed = 0, nthread = None):
 
-    bounds = volume.surface_bounds()
-    if bounds is None:
-        xyz_min, xyz_max = volume.xyz_bounds(step = 1)
-        from chimerax.geometry import Bounds
-        bounds = Bounds(xyz_min, xyz_max)
+    bounds = search_bounds(volume)
+    from chimerax.geometry import translation, identity
+    center = points.mean(axis=0)
+    ctf = translation(-center)
 
+    # Draw all random starting placements first so the placements for a given
+    # random seed do not depend on the order the optimizations finish.
+    set_random_seed(random_seed)
+    starts = []
+    for i in range(n):
+        shift = ((random_translation(bounds) if radius is None
+                  else random_translation_step(center, radius)) if shifts
+                  else translation(center))
+        rot = random_rotation() if rotations else identity()
+        starts.append(shift * rot * ctf)
+
+    return optimize_placements(models, points, point_weights, volume, starts,
+                               angle_tolerance, shift_tolerance, asymmetric_unit,
+                               minimum_points_in_contour, metric,
+                               optimize_translation, optimize_rotation, max_steps,
+                               ijk_step_size_min, ijk_step_size_max,
+                               request_stop_cb, nthread)
+
+# -----------------------------------------------------------------------------
+# Locally optimize starting placements of a model and collect unique fits.
+#
+# Starting placements are transforms from point coordinates to volume local
+# coordinates.  They are optimized in nthread threads sharing the map array
+# (default half the number of cores) and merged in order so results do not
+# depend on the number of threads.  Returns fits best first and the number
+# of placements that had too few points inside the volume contour.
+#
+def optimize_placements(models, points, point_weights, volume, starts,
+                        angle_tolerance = 6, shift_tolerance = 3,
+                        asymmetric_unit = True,
+                        minimum_points_in_contour = 0.5,
+                        metric = 'sum product',
+                        optimize_translation = True, optimize_rotation = True,
+                        max_steps = 2000,
+                        ijk_step_size_min = 0.01, ijk_step_size_max = 0.5,
+                        request_stop_cb = None, nthread = None):
+
+    bounds = search_bounds(volume)
     asym_center_f = (.75,.55,.55)
     asym_center = tuple(x0 + (x1-x0)*f
                         for x0, x1, f in zip(bounds.xyz_min, bounds.xyz_max, asym_center_f)) 
 
-    from chimerax.geometry import translation, identity
     center = points.mean(axis=0)
-    ctf = translation(-center)
     ijk_to_xyz_tf = volume.matrix_indices_to_xyz_transform(step = 1)
     xyz_to_ijk_tf = ijk_to_xyz_tf.inverse()
     data_array = volume.matrix(step = 1)
     vtfinv = volume.position.inverse()
     mtv_list = [vtfinv * m.position for m in models]
 
-    set_random_seed(random_seed)
-    
+    from .fitmap import locate_maximum
+    def optimize(tf):
+        p_to_ijk_tf = xyz_to_ijk_tf * tf
+        move_tf, stats = \
+          locate_maximum(points, point_weights, data_array, p_to_ijk_tf,
+                         max_steps, ijk_step_size_min, ijk_step_size_max,
+                         optimize_translation, optimize_rotation,
+                         metric, request_stop_cb = None)
+        ptf = tf * move_tf
+        atf = (unique_symmetry_position(ptf, center, asym_center, volume.data.symmetries)
+               if asymmetric_unit else ptf)
+        return ptf, atf, stats
+
+    def optimize_start(i, tf):
+        fit = optimize(tf)
+        ptf, atf, stats = fit
+        # Fits moved to the asymmetric unit are optimized again unless they are
+        # close to an earlier fit.  That is only known when the results are
+        # merged in order, so do the second optimization here in case it is needed.
+        refit = None if atf is ptf else optimize(atf)
+        return i, fit, refit
+
+    if nthread is None:
+        from multiprocessing import cpu_count
+        nthread = max(1, cpu_count()//2)
+    batch_size = 4*nthread
+
+    n = len(starts)
     flist = []
     outside = 0
     from math import pi
     from chimerax.geometry import bins
     b = bins.Binned_Transforms(angle_tolerance*pi/180, shift_tolerance, center)
     fo = {}
-    from .fitmap import locate_maximum
-    for i in range(n):
-        if request_stop_cb and request_stop_cb('Fit %d of %d' % (i+1,n)):
+    from chimerax.core.threadq import apply_to_list
+    for bstart in range(0, n, batch_size):
+        if request_stop_cb and request_stop_cb('Fit %d of %d' % (bstart+1,n)):
             break
-        shift = ((random_translation(bounds) if radius is None
-                  else random_translation_step(center, radius)) if shifts
-                  else translation(center))
-        rot = random_rotation() if rotations else identity()
-        tf = shift * rot * ctf
-        optimize = True
-        max_opt = 2
-        while optimize and max_opt > 0:
-            p_to_ijk_tf = xyz_to_ijk_tf * tf
-            move_tf, stats = \
-              locate_maximum(points, point_weights, data_array, p_to_ijk_tf,
-                             max_steps, ijk_step_size_min, ijk_step_size_max,
-                             optimize_translation, optimize_rotation,
-                             metric, request_stop_cb = None)
-            ptf = tf * move_tf
-            optimize = False
-            max_opt -= 1
-            if asymmetric_unit:
-                atf = unique_symmetry_position(ptf, center, asym_center,
-                                               volume.data.symmetries)
-                if not atf is ptf:
-                    ptf = tf = atf
-                    optimize = not b.close_transforms(ptf)
-        close = b.close_transforms(ptf)
-        if len(close) == 0:
-            transforms = [ptf * mtv for mtv in mtv_list]
-            stats['hits'] = 1
-            f = Fit(models, transforms, volume, stats)
-            f.ptf = ptf
-            flist.append(f)
-            b.add_transform(ptf)
-            fo[id(ptf)] = f
-        else:
-            s = fo[id(close[0])].stats
-            s['hits'] += 1
+        args = [(i, starts[i]) for i in range(bstart, min(n, bstart+batch_size))]
+        results = apply_to_list(optimize_start, args, nthread = nthread)
+        results.sort(key = lambda r: r[0])
+
+        # Cluster fits and count hits in the order of the starting placements.
+        for i, (ptf, atf, stats), refit in results:
+            if atf is not ptf:
+                ptf = atf
+                if not b.close_transforms(ptf):
+                    ptf, atf, stats = refit
+                    ptf = atf
+            close = b.close_transforms(ptf)
+            if len(close) == 0:
+                transforms = [ptf * mtv for mtv in mtv_list]
+                stats['hits'] = 1
+                f = Fit(models, transforms, volume, stats)
+                f.ptf = ptf
+                flist.append(f)
+                b.add_transform(ptf)
+                fo[id(ptf)] = f
+            else:
+                s = fo[id(close[0])].stats
+                s['hits'] += 1
 
     # Filter out solutions with too many points outside volume contour.
     fflist = [f for f in flist if (in_contour(f.ptf, points, volume, f.stats)
@@ -119,6 +169,18 @@ def fit_search(models, points, point_weights, volume, n,
 
     return fflist, outside
 
+# -----------------------------------------------------------------------------
+# Bounds of volume contour surface, or of the full map if no surface is shown.
+#
+def search_bounds(volume):
+
+    bounds = volume.surface_bounds()
+    if bounds is None:
+        xyz_min, xyz_max = volume.xyz_bounds(step = 1)
+        from chimerax.geometry import Bounds
+        bounds = Bounds(xyz_min, xyz_max)
+    return bounds
+
 # -----------------------------------------------------------------------------
 #
 def in_contour(tf, points, volume, stats):
@@ -10,6 +10,7 @@ def test_map_fit(test_production_session):
     run(test_production_session, "fit #3 in #2 subtract #4")
     run(test_production_session, "fit #3,4 in #2 sequence 4")
     run(test_production_session, "fit #1 in #2 search 3")
+    run(test_production_session, "fit #3 in #2 search 3 searchMethod fft angleStep 45")
     run(test_production_session, "vol #2 sym C2")
     run(test_production_session, "fit #3 in #2 sym true")
     run(test_production_session, "fit #4 in #2 envelope false zeros true")
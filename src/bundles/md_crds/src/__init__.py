@@ -64,7 +64,8 @@ class _MDCrdsBundleAPI(BundleAPI):
             else:
                 class MDInfo(OpenerInfo):
                     def open(self, session, data, file_name, *, structure_model=None,
-                            md_type=name, replace=True, slider=True, start=1, step=1, end=None, **kw):
+                            md_type=name, replace=True, slider=True, start=1, step=1, end=None,
+                            lazy=False, cache_frames=100, **kw):
                         if structure_model is None:
                             from chimerax.core.errors import UserError, CancelOperation
                             from chimerax.atomic import Structure
@@ -113,7 +114,8 @@ class _MDCrdsBundleAPI(BundleAPI):
                                         " into")
                         from .read_coords import read_coords
                         num_coords = read_coords(session, data, structure_model, md_type,
-                            replace=replace, start=start, step=step, end=end)
+                            replace=replace, start=start, step=step, end=end, lazy=lazy,
+                            cache_frames=cache_frames)
                         if slider and session.ui.is_gui:
                             from chimerax.std_commands.coordset import coordset_slider
                             coordset_slider(session, [structure_model])
@@ -127,7 +129,9 @@ class _MDCrdsBundleAPI(BundleAPI):
                         from chimerax.atomic import StructureArg
                         from chimerax.core.commands import BoolArg, PositiveIntArg
                         return {
+                            'cache_frames': PositiveIntArg,
                             'end': PositiveIntArg,
+                            'lazy': BoolArg,
                             'replace': BoolArg,
                             'slider': BoolArg,
                             'start': PositiveIntArg,
@@ -24,7 +24,17 @@
 
 from chimerax.core.errors import UserError, LimitationError
 
-def read_coords(session, file_name, model, format_name, *, replace=True, start=1, step=1, end=None):
+def read_coords(session, file_name, model, format_name, *, replace=True, start=1, step=1, end=None,
+        lazy=False, cache_frames=100):
+    if getattr(model, 'lazy_trajectory', None) is not None:
+        if not replace:
+            raise UserError("Cannot add frames to %s, which reads its trajectory lazily" % model)
+        del model.lazy_trajectory
+    if lazy:
+        if not replace:
+            raise UserError("Lazily read trajectories must replace existing frames")
+        return _read_lazy_coords(session, file_name, model, format_name, start, step, end,
+            cache_frames)
     from numpy import array, float64
     def read_gromacs_file(read_func, file_name):
         try:
@@ -75,6 +85,33 @@ def read_coords(session, file_name, model, format_name, *, replace=True, start=1
     model.add_coordsets(coords, replace=replace)
     return len(coords)
 
+def _read_lazy_coords(session, file_name, model, format_name, start, step, end, cache_frames):
+    if format_name == "dcd":
+        from .dcd.MDToolsMarch97.md_DCD import DCD
+        dcd = DCD(file_name)
+        num_atoms, num_file_frames = dcd.numatoms, dcd.numframes
+        read_frame = dcd.__getitem__
+    elif format_name == "amber":
+        from netCDF4 import Dataset
+        ds = Dataset(file_name, "r")
+        try:
+            crd_var = ds.variables['coordinates']
+        except KeyError:
+            raise UserError("File is not an Amber netCDF coordinates file (no coordinates found)")
+        num_file_frames, num_atoms = crd_var.shape[:2]
+        read_frame = lambda i, crd_var=crd_var: crd_var[i]
+    else:
+        # xtc/trr frames are variable length and can only be reached by decoding
+        # all preceding frames
+        raise LimitationError("Lazy reading of %s trajectories not supported;"
+            " only DCD and Amber netCDF" % format_name)
+    if model.num_atoms != num_atoms:
+        raise UserError("Specified structure has %d atoms"
+            " whereas the coordinates are for %d atoms" % (model.num_atoms, num_atoms))
+    from .trajectory import set_lazy_trajectory
+    return set_lazy_trajectory(session, model, read_frame, num_file_frames, start, step, end,
+        window_size=cache_frames)
+
 def process_limit_args(session, start, step, end, num_coords):
     if end is None:
         end = num_coords
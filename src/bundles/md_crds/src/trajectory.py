@@ -0,0 +1,98 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+"""
+Lazily read trajectory frames instead of holding every frame as a coordset.
+
+The structure keeps a single coordset whose coordinates are replaced when a
+different frame is shown.  Decoded frames are kept in a least-recently-used
+window so that memory use depends on the window size rather than on the
+length of the trajectory.  Code that plays coordinate sets (e.g. the coordset
+command and slider) looks for the structure's 'lazy_trajectory' attribute.
+"""
+
+class LazyTrajectory:
+    def __init__(self, structure, read_frame, frame_indices, *, window_size=100):
+        '''
+        'read_frame' is a function taking a file frame index and returning an
+        Nx3 array of coordinates (in Angstroms) for that frame.  'frame_indices'
+        are the file frame indices corresponding to frame ids 1, 2, 3...
+        '''
+        self.structure = structure
+        self._read_frame = read_frame
+        self._frame_indices = frame_indices
+        self.window_size = window_size
+        from collections import OrderedDict
+        self._frames = OrderedDict()
+        self.current_frame = None
+
+    @property
+    def num_frames(self):
+        return len(self._frame_indices)
+
+    @property
+    def frame_ids(self):
+        return range(1, self.num_frames + 1)
+
+    def coords(self, frame_id):
+        '''Return float64 Nx3 coordinates for the frame with the given id (starting at 1).'''
+        frames = self._frames
+        if frame_id in frames:
+            frames.move_to_end(frame_id)
+            return frames[frame_id]
+        if frame_id < 1 or frame_id > self.num_frames:
+            raise IndexError("Frame %d out of range 1-%d" % (frame_id, self.num_frames))
+        from numpy import asarray, float64
+        xyz = asarray(self._read_frame(self._frame_indices[frame_id-1]), float64, order='C')
+        frames[frame_id] = xyz
+        while len(frames) > self.window_size:
+            frames.popitem(last=False)
+        return xyz
+
+    def show_frame(self, frame_id):
+        '''Set the structure coordinates to those of the given frame.'''
+        s = self.structure
+        atoms = s.atoms
+        atoms.coords = self.coords(frame_id)[atoms.coord_indices]
+        self.current_frame = frame_id
+
+    def clear_cache(self):
+        self._frames.clear()
+
+def set_lazy_trajectory(session, model, read_frame, num_file_frames, start, step, end,
+        window_size=100):
+    '''Replace the model's coordsets with a single coordset backed by a LazyTrajectory.'''
+    from .read_coords import process_limit_args
+    start, step, end = process_limit_args(session, start, step, end, num_file_frames)
+    frame_indices = range(start, end, step)
+    if len(frame_indices) == 0:
+        from chimerax.core.errors import UserError
+        raise UserError("No frames in requested range")
+    traj = LazyTrajectory(model, read_frame, frame_indices, window_size=window_size)
+    model.remove_coordsets()
+    model.add_coordset(1, traj.coords(1))
+    model.active_coordset_id = 1
+    traj.current_frame = 1
+    model.lazy_trajectory = traj
+    return traj.num_frames
@@ -15,3 +15,21 @@ def test_md_crds(test_production_session, test_pdb, test_crd_file, expected_coor
     run(session, "open %s" % test_pdb)
     run(session, "open %s structureModel #1" % test_crd_file)
     assert(session.models[0].num_coordsets == expected_coordsets), "Expected %i coordinate sets; actually produced %s" % (expected_coordsets, session.models[0].num_coordsets)
+
+def test_md_crds_lazy(test_production_session):
+    session = test_production_session
+    from chimerax.core.commands import run
+    run(session, "open %s" % test_pdb_2)
+    run(session, "open %s structureModel #1" % test_dcd)
+    s = session.models[0]
+    expected = [s.coordset(cs_id).xyzs.copy() for cs_id in s.coordset_ids]
+    run(session, "open %s structureModel #1 lazy true cacheFrames 1" % test_dcd)
+    traj = s.lazy_trajectory
+    assert s.num_coordsets == 1
+    assert traj.num_frames == len(expected)
+    from numpy import allclose
+    for frame in (2, 1, 2):
+        run(session, "coordset #1 %d" % frame)
+        assert traj.current_frame == frame
+        assert allclose(s.atoms.coords, expected[frame-1])
+    assert len(traj._frames) == 1
@@ -34,8 +34,12 @@ def _get_server():
     return _server
 
 
-def start_server(session, log=None, port=None, ssl=None, json=False):
-    """If 'json' is True, then the return value from a command will be a JSON object with the following
+def start_server(session, log=None, port=None, ssl=None, json=False, queue_size=None):
+    """Requests are handled concurrently but commands run one at a time.  At most
+    'queue_size' requests (default 16) can wait to run; additional requests are refused
+    with HTTP status 503 so the client can retry later.
+
+    If 'json' is True, then the return value from a command will be a JSON object with the following
     name/value pairs:
 
     (name) json values
@@ -65,7 +69,8 @@ def start_server(session, log=None, port=None, ssl=None, json=False):
     else:
         from .server import RESTServer
 
-        _server = RESTServer(session, log=log)
+        kw = {} if queue_size is None else {"queue_size": queue_size}
+        _server = RESTServer(session, log=log, **kw)
         # Run code will report port number
         if log is None:
             _server.start(port, ssl, json)
@@ -73,7 +78,7 @@ def start_server(session, log=None, port=None, ssl=None, json=False):
             _server.start(port, ssl, json)
 
 
-from chimerax.core.commands import CmdDesc, IntArg, BoolArg
+from chimerax.core.commands import CmdDesc, IntArg, BoolArg, PositiveIntArg
 
 start_desc = CmdDesc(
     keyword=[
@@ -81,6 +86,7 @@ start_desc = CmdDesc(
         ("ssl", BoolArg),
         ("json", BoolArg),
         ("log", BoolArg),
+        ("queue_size", PositiveIntArg),
     ],
     synopsis="Start REST server",
 )
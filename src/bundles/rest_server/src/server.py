@@ -22,7 +22,7 @@
 # copies, of the software or any revisions or derivations thereof.
 # === UCSF ChimeraX Copyright ===
 
-from http.server import BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from chimerax.core.tasks import Task
 from chimerax.core.logger import PlainTextLog, StringPlainTextLog
 
@@ -35,6 +35,12 @@ class RESTServer(Task):
 
         self.httpd = None
         self.log = kw.pop("log", False)
+        # Requests handled concurrently, each in its own thread, but
+        # commands run one at a time in the main thread.  At most
+        # queue_size requests wait for the main thread, others get a
+        # "503 Service Unavailable" response so clients can retry.
+        self.queue_size = kw.pop("queue_size", 16)
+        self.command_slots = threading.BoundedSemaphore(self.queue_size)
         self.run_count = 0
         self.run_lock = threading.Lock()
         super().__init__(*args, **kw)
@@ -65,7 +71,6 @@ class RESTServer(Task):
         return self.httpd.server_address
 
     def run(self, port, use_ssl, json):
-        from http.server import HTTPServer
         import sys
 
         if port is None:
@@ -74,7 +79,7 @@ class RESTServer(Task):
         if use_ssl is None:
             # Defaults to cleartext
             use_ssl = False
-        self.httpd = HTTPServer(("localhost", port), RESTHandler)
+        self.httpd = ThreadingHTTPServer(("localhost", port), RESTHandler)
         self.httpd.chimerax_restserver = self
         self.json = json
         if not use_ssl:
@@ -134,19 +139,26 @@ class RESTHandler(BaseHTTPRequestHandler):
         (".ico", "image/png"),
     ]
 
+    # Keep connections open for multiple requests.  Every response
+    # must then give its Content-Length.
+    protocol_version = "HTTP/1.1"
+
+    # Binary array responses are written in blocks of this many bytes
+    array_block_size = 2**20
+
     # Whether to log to the ChimeraX log as well as whatever client is being
     # used
     log = False
 
     def do_GET(self):
         if not self.server.chimerax_restserver.run_increment():
+            self.close_connection = True
             return
         try:
             from urllib.parse import urlparse, parse_qs
 
             r = urlparse(self.path)
-            if r.path == "/run":
-                # Execute a command
+            if r.path in ("/run", "/batch", "/array"):
                 args = parse_qs(r.query)
                 if self.command == "POST":
                     for k, vl in self._parse_post().items():
@@ -156,11 +168,22 @@ class RESTHandler(BaseHTTPRequestHandler):
                             args[k] = vl
                         else:
                             al.extend(vl)
-                self._run(args)
+                if r.path == "/run":
+                    # Execute a command
+                    self._run(args)
+                elif r.path == "/batch":
+                    # Execute many commands in one request
+                    self._batch(args)
+                else:
+                    # Return a numpy array as raw bytes
+                    self._array(args)
             else:
                 # Serve up some static files for testing
                 import os.path
 
+                if self.command == "POST":
+                    self._discard_body()
+
                 fn = os.path.join(os.path.dirname(__file__), "static", r.path[1:])
                 try:
                     with open(fn, "rb") as f:
@@ -185,6 +208,7 @@ class RESTHandler(BaseHTTPRequestHandler):
     def _parse_post(self):
         ctype = self.headers.get("content-type")
         if not ctype:
+            self._discard_body()
             return {}
         from . import cgi
 
@@ -199,98 +223,295 @@ class RESTHandler(BaseHTTPRequestHandler):
             clength = int(self.headers.get("content-length"))
             fields = parse_qs(self.rfile.read(clength), True)
             return fields
+        elif ctype == "application/json":
+            # {"command": ["cmd1", "cmd2", ...], ...}
+            from json import loads
+
+            clength = int(self.headers.get("content-length"))
+            fields = loads(self.rfile.read(clength))
+            if not isinstance(fields, dict):
+                return {}
+            return {
+                k: (v if isinstance(v, list) else [v]) for k, v in fields.items()
+            }
         else:
+            self._discard_body()
             return {}
 
-    def _header(self, response, content_type, length=None):
+    def _discard_body(self):
+        # Unread request data would be taken as the next request
+        # on a kept-alive connection.
+        clength = self.headers.get("content-length")
+        if clength:
+            self.rfile.read(int(clength))
+
+    def _header(self, response, content_type, length=None, headers=()):
         self.send_response(response)
         self.send_header("Content-Type", content_type)
         if length is not None:
             self.send_header("Content-Length", str(length))
+        for name, value in headers:
+            self.send_header(name, value)
         self.end_headers()
 
-    def _run(self, args):
+    def _send_text(self, response, text, content_type="text/plain", headers=()):
+        data = bytes(text, "utf-8")
+        self._header(response, content_type, len(data), headers)
+        self.wfile.write(data)
+
+    def _call_in_session(self, func):
+        """Run func in the main thread and return (True, value).
+
+        Returns (False, None) after sending a "503 Service Unavailable"
+        response if too many requests are already waiting.  If func raises
+        an exception, the exception is reported in ChimeraX and an
+        "500 Internal Server Error" response is sent.
+        """
         from queue import Queue
-        from chimerax.core.errors import NotABug
-        from chimerax.core.logger import StringPlainTextLog
 
-        session = self.server.chimerax_restserver.session
-        q = Queue()
-
-        def f(
-            args=args, session=session, q=q, json=self.server.chimerax_restserver.json
-        ):
-            logger = session.logger
-            # rest_log.log_summary gets called at the end
-            # of the "with" statement
-            log_class = ByLevelPlainTextLog if json else StringPlainTextLog
-            log_class.propagate_to_chimerax = RESTHandler.log
-            with log_class(logger) as rest_log:
-                from chimerax.core.commands import run
-
-                error_info = None
+        rest_server = self.server.chimerax_restserver
+        if not rest_server.command_slots.acquire(blocking=False):
+            self._send_text(
+                503,
+                "Too many ChimeraX REST requests waiting\n",
+                headers=[("Retry-After", "1")],
+            )
+            return False, None
+        try:
+            q = Queue()
+
+            def f(func=func, q=q):
                 try:
-                    commands = args["command"]
-                except KeyError:
-                    logger.error('"command" parameter missing')
+                    value = func()
+                except BaseException as e:
+                    q.put((False, e))
+                    raise
+                q.put((True, value))
+
+            rest_server.session.ui.thread_safe(f)
+            ok, value = q.get()
+        finally:
+            rest_server.command_slots.release()
+        if not ok:
+            self._send_text(500, "%s: %s\n" % (value.__class__.__name__, value))
+            return False, None
+        return True, value
+
+    def _run(self, args):
+        session = self.server.chimerax_restserver.session
+        json = self.server.chimerax_restserver.json
+
+        def f(args=args, session=session, json=json):
+            try:
+                commands = args["command"]
+            except KeyError:
+                commands = None
+            return _run_commands(session, commands, json)
+
+        ok, response = self._call_in_session(f)
+        if ok:
+            self._send_text(200, response)
+
+    def _batch(self, args):
+        """Run a list of commands in the main thread in one pass.
+
+        Commands are given by repeated "command" parameters, or a JSON
+        POST body {"command": [...], "stop_on_error": true}.  The response
+        is a JSON list with one object per command executed, having
+        the same contents as a "json true" response from /run.
+        """
+        session = self.server.chimerax_restserver.session
+        try:
+            commands = args["command"]
+        except KeyError:
+            self._send_text(400, '"command" parameter missing\n')
+            return
+        stop_on_error = str(args.get("stop_on_error", ["true"])[-1]).lower() in (
+            "true",
+            "1",
+        )
+
+        def f(session=session, commands=commands, stop_on_error=stop_on_error):
+            results = []
+            for cmd in commands:
+                result = _run_commands(session, [cmd], True, encode=False)
+                results.append(result)
+                if stop_on_error and result["error"] is not None:
+                    break
+            from json import JSONEncoder
+
+            return JSONEncoder(default=lambda x: None).encode(results)
+
+        ok, response = self._call_in_session(f)
+        if ok:
+            self._send_text(200, response, "application/json")
+
+    def _array(self, args):
+        """Send a numpy array as raw bytes.
+
+        The "X-Array-Dtype" header gives the numpy dtype string (e.g. "<f4")
+        and "X-Array-Shape" the comma-separated dimensions.  The "type"
+        parameter chooses the data:
+
+          type=coords&atoms=SPEC        scene coordinates, N by 3 float64
+          type=map&volume=SPEC[&step=N][&region=i1,j1,k1,i2,j2,k2|all]
+                                        map values, indexed z, y, x
+          type=image[&width=W][&height=H][&supersample=N]
+                                        rendered RGBA image, uint8, row 0 at bottom
+        """
+        session = self.server.chimerax_restserver.session
+        params = {}
+        for k, vl in args.items():
+            v = vl[-1]
+            params[k] = v.decode("utf-8") if isinstance(v, bytes) else str(v)
+        kind = params.pop("type", None)
+        if kind not in _array_functions:
+            self._send_text(
+                400,
+                '"type" parameter must be one of %s\n' % ", ".join(_array_functions),
+            )
+            return
+
+        def f(session=session, kind=kind, params=params):
+            from chimerax.core.errors import UserError
+
+            try:
+                a = _array_functions[kind](session, **params)
+            except (UserError, TypeError, ValueError) as e:
+                return str(e)
+            from numpy import ascontiguousarray
+
+            return ascontiguousarray(a)
+
+        ok, a = self._call_in_session(f)
+        if not ok:
+            return
+        if isinstance(a, str):
+            self._send_text(400, a + "\n")
+            return
+        headers = [
+            ("X-Array-Dtype", a.dtype.str),
+            ("X-Array-Shape", ",".join(str(s) for s in a.shape)),
+        ]
+        self._header(200, "application/octet-stream", a.nbytes, headers)
+        data = memoryview(a).cast("B")
+        bs = self.array_block_size
+        for i in range(0, len(data), bs):
+            self.wfile.write(data[i : i + bs])
+
+
+def _run_commands(session, commands, json, encode=True):
+    """Run commands in the main thread and return the log output.
+
+    If json is true, a JSON string (or if encode is false, a dictionary)
+    with the return values, log messages and error is returned.
+    """
+    from chimerax.core.errors import NotABug
+
+    logger = session.logger
+    # rest_log.log_summary gets called at the end
+    # of the "with" statement
+    log_class = ByLevelPlainTextLog if json else StringPlainTextLog
+    log_class.propagate_to_chimerax = RESTHandler.log
+    with log_class(logger) as rest_log:
+        from chimerax.core.commands import run
+
+        error_info = None
+        ret_val = []
+        if commands is None:
+            logger.error('"command" parameter missing')
+        else:
+            try:
+                for cmd in commands:
+                    if isinstance(cmd, bytes):
+                        cmd = cmd.decode("utf-8")
+                    ret_val = run(
+                        session,
+                        cmd,
+                        log=RESTHandler.log,
+                        return_json=json,
+                        return_list=True,
+                    )
+            except NotABug as e:
+                if json:
                     ret_val = []
-                else:
-                    try:
-                        for cmd in commands:
-                            if isinstance(cmd, bytes):
-                                cmd = cmd.decode("utf-8")
-                            ret_val = run(
-                                session,
-                                cmd,
-                                log=RESTHandler.log,
-                                return_json=json,
-                                return_list=True,
-                            )
-                    except NotABug as e:
-                        if json:
-                            ret_val = []
-                            error_info = e
-                        logger.info(str(e))
-                    except Exception as e:
-                        if json:
-                            ret_val = []
-                            error_info = e
-                        else:
-                            raise
-                # if json, compose Python and JSON return values into a JSON string,
-                # along with log messages broken down by logging level
+                    error_info = e
+                logger.info(str(e))
+            except Exception as e:
                 if json:
-                    from chimerax.core.commands import JSONResult
-                    from json import JSONEncoder
-
-                    json_vals = []
-                    python_vals = []
-                    for val in ret_val:
-                        if isinstance(val, JSONResult):
-                            json_vals.append(val.json_value)
-                            python_vals.append(val.python_value)
-                        else:
-                            json_vals.append(None)
-                            python_vals.append(val)
-                    response = {}
-                    response["json values"] = json_vals
-                    response["python values"] = python_vals
-                    response["log messages"] = rest_log.getvalue()
-                    if error_info is None:
-                        response["error"] = None
-                    else:
-                        response["error"] = {
-                            "type": error_info.__class__.__name__,
-                            "message": str(error_info),
-                        }
-                    q.put(JSONEncoder(default=lambda x: None).encode(response))
+                    ret_val = []
+                    error_info = e
                 else:
-                    q.put(rest_log.getvalue())
+                    raise
+        if not json:
+            return rest_log.getvalue()
+        # if json, compose Python and JSON return values into a JSON string,
+        # along with log messages broken down by logging level
+        from chimerax.core.commands import JSONResult
+
+        json_vals = []
+        python_vals = []
+        for val in ret_val:
+            if isinstance(val, JSONResult):
+                json_vals.append(val.json_value)
+                python_vals.append(val.python_value)
+            else:
+                json_vals.append(None)
+                python_vals.append(val)
+        response = {}
+        response["json values"] = json_vals
+        response["python values"] = python_vals
+        response["log messages"] = rest_log.getvalue()
+        if error_info is None:
+            response["error"] = None
+        else:
+            response["error"] = {
+                "type": error_info.__class__.__name__,
+                "message": str(error_info),
+            }
+    if not encode:
+        return response
+    from json import JSONEncoder
 
-        session.ui.thread_safe(f)
-        data = bytes(q.get(), "utf-8")
-        self._header(200, "text/plain", len(data))
-        self.wfile.write(data)
+    return JSONEncoder(default=lambda x: None).encode(response)
+
+
+def _atom_coords(session, atoms):
+    from chimerax.atomic import AtomsArg
+
+    atoms = AtomsArg.parse(atoms, session)[0]
+    return atoms.scene_coords
+
+
+def _map_values(session, volume, step=None, region="all"):
+    from chimerax.map import MapArg, MapStepArg, MapRegionArg
+
+    v = MapArg.parse(volume, session)[0]
+    if step is not None:
+        step = MapStepArg.parse(step, session)[0]
+    region = MapRegionArg.parse(region, session)[0]
+    return v.matrix(step=step, subregion=region)
+
+
+def _image(session, width=None, height=None, supersample=None):
+    def opt_int(value):
+        return None if value is None else int(value)
+
+    rgba = session.main_view.image_rgba(
+        opt_int(width), opt_int(height), opt_int(supersample)
+    )
+    if rgba is None:
+        from chimerax.core.errors import UserError
+
+        raise UserError("Images cannot be rendered without OpenGL")
+    return rgba
+
+
+_array_functions = {
+    "coords": _atom_coords,
+    "map": _map_values,
+    "image": _image,
+}
 
 
 class ByLevelPlainTextLog(StringPlainTextLog):
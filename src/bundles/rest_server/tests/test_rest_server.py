@@ -0,0 +1,68 @@
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy
+import pytest
+
+
+@pytest.fixture
+def rest_url(test_production_session):
+    from chimerax.rest_server.cmd import start_server, stop_server, _get_server
+
+    session = test_production_session
+    start_server(session, port=0, json=True)
+    server = _get_server()
+    for i in range(100):
+        if server.httpd is not None:
+            break
+        time.sleep(0.05)
+    host, port = server.server_address
+    yield "http://%s:%d" % (host, port)
+    stop_server(session, quiet=True)
+
+
+def _post_json(url, data):
+    request = urllib.request.Request(
+        url, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as r:
+        return json.loads(r.read())
+
+
+def test_rest_batch(test_production_session, rest_url):
+    from chimerax.map_filter.vopcommand import volume_new
+
+    v = volume_new(test_production_session, size=(4, 4, 4))
+    commands = ["rename #1 first", "nosuchcommand", "rename #1 second"]
+    results = _post_json(rest_url + "/batch", {"command": commands})
+    assert len(results) == 2
+    assert results[0]["error"] is None
+    assert results[1]["error"] is not None
+    assert v.name == "first"
+
+    results = _post_json(rest_url + "/batch", {"command": commands, "stop_on_error": False})
+    assert len(results) == 3
+    assert results[2]["error"] is None
+    assert v.name == "second"
+
+
+def test_rest_array_map(test_production_session, rest_url):
+    from chimerax.map_data import ArrayGridData
+    from chimerax.map import volume_from_grid_data
+
+    a = numpy.arange(60, dtype=numpy.float32).reshape((3, 4, 5))
+    volume_from_grid_data(ArrayGridData(a), test_production_session)
+    query = urllib.parse.urlencode({"type": "map", "volume": "#1"})
+    with urllib.request.urlopen(rest_url + "/array?" + query) as r:
+        shape = tuple(int(s) for s in r.headers["X-Array-Shape"].split(","))
+        values = numpy.frombuffer(r.read(), r.headers["X-Array-Dtype"]).reshape(shape)
+    assert numpy.array_equal(values, a)
+
+
+def test_rest_array_bad_type(rest_url):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(rest_url + "/array?type=nothing")
+    assert e.value.code == 400
@@ -24,7 +24,8 @@
 
 def local_distance_difference_test(ref_xyz, xyz, paired_mask,
                                    r0 = 15, thresholds = (0.5, 1.0, 2.0, 4.0),
-                                   score_missing = False):
+                                   score_missing = False, nthread = 1,
+                                   max_chunk_pairs = 2**21):
     '''
     Compute LDDT (local distance difference test) score for each position for each sequence
     of coordinates in the xyz array (N x 3 size).  The ref_xyz array is typically C-alpha coordinates
@@ -32,32 +33,99 @@ def local_distance_difference_test(ref_xyz, xyz, paired_mask,
     similarity (M x N x 3 size).  Only non-zero the positions in the paired_mask array have valid xyz position
     data.  If a ref_xyz value has no paired coordinate in the xyz array then it can be ignored
     (score_missing = False) or it can decrease the LDDT score (score_missing = True).
+
+    Pairs of reference positions within distance r0 are found once and the sequences
+    are scored in chunks having at most max_chunk_pairs position pairs in total to limit
+    memory use.  Chunks are computed in nthread threads (None for half the number of cores).
     '''
     n = len(ref_xyz)
     m = len(xyz)
-    nt = len(thresholds)
-    from numpy import zeros, sqrt, abs, int32
+    from numpy import asarray, zeros, sqrt, abs, int32
+    paired_mask = asarray(paired_mask, bool)
+    pairs = _ClosePairs(ref_xyz, r0)
+    i, j = pairs.i, pairs.j
+
+    count = zeros((m,n), int32)
     total = zeros((m,n), int32)
-    count = zeros((nt,m,n), int32)
-    for i in range(n):
-        # Find close positions to reference position i.
-        dref = ref_xyz - ref_xyz[i]
-        dist = sqrt((dref*dref).sum(axis=1))
-        close = (dist <= r0)			# Size n
-        close[i] = False
-        rd = dist[close]			# Size c
-        d = xyz[:,close,:] - xyz[:,i,:].reshape((m,1,3))   # Size m,c,3
-        td = sqrt((d*d).sum(axis=2))		# m,c
-        derror = abs(td - rd)			# m,c
-        pmask = paired_mask[:,close]		# m,c
-        for k in range(m):
-            if paired_mask[k,i]:
-                kpmask = pmask[k]
-                dkerror = derror[k,kpmask]
-                for j,t in enumerate(thresholds):
-                    count[j,k,i] += (dkerror <= t).sum()
-        total[:,i] += close.sum() if score_missing else pmask.sum(axis=1)
+    if score_missing:
+        total[:] = pairs.counts
+
+    def score_chunk(k0, k1):
+        # Distances for each pair i < j are computed once and used for both positions.
+        xyz_t = xyz[k0:k1].transpose((2,0,1))	# Size 3,mc,n
+        dx, dy, dz = xyz_t[:,:,j] - xyz_t[:,:,i]	# Size mc,p
+        td = sqrt(dx*dx + dy*dy + dz*dz)
+        del dx, dy, dz
+        derror = abs(td - pairs.distances)		# mc,p
+        del td
+        c = zeros(derror.shape, int32)
+        for t in thresholds:
+            c += (derror <= t)
+        del derror
+        pmask = paired_mask[k0:k1]
+        pimask, pjmask = pmask[:,i], pmask[:,j]
+        count[k0:k1] = pairs.sums(c*pjmask, c*pimask) * pmask
+        if not score_missing:
+            total[k0:k1] = pairs.sums(pjmask, pimask)
+
+    chunk_size = max(1, max_chunk_pairs // max(1, len(i)))
+    chunks = [(k0, min(m, k0+chunk_size)) for k0 in range(0, m, chunk_size)]
+    if nthread == 1 or len(chunks) == 1:
+        for k0, k1 in chunks:
+            score_chunk(k0, k1)
+    else:
+        from chimerax.core.threadq import apply_to_list
+        apply_to_list(score_chunk, chunks, nthread = nthread)
+
     total[total == 0] = 1      # Avoid divide by zero
-    scores = count.sum(axis=0)/total
-    scores /= nt
+    scores = count/total
+    scores /= len(thresholds)
     return scores
+
+class _ClosePairs:
+    '''
+    Pairs of positions (i,j) with i < j within distance r0, and their distances.
+    Distances are computed a block of positions at a time to limit memory use.
+    '''
+    def __init__(self, xyz, r0, block_size = 1024):
+        from numpy import sqrt, nonzero, concatenate, arange, argsort, searchsorted, int64
+        n = len(xyz)
+        ilist, jlist, dlist = [], [], []
+        for b in range(0, n, block_size):
+            dxyz = xyz[None,:,:] - xyz[b:b+block_size,None,:]
+            dist = sqrt((dxyz*dxyz).sum(axis=2))
+            close = (dist <= r0)
+            bi = arange(b, b+len(dist))
+            close &= (bi[:,None] < arange(n)[None,:])
+            ci, cj = nonzero(close)
+            ilist.append(ci + b)
+            jlist.append(cj)
+            dlist.append(dist[ci,cj])
+        self.i = i = concatenate(ilist) if ilist else arange(0, dtype = int64)
+        self.j = j = concatenate(jlist) if jlist else arange(0, dtype = int64)
+        self.distances = concatenate(dlist) if dlist else xyz[:0,0]
+
+        # Pair ranges for each position as first (i) and second (j) member of pair.
+        positions = arange(n)
+        self._i_ranges = searchsorted(i, positions), searchsorted(i, positions, side = 'right')
+        self._j_order = jo = argsort(j, kind = 'stable')
+        jsorted = j[jo]
+        self._j_ranges = searchsorted(jsorted, positions), searchsorted(jsorted, positions, side = 'right')
+        self.counts = ((self._i_ranges[1] - self._i_ranges[0]) +
+                       (self._j_ranges[1] - self._j_ranges[0]))
+
+    def sums(self, i_values, j_values):
+        '''
+        Sum values over pairs for each position giving an M x N array, adding the
+        i_values (M x P) of pairs to position i and j_values of pairs to position j.
+        '''
+        return (_range_sums(i_values, *self._i_ranges) +
+                _range_sums(j_values[:,self._j_order], *self._j_ranges))
+
+def _range_sums(values, starts, ends):
+    '''Sum values (M x P) over index ranges giving an M x N array.'''
+    from numpy import zeros, cumsum, int32
+    m, p = values.shape
+    csum = zeros((m, p+1), int32)
+    cumsum(values, axis = 1, out = csum[:,1:])
+    return csum[:,ends] - csum[:,starts]
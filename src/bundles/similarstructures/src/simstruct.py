@@ -308,7 +308,7 @@ class SimilarStructures(State):
             hits_mask = hits_mask[:,qsi_with_coords]
 
         from . import lddt
-        lddt_scores = lddt.local_distance_difference_test(query_xyz, hits_xyz, hits_mask)
+        lddt_scores = lddt.local_distance_difference_test(query_xyz, hits_xyz, hits_mask, nthread = None)
         if query_missing_coords:
             from numpy import zeros, float32
             expanded_lddt_scores = zeros((len(lddt_scores), qend-qstart+1), float32) 
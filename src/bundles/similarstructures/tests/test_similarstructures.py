@@ -0,0 +1,47 @@
+import numpy
+import pytest
+
+
+def _lddt_loop(ref_xyz, xyz, paired_mask, r0=15, thresholds=(0.5, 1.0, 2.0, 4.0), score_missing=False):
+    # Straightforward per-position LDDT used as a reference.
+    m, n = paired_mask.shape
+    scores = numpy.zeros((m, n))
+    for k in range(m):
+        for i in range(n):
+            count = total = 0
+            for j in range(n):
+                if j == i:
+                    continue
+                rd = numpy.linalg.norm(ref_xyz[i] - ref_xyz[j])
+                if rd > r0:
+                    continue
+                if paired_mask[k, j] or score_missing:
+                    total += 1
+                if paired_mask[k, i] and paired_mask[k, j]:
+                    d = numpy.linalg.norm(xyz[k, i] - xyz[k, j])
+                    count += sum(abs(d - rd) <= t for t in thresholds)
+            scores[k, i] = count / max(total, 1) / len(thresholds)
+    return scores
+
+
+@pytest.mark.parametrize("score_missing", [False, True])
+@pytest.mark.parametrize("nthread,max_chunk_pairs", [(1, 2**21), (1, 100), (2, 100)])
+def test_lddt_matches_loop(score_missing, nthread, max_chunk_pairs):
+    from chimerax.similarstructures.lddt import local_distance_difference_test
+
+    rng = numpy.random.default_rng(0)
+    n, m = 40, 7
+    ref_xyz = numpy.cumsum(rng.normal(scale=2.2, size=(n, 3)), axis=0).astype(numpy.float32)
+    xyz = (ref_xyz + rng.normal(scale=1.5, size=(m, n, 3))).astype(numpy.float32)
+    paired_mask = rng.random((m, n)) < 0.8
+    scores = local_distance_difference_test(
+        ref_xyz,
+        xyz,
+        paired_mask,
+        score_missing=score_missing,
+        nthread=nthread,
+        max_chunk_pairs=max_chunk_pairs,
+    )
+    expected = _lddt_loop(ref_xyz, xyz, paired_mask, score_missing=score_missing)
+    assert scores.shape == (m, n)
+    assert numpy.allclose(scores, expected, atol=1e-6)
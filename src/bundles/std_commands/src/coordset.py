@@ -162,6 +162,22 @@ def register_command(logger):
         synopsis = 'show slider for coordinate sets')
     register('coordset slider', desc, coordset_slider, logger=logger)
 
+    from chimerax.core.commands import EnumOf, PositiveIntArg, SaveFileNameArg
+    from chimerax.atomic import StructureArg
+    from .coordset_cluster import coordset_cluster
+    desc = CmdDesc(
+        required = [('structure', StructureArg)],
+        keyword = [('atoms', AtomsArg),
+                   ('method', EnumOf(('leader', 'kmedoids'))),
+                   ('cutoff', FloatArg),
+                   ('clusters', PositiveIntArg),
+                   ('sample_size', PositiveIntArg),
+                   ('keep', EnumOf(('all', 'representatives'))),
+                   ('reorder', BoolArg),
+                   ('save_file', SaveFileNameArg)],
+        synopsis = 'cluster coordinate sets by RMSD')
+    register('coordset cluster', desc, coordset_cluster, logger=logger)
+
 # -----------------------------------------------------------------------------
 #
 from chimerax.core.commands import Annotation
@@ -193,12 +209,12 @@ class IndexRangeArg(Annotation):
 def absolute_index_range(index_range, mol):
 
   # Find available coordsets
-  ids = mol.coordset_ids
+  ids = coordset_ids(mol)
   imin, imax = min(ids), max(ids)
 
   s,e,st = index_range
   if s is None:
-    si = mol.active_coordset_id
+    si = active_coordset_id(mol)
   elif s < 0:
     si = s + imax + 1
   else:
@@ -302,9 +318,13 @@ class CoordinateSetPlayer:
 
   def change_coordset(self, cs):
     m = self.structure
-    last_cs = m.active_coordset_id
+    traj = getattr(m, 'lazy_trajectory', None)
+    last_cs = active_coordset_id(m)
     try:
-      m.active_coordset_id = cs
+      if traj is None:
+        m.active_coordset_id = cs
+      else:
+        traj.show_frame(cs)
       compute_ss = self.compute_ss
     except Exception:
       # No such coordset.
@@ -319,7 +339,7 @@ class CoordinateSetPlayer:
   def hold_steady(self, last_cs):
 
     m = self.structure
-    tf = self.steady_transform(last_cs).inverse() * self.steady_transform(m.active_coordset_id)
+    tf = self.steady_transform(last_cs).inverse() * self.steady_transform(active_coordset_id(m))
     m.position = m.position * tf
 
   def steady_transform(self, cset):
@@ -339,6 +359,9 @@ class CoordinateSetPlayer:
 # -----------------------------------------------------------------------------
 #
 def coordset_coords(atoms, cset, structure):
+  traj = getattr(structure, 'lazy_trajectory', None)
+  if traj is not None:
+    return traj.coords(cset)[atoms.coord_indices]
   cs = structure.active_coordset_id
   if cset == cs:
     xyz = atoms.coords
@@ -347,3 +370,15 @@ def coordset_coords(atoms, cset, structure):
     xyz = atoms.coords
     structure.active_coordset_id = cs
   return xyz
+
+# -----------------------------------------------------------------------------
+# Structures whose trajectory is read lazily (see chimerax.md_crds) have a single
+# coordset, and frames are shown through their 'lazy_trajectory' attribute.
+#
+def coordset_ids(structure):
+  traj = getattr(structure, 'lazy_trajectory', None)
+  return structure.coordset_ids if traj is None else traj.frame_ids
+
+def active_coordset_id(structure):
+  traj = getattr(structure, 'lazy_trajectory', None)
+  return structure.active_coordset_id if traj is None else traj.current_frame
@@ -0,0 +1,335 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# === UCSF ChimeraX Copyright ===
+# Copyright 2022 Regents of the University of California. All rights reserved.
+# The ChimeraX application is provided pursuant to the ChimeraX license
+# agreement, which covers academic and commercial uses. For more details, see
+# <https://www.rbvi.ucsf.edu/chimerax/docs/licensing.html>
+#
+# This particular file is part of the ChimeraX library. You can also
+# redistribute and/or modify it under the terms of the GNU Lesser General
+# Public License version 2.1 as published by the Free Software Foundation.
+# For more details, see
+# <https://www.gnu.org/licenses/old-licenses/lgpl-2.1.html>
+#
+# THIS SOFTWARE IS PROVIDED "AS IS" WITHOUT WARRANTY OF ANY KIND, EITHER
+# EXPRESSED OR IMPLIED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE. ADDITIONAL LIABILITY
+# LIMITATIONS ARE DESCRIBED IN THE GNU LESSER GENERAL PUBLIC LICENSE
+# VERSION 2.1
+#
+# This notice must be embedded in or attached to all copies, including partial
+# copies, of the software or any revisions or derivations thereof.
+# === UCSF ChimeraX Copyright ===
+
+# -----------------------------------------------------------------------------
+# Cluster the coordinate sets of a trajectory by RMSD and optionally keep only
+# one representative coordinate set for each cluster.
+#
+# Frames are read and compared in blocks so memory use depends on the block
+# size and number of clusters (or sample size for k-medoids), not on the
+# number of frames, allowing trajectories with 100,000 or more frames.
+#
+def coordset_cluster(session, structure, atoms = None, method = 'leader',
+                     cutoff = 2.0, clusters = 10, sample_size = 1000,
+                     keep = 'all', reorder = False, save_file = None):
+    '''
+    Cluster the coordinate sets of a structure by RMSD of the specified atoms
+    after optimal superposition.
+
+    Parameters
+    ----------
+    structure : Structure
+      Structure with multiple coordinate sets or a lazily read trajectory.
+    atoms : Atoms
+      Atoms used to compute RMSD.  Default is CA atoms, or all atoms
+      if there are no CA atoms.
+    method : "leader" or "kmedoids"
+      Leader clustering assigns each frame to the nearest cluster leader within
+      the RMSD cutoff, or makes it the leader of a new cluster.  K-medoids
+      clusters a random sample of frames into the given number of clusters
+      and assigns every frame to the nearest medoid.
+    cutoff : float
+      RMSD cutoff (Angstroms) for leader clustering.
+    clusters : int
+      Number of clusters for k-medoids clustering.
+    sample_size : int
+      Number of frames sampled for k-medoids clustering.
+    keep : "all" or "representatives"
+      Whether to keep all coordinate sets or only the representative coordinate
+      set of each cluster, ordered from the most to the least populated cluster.
+    reorder : bool
+      Reorder the coordinate sets so that frames of each cluster are contiguous,
+      most populated cluster first, starting with the cluster representative.
+    save_file : string
+      Write the cluster number of each coordinate set and its RMSD to the
+      representative to a comma-separated value file.
+    '''
+    from chimerax.core.errors import UserError
+    atoms = _clustering_atoms(structure, atoms)
+    frames = FrameCoordinates(structure, atoms)
+    if len(frames) < 2:
+        raise UserError('Structure #%s has only one coordinate set' % structure.id_string)
+    lazy = (getattr(structure, 'lazy_trajectory', None) is not None)
+    if lazy and (keep != 'all' or reorder):
+        raise UserError('Cannot keep representatives or reorder frames of a trajectory'
+                        ' read on demand, open it with all frames loaded')
+
+    session.logger.status('Clustering %d coordinate sets of #%s'
+                          % (len(frames), structure.id_string))
+    if method == 'leader':
+        if cutoff <= 0:
+            raise UserError('RMSD cutoff must be positive, got %.3g' % cutoff)
+        representatives, labels, rmsds = leader_clusters(frames, cutoff)
+    elif method == 'kmedoids':
+        if clusters < 1:
+            raise UserError('Number of clusters must be at least 1, got %d' % clusters)
+        representatives, labels, rmsds = kmedoid_clusters(frames, clusters,
+                                                          sample_size = sample_size)
+    representatives, labels = _order_by_population(representatives, labels)
+    session.logger.status('')
+
+    cs_ids = frames.ids
+    _report_clusters(session, structure, len(atoms), method, representatives,
+                     labels, rmsds, cs_ids)
+
+    if save_file is not None:
+        _save_clusters(save_file, labels, rmsds, cs_ids)
+
+    if keep == 'representatives':
+        _replace_coordsets(structure, representatives, cs_ids)
+    elif reorder:
+        _replace_coordsets(structure, _cluster_order(representatives, labels), cs_ids)
+
+    return representatives, labels, rmsds
+
+# -----------------------------------------------------------------------------
+#
+class FrameCoordinates:
+    '''
+    Coordinates of a subset of atoms for each coordinate set of a structure,
+    read only when requested so that all frames need not be held in memory.
+    Frame indices start at 0 and correspond to the structure coordset ids in order.
+    '''
+    def __init__(self, structure, atoms):
+        from .coordset import coordset_ids
+        self.structure = structure
+        self.ids = list(coordset_ids(structure))
+        self._coord_indices = atoms.coord_indices
+        self._trajectory = getattr(structure, 'lazy_trajectory', None)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def coords(self, frames):
+        '''Return an N by M by 3 float64 array of coordinates for N frame indices.'''
+        s, ci, ids, traj = self.structure, self._coord_indices, self.ids, self._trajectory
+        from numpy import array, float64
+        if traj is None:
+            xyzs = [s.coordset(ids[f]).xyzs[ci] for f in frames]
+        else:
+            xyzs = [traj.coords(ids[f])[ci] for f in frames]
+        return array(xyzs, float64)
+
+# -----------------------------------------------------------------------------
+#
+def leader_clusters(frames, cutoff, block_size = 256):
+    '''
+    Assign each frame to the nearest cluster leader within RMSD 'cutoff',
+    otherwise make it the leader of a new cluster.  Frames are compared with
+    the leaders found so far a block at a time.  Returns leader frame indices,
+    the cluster number of each frame and the RMSD of each frame to its leader.
+    '''
+    from numpy import empty, zeros, arange, array, concatenate, inf, int32, float64
+    from chimerax.geometry import rmsd_matrix
+    n = len(frames)
+    labels = empty((n,), int32)
+    rmsds = zeros((n,), float64)
+    leaders = []
+    leader_xyz = None
+    for b in range(0, n, block_size):
+        fi = arange(b, min(n, b + block_size))
+        xyz = frames.coords(fi)
+        if leaders:
+            d = rmsd_matrix(xyz, leader_xyz)
+            nearest = d.argmin(axis = 1)
+            dmin = d[arange(len(fi)), nearest]
+            close = (dmin <= cutoff)
+            labels[fi[close]] = nearest[close]
+            rmsds[fi[close]] = dmin[close]
+            unassigned = (~close).nonzero()[0]
+        else:
+            unassigned = arange(len(fi))
+        if len(unassigned) == 0:
+            continue
+
+        # Frames far from all existing leaders are clustered in frame order
+        # using their pairwise RMSDs, starting new clusters as needed.
+        du = rmsd_matrix(xyz[unassigned])
+        new_leaders = []
+        for k, i in enumerate(unassigned):
+            if new_leaders:
+                dl = du[k, new_leaders]
+                j = dl.argmin()
+                if dl[j] <= cutoff:
+                    labels[fi[i]] = len(leaders) + j
+                    rmsds[fi[i]] = dl[j]
+                    continue
+            labels[fi[i]] = len(leaders) + len(new_leaders)
+            new_leaders.append(k)
+        new_frames = unassigned[new_leaders]
+        new_xyz = xyz[new_frames]
+
+        # Frames assigned to an earlier block's leader may be nearer to
+        # a leader started earlier in this block.
+        if leaders and close.any():
+            ci = close.nonzero()[0]
+            dn = rmsd_matrix(xyz[ci], new_xyz)
+            dn[new_frames[None,:] > ci[:,None]] = inf
+            j = dn.argmin(axis = 1)
+            dj = dn[arange(len(ci)), j]
+            nearer = (dj < dmin[ci])
+            labels[fi[ci[nearer]]] = len(leaders) + j[nearer]
+            rmsds[fi[ci[nearer]]] = dj[nearer]
+
+        leaders.extend(fi[new_frames])
+        leader_xyz = new_xyz if leader_xyz is None else concatenate((leader_xyz, new_xyz))
+
+    return array(leaders, int32), labels, rmsds
+
+# -----------------------------------------------------------------------------
+#
+def kmedoid_clusters(frames, k, sample_size = 1000, block_size = 256,
+                     max_iterations = 100, seed = 0):
+    '''
+    Cluster a random sample of frames into k clusters minimizing the sum of
+    RMSDs to the cluster medoids (CLARA), then assign every frame to the
+    nearest medoid.  Only the sample RMSD matrix and one block of frames are
+    held in memory.  Returns medoid frame indices, the cluster number of each
+    frame and the RMSD of each frame to its medoid.
+    '''
+    from numpy import arange, empty, sort, int32, float64
+    from chimerax.geometry import rmsd_matrix
+    n = len(frames)
+    k = min(k, n)
+    if n <= sample_size:
+        sample = arange(n)
+    else:
+        from numpy.random import default_rng
+        sample = sort(default_rng(seed).choice(n, max(sample_size, k), replace = False))
+    sample_xyz = frames.coords(sample)
+    m = _kmedoids(rmsd_matrix(sample_xyz), k, max_iterations)
+    medoids = sample[m].astype(int32)
+    medoid_xyz = sample_xyz[m]
+    del sample_xyz
+
+    labels = empty((n,), int32)
+    rmsds = empty((n,), float64)
+    for b in range(0, n, block_size):
+        fi = arange(b, min(n, b + block_size))
+        d = rmsd_matrix(frames.coords(fi), medoid_xyz)
+        nearest = d.argmin(axis = 1)
+        labels[fi] = nearest
+        rmsds[fi] = d[arange(len(fi)), nearest]
+    labels[medoids] = arange(k)   # Identical frames could be nearer another medoid.
+    rmsds[medoids] = 0
+    return medoids, labels, rmsds
+
+# -----------------------------------------------------------------------------
+# Partitioning around medoids for a full distance matrix.  Medoids are
+# initialized greedily (BUILD) then refined by alternately assigning points
+# to the nearest medoid and choosing the medoid of each cluster.
+#
+def _kmedoids(d, k, max_iterations = 100):
+    from numpy import maximum, minimum, array, ix_
+    n = len(d)
+    medoids = [int(d.sum(axis = 1).argmin())]
+    nearest = d[:,medoids[0]].copy()
+    for c in range(1, k):
+        gain = maximum(nearest[:,None] - d, 0).sum(axis = 0)
+        gain[medoids] = -1
+        m = int(gain.argmax())
+        medoids.append(m)
+        nearest = minimum(nearest, d[:,m])
+
+    medoids = array(medoids)
+    for iteration in range(max_iterations):
+        assign = d[:,medoids].argmin(axis = 1)
+        assign[medoids] = range(k)
+        new_medoids = medoids.copy()
+        for c in range(k):
+            members = (assign == c).nonzero()[0]
+            new_medoids[c] = members[d[ix_(members, members)].sum(axis = 1).argmin()]
+        if (new_medoids == medoids).all():
+            break
+        medoids = new_medoids
+    return medoids
+
+# -----------------------------------------------------------------------------
+#
+def _order_by_population(representatives, labels):
+    '''Renumber clusters from most to least populated.'''
+    from numpy import bincount, argsort, empty, arange, int32
+    counts = bincount(labels, minlength = len(representatives))
+    order = argsort(-counts, kind = 'stable')
+    renumber = empty((len(order),), int32)
+    renumber[order] = arange(len(order))
+    return representatives[order], renumber[labels]
+
+def _cluster_order(representatives, labels):
+    '''Frame order with each cluster contiguous and its representative first.'''
+    from numpy import argsort
+    rank = labels.astype(float)
+    rank[representatives] -= 0.5
+    return argsort(rank, kind = 'stable')
+
+# -----------------------------------------------------------------------------
+#
+def _replace_coordsets(structure, frames, cs_ids):
+    from numpy import array, float64
+    xyzs = array([structure.coordset(cs_ids[f]).xyzs for f in frames], float64)
+    structure.add_coordsets(xyzs, replace = True)
+    structure.active_coordset_id = structure.coordset_ids[0]
+    structure.session.logger.info('Replaced coordinate sets of #%s with %d coordinate sets'
+                                  % (structure.id_string, len(frames)))
+
+# -----------------------------------------------------------------------------
+#
+def _report_clusters(session, structure, natoms, method, representatives, labels,
+                     rmsds, cs_ids, max_listed = 20):
+    from numpy import bincount
+    nc, nf = len(representatives), len(labels)
+    counts = bincount(labels, minlength = nc)
+    sums = bincount(labels, weights = rmsds, minlength = nc)
+    lines = ['%d clusters of %d coordinate sets of #%s using %s clustering of %d atoms'
+             % (nc, nf, structure.id_string, method, natoms)]
+    for c in range(min(nc, max_listed)):
+        lines.append('Cluster %d: %d coordinate sets (%.1f%%), representative %d,'
+                     ' mean RMSD to representative %.3f'
+                     % (c+1, counts[c], 100*counts[c]/nf, cs_ids[representatives[c]],
+                        sums[c]/counts[c]))
+    if nc > max_listed:
+        lines.append('%d smaller clusters with %d coordinate sets not listed'
+                     % (nc - max_listed, counts[max_listed:].sum()))
+    session.logger.info('\n'.join(lines))
+
+def _save_clusters(path, labels, rmsds, cs_ids):
+    with open(path, 'w') as f:
+        f.write('coordset,cluster,rmsd\n')
+        for cs_id, c, r in zip(cs_ids, labels, rmsds):
+            f.write('%d,%d,%.4f\n' % (cs_id, c+1, r))
+
+# -----------------------------------------------------------------------------
+#
+def _clustering_atoms(structure, atoms):
+    from chimerax.core.errors import UserError
+    if atoms is None:
+        atoms = structure.atoms
+        ca = atoms.filter(atoms.names == 'CA')
+        if len(ca) > 0:
+            atoms = ca
+    else:
+        atoms = atoms.intersect(structure.atoms)
+    if len(atoms) == 0:
+        raise UserError('No atoms of #%s specified for clustering' % structure.id_string)
+    return atoms
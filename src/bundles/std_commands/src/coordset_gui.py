@@ -19,8 +19,9 @@ class CoordinateSetSlider(Slider):
 
         self.structure = structure
 
-        title = 'Coordinate sets %s (%d)' % (structure.name, structure.num_coordsets)
-        csids = structure.coordset_ids
+        from .coordset import coordset_ids, active_coordset_id
+        csids = coordset_ids(structure)
+        title = 'Coordinate sets %s (%d)' % (structure.name, len(csids))
         id_start, id_end = min(csids), max(csids)
         self.coordset_ids = set(csids)
         Slider.__init__(self, session, 'Model Series', 'Model', title, value_range = (id_start, id_end),
@@ -31,7 +32,7 @@ class CoordinateSetSlider(Slider):
         self._player = CoordinateSetPlayer(structure, id_start, id_end, istep = 1,
                                            pause_frames = pause_frames, loop = 1,
                                            compute_ss = compute_ss, steady_atoms = steady_atoms)
-        self.set_slider(structure.active_coordset_id)
+        self.set_slider(active_coordset_id(structure))
 
         self._coordset_change_handler = structure.triggers.add_handler('changes', self.coordset_change_cb)
         
@@ -57,12 +58,16 @@ class CoordinateSetSlider(Slider):
             sa = self._player.steady_atoms
             css = self._player.compute_ss
             self.delete()
-            if s.num_coordsets > 1:
+            from .coordset import coordset_ids
+            if len(coordset_ids(s)) > 1:
                 CoordinateSetSlider(s.session, s, pause_frames=pf, movie_framerate=mfr, steady_atoms=sa,
                     compute_ss=css)
             return
         if 'active_coordset changed' in changes.structure_reasons():
             self.set_slider(s.active_coordset_id)
+        elif getattr(s, 'lazy_trajectory', None) is not None and 'coord changed' in changes.atom_reasons():
+            # Lazily read trajectory frames replace the coordinates of the single coordset.
+            self.set_slider(s.lazy_trajectory.current_frame)
             
     def models_closed_cb(self, name, models):
       if self.structure in models:
@@ -49,7 +49,11 @@ def graphics(session, bg_color=None, background_color=None):
 
 
 def graphics_rate(
-    session, report_frame_rate=None, max_frame_rate=None, wait_for_vsync=None
+    session,
+    report_frame_rate=None,
+    max_frame_rate=None,
+    wait_for_vsync=None,
+    cull_instances=None,
 ):
     """
     Set graphics rendering rate parameters.
@@ -64,6 +68,9 @@ def graphics_rate(
         Whether drawing is synchronized to the display vertical refresh rate,
         typically 60 Hz.  Disabling wait allows frame rates faster than vsync
         but can exhibit image tearing.  Currently only supported on Windows.
+    cull_instances : bool
+        Whether to skip drawing instances of drawings with many copies that
+        are outside the field of view or clip planes.
     """
 
     change = False
@@ -82,6 +89,11 @@ def graphics_rate(
                 "Changing wait for vsync is only supported on Windows by some drivers"
             )
         change = True
+    if cull_instances is not None:
+        v = session.main_view
+        v.cull_instances = cull_instances
+        v.redraw_needed = True
+        change = True
 
     if not change and session.ui.is_gui:
         msec = session.update_loop.redraw_interval
@@ -356,6 +368,8 @@ def register_command(logger):
         Or,
         EnumOf,
         NoArg,
+        PositiveIntArg,
+        SaveFileNameArg,
     )
 
     desc = CmdDesc(
@@ -370,6 +384,7 @@ def register_command(logger):
         keyword=[
             ("max_frame_rate", FloatArg),
             ("wait_for_vsync", BoolArg),
+            ("cull_instances", BoolArg),
         ],
         synopsis="Set graphics rendering rate parameters",
     )
@@ -411,6 +426,18 @@ def register_command(logger):
     desc = CmdDesc(synopsis="Restart graphics drawing after an error")
     register("graphics restart", desc, graphics_restart, logger=logger)
 
+    desc = CmdDesc(
+        optional=[("enable", BoolArg)],
+        keyword=[
+            ("frames", PositiveIntArg),
+            ("redraw", PositiveIntArg),
+            ("synchronize", BoolArg),
+            ("save_file", SaveFileNameArg),
+        ],
+        synopsis="Report rendering times and statistics for each frame",
+    )
+    register("graphics profile", desc, graphics_profile, logger=logger)
+
     desc = CmdDesc(
         optional=[("models", TopModelsArg)],
         synopsis="Report triangles in graphics scene",
@@ -429,6 +456,96 @@ def register_command(logger):
     register("graphics shader", desc, graphics_shader, logger=logger)
 
 
+def graphics_profile(
+    session, enable=None, frames=None, redraw=None, synchronize=None, save_file=None
+):
+    """
+    Record rendering times and drawing statistics for each frame.
+
+    Parameters
+    ----------
+    enable : bool
+        Start recording or stop recording and report.  If not given, the
+        statistics recorded so far are reported.
+    frames : int
+        Number of most recent frames to keep statistics for (default 100).
+    redraw : int
+        Draw this many frames now even if the scene has not changed.  This
+        allows profiling without a graphics window using offscreen rendering.
+    synchronize : bool
+        Whether to wait for the graphics card to finish each drawing pass
+        so that times include GPU rendering.  This slows drawing.
+    save_file : string
+        Write statistics for the recorded frames to this JSON file.
+    """
+    view = session.main_view
+    prof = view.frame_profiler
+    temporary = prof is None and redraw and enable is None
+    if enable or temporary:
+        if view.render is None:
+            from chimerax.core.errors import UserError
+
+            raise UserError(
+                "Graphics profiling requires graphics,"
+                " use offscreen rendering when there is no window"
+            )
+        if prof is None or frames is not None:
+            from chimerax.graphics.frameprofile import FrameProfiler
+
+            prof = FrameProfiler(frames=(100 if frames is None else frames))
+            view.frame_profiler = prof
+            _report_update_loop_times(session, True)
+    if prof is None:
+        session.logger.info("Graphics profiling is not on")
+        return
+    if synchronize is not None:
+        prof.synchronize = synchronize
+
+    if redraw:
+        for i in range(redraw):
+            view.redraw_needed = True
+            view.check_for_drawing_change()
+            view.draw(check_for_changes=False)
+            view.frame_number += 1
+
+    if temporary or enable is False:
+        view.frame_profiler = None
+        _report_update_loop_times(session, False)
+
+    if not enable or redraw:
+        report = prof.report()
+        session.logger.info(
+            '<pre style="font-family: monospace">\n%s\n</pre>' % report, is_html=True
+        )
+    if save_file is not None:
+        prof.write_json(save_file)
+
+
+def _report_update_loop_times(session, enable):
+    # Add times measured by the update loop before drawing each frame.
+    h = getattr(session, "_graphics_profile_handler", None)
+    if enable and h is None:
+
+        def frame_drawn(trigger_name, update_loop, session=session):
+            prof = session.main_view.frame_profiler
+            if prof:
+                u = update_loop
+                prof.add_times_to_last_frame(
+                    {
+                        "new_frame": u.last_new_frame_time,
+                        "atomic_changes": u.last_atomic_check_for_changes_time,
+                        "clip_caps": u.last_clip_time,
+                    }
+                )
+
+        session._graphics_profile_handler = session.triggers.add_handler(
+            "frame drawn", frame_drawn
+        )
+    elif not enable and h is not None:
+        session.triggers.remove_handler(h)
+        session._graphics_profile_handler = None
+
+
 def graphics_triangles(session, models=None):
     """
     Report shown triangles in graphics scene.  This is for analyzing graphics performance.
@@ -534,6 +651,12 @@ class FrameRateReporter:
             msg += ", " + ", ".join(
                 ["%s %.0f%%" % (k[:-5], 100 * v / dt) for k, v in ct.items()]
             )
+            ic = self.session.main_view.instance_culling
+            if ic.culled_instances > 0:
+                msg += ", culled %d of %d instances" % (
+                    ic.culled_instances,
+                    ic.culled_instances + ic.drawn_instances,
+                )
             self.session.logger.status(msg)
             self._last_time = t
             self._num_frames = 0
@@ -40,11 +40,106 @@ def rmsd(session, atoms, to=None):
     session.logger.info("RMSD between %d atom pairs is %.3f" % (len(atoms1), val))
     return val
 
+def rmsd_matrix(session, atoms, to=None, fit=True, coordsets=True, save_file=None):
+    """
+    Compute RMSD between every pair of conformations of the specified atoms.
+    Each structure contributes its specified atoms, paired with the other
+    structures by their order in the atom spec, and each of its coordinate sets
+    is a conformation if coordsets is true.  If 'to' atoms are given the RMSD
+    of each conformation to each 'to' conformation is computed, otherwise all
+    pairs of conformations are compared.  The matrix can be saved as a NumPy
+    .npy file or as comma-separated values.
+    """
+    from chimerax.core.errors import UserError
+    labels, xyz = _conformations(atoms, coordsets)
+    if to is None:
+        ref_labels, ref_xyz = labels, None
+    else:
+        ref_labels, ref_xyz = _conformations(to, coordsets)
+        if ref_xyz.shape[1] != xyz.shape[1]:
+            raise UserError("Number of atoms per structure from first atom spec (%d)"
+                " differs from number in second (%d)" % (xyz.shape[1], ref_xyz.shape[1]))
+
+    from chimerax.geometry import rmsd_matrix as compute_rmsd_matrix
+    rmsds = compute_rmsd_matrix(xyz, ref_xyz, fit = fit)
+
+    m, n = rmsds.shape
+    if to is None:
+        from numpy import eye
+        vals = rmsds[~eye(m, dtype = bool)]
+    else:
+        vals = rmsds
+    msg = ("RMSD %s for %d by %d conformations of %d atoms"
+           % ("matrix" if fit else "matrix without fitting", m, n, xyz.shape[1]))
+    if vals.size > 0:
+        msg += ", minimum %.3f, mean %.3f, maximum %.3f" % (vals.min(), vals.mean(), vals.max())
+    session.logger.info(msg)
+    if m <= 10 and n <= 10:
+        lines = ['\t'.join([''] + ref_labels)]
+        lines.extend('\t'.join([label] + ['%.3f' % r for r in row])
+                     for label, row in zip(labels, rmsds))
+        session.logger.info('\n'.join(lines))
+
+    if save_file is not None:
+        _save_rmsd_matrix(save_file, rmsds, labels, ref_labels)
+        session.logger.info("Saved RMSD matrix to %s" % save_file)
+
+    return rmsds
+
+def _conformations(atoms, coordsets):
+    """Return labels and N by M by 3 array of coordinates for each conformation."""
+    from chimerax.core.errors import UserError
+    if len(atoms) == 0:
+        raise UserError("Given atom specs don't contain any atoms")
+    labels = []
+    xyzs = []
+    s0 = None
+    for s, satoms in sorted(atoms.by_structure, key = lambda sa: sa[0].id):
+        if s0 is None:
+            s0, natoms = s, len(satoms)
+        elif len(satoms) != natoms:
+            raise UserError("Structures have different numbers of specified atoms, %d for #%s and %d for #%s"
+                            % (natoms, s0.id_string, len(satoms), s.id_string))
+        if coordsets and s.num_coordsets > 1:
+            ci = satoms.coord_indices
+            from numpy import array
+            xyz = array([s.coordset(cs_id).xyzs[ci] for cs_id in s.coordset_ids])
+            spos = s.scene_position
+            if not spos.is_identity():
+                xyz = spos.transform_points(xyz.reshape((-1,3))).reshape(xyz.shape)
+            xyzs.extend(xyz)
+            labels.extend('#%s coordset %d' % (s.id_string, cs_id) for cs_id in s.coordset_ids)
+        else:
+            xyzs.append(satoms.scene_coords)
+            labels.append('#' + s.id_string)
+    from numpy import array, float64
+    return labels, array(xyzs, float64)
+
+def _save_rmsd_matrix(path, rmsds, labels, ref_labels):
+    if path.endswith('.npy'):
+        from numpy import save
+        save(path, rmsds)
+    else:
+        import csv
+        with open(path, 'w', newline = '') as f:
+            w = csv.writer(f)
+            w.writerow([''] + ref_labels)
+            for label, row in zip(labels, rmsds):
+                w.writerow([label] + ['%.4f' % r for r in row])
+
 def register_command(logger):
-    from chimerax.core.commands import CmdDesc, register
+    from chimerax.core.commands import CmdDesc, register, BoolArg, SaveFileNameArg
     from chimerax.atomic import OrderedAtomsArg
     desc = CmdDesc(required = [('atoms', OrderedAtomsArg)],
                    keyword = [('to', OrderedAtomsArg),],
                    required_arguments = ['to'],
                    synopsis = 'Compute RMSD between two sets of atoms')
     register('rmsd', desc, rmsd, logger=logger)
+
+    desc = CmdDesc(required = [('atoms', OrderedAtomsArg)],
+                   keyword = [('to', OrderedAtomsArg),
+                              ('fit', BoolArg),
+                              ('coordsets', BoolArg),
+                              ('save_file', SaveFileNameArg)],
+                   synopsis = 'Compute RMSD between all pairs of structures or coordinate sets')
+    register('rmsd matrix', desc, rmsd_matrix, logger=logger)
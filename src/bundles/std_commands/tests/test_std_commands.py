@@ -28,7 +28,15 @@ color_test_commands = [
     "palette list",
 
 ]
-coordset_test_commands = [*open_2tpk, "coordset #1 0"]
+coordset_test_commands = [
+    *open_2tpk,
+    "coordset #1 0",
+    "combine #1",
+    "morph #1,2 frames 20 play false",
+    "coordset cluster #3 cutoff 1",
+    "coordset cluster #3 method kmedoids clusters 2 reorder true",
+    "coordset cluster #3 keep representatives",
+]
 delete_test_commands = [*open_2tpk, "delete :3"]
 dssp_test_commands = [*open_2tpk, "dssp"]
 graphics_test_commands = [
@@ -61,6 +69,12 @@ rename_test_commands = [
     *open_2tpk,
     "rename #1 snafu"
 ]
+rmsd_test_commands = [
+    *open_2tpk,
+    "rmsd #1@CA to #1@CA",
+    "rmsd matrix #1@CA",
+    "rmsd matrix #1@CA fit false coordsets false",
+]
 roll_move_test_commands = [
     *open_2tpk,
     "roll",
@@ -82,6 +96,13 @@ select_test_commands = [
     "select down",
     "select zone :13 10 extend t",
     "select intersect :12 residues true",
+    "select :4-34@CA,CB",
+    "select :start-10,20-end & @c*",
+    "select /A:GLY,ala@N",
+    "select @@bfactor>30 & ::number<50",
+    "select ::name=\"HOH\"",
+    "setattr :12 atoms name XX",
+    "select @XX",
     "~select"
 ]
 setattr_test_commands = [
@@ -151,6 +172,7 @@ commands = [
     perframe_test_commands,
     rainbow_test_commands,
     rename_test_commands,
+    rmsd_test_commands,
     roll_move_test_commands,
     select_test_commands,
     setattr_test_commands,